@@ -0,0 +1,81 @@
+"""
+Birdhouse fleet throughput benchmark: ingestion, scoring, alerting and
+map rendering at several fleet sizes.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_sensor_fleet
+    python -m benchmarks.bench_sensor_fleet --nodes 100 1000 10000 --hours 6
+"""
+from __future__ import annotations
+import argparse
+import time
+
+import pandas as pd
+
+from nexus_ai.sensor_simulator import make_fleet, generate_readings
+from nexus_ai.sensor_store import SensorRingStore
+from nexus_ai.sensor_rollups import SensorRollups
+from nexus_ai.sensor_rules import score_sensor_frame
+from nexus_ai.components.sensor_alerts import generate_sensor_alerts
+from nexus_ai.components.sensor_nodes import build_sensor_nodes_deck
+
+
+def _timed(fn, repeat: int = 3):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def bench(n_nodes: int, hours: float, interval_s: int, batches: int) -> dict:
+    fleet = make_fleet(n_nodes)
+    df = generate_readings(fleet, hours=hours, interval_s=interval_s)
+    n = len(df)
+    chunks = [df.iloc[i::batches] for i in range(batches)]
+
+    def ingest():
+        store = SensorRingStore()
+        rollups = SensorRollups()
+        for c in chunks:
+            store.extend(c)
+            rollups.ingest(c)
+        return store
+
+    t_ingest, store = _timed(ingest, repeat=1)
+    t_score, _ = _timed(lambda: score_sensor_frame(df))
+    t_latest, latest = _timed(store.latest)
+    t_alerts, alerts = _timed(lambda: generate_sensor_alerts(store))
+    t_map, _ = _timed(lambda: build_sensor_nodes_deck(latest).to_json())
+
+    return {
+        "nodes": n_nodes,
+        "readings": n,
+        "ingest_rows_per_s": n / t_ingest,
+        "score_rows_per_s": n / t_score,
+        "latest_ms": t_latest * 1e3,
+        "alerts_ms": t_alerts * 1e3,
+        "alerts": len(alerts),
+        "map_ms": t_map * 1e3,
+        "store_mb": store.nbytes / 1e6,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Birdhouse fleet benchmark")
+    ap.add_argument("--nodes", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--hours", type=float, default=6.0)
+    ap.add_argument("--interval", type=int, default=300)
+    ap.add_argument("--batches", type=int, default=12, help="ingestion batches per run")
+    args = ap.parse_args(argv)
+
+    rows = [bench(n, args.hours, args.interval, args.batches) for n in args.nodes]
+    out = pd.DataFrame(rows).set_index("nodes")
+    with pd.option_context("display.float_format", "{:,.1f}".format, "display.width", 160, "display.max_columns", None):
+        print(out)
+
+
+if __name__ == "__main__":
+    main()
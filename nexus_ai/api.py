@@ -0,0 +1,670 @@
+"""
+HTTP API over the daily risk dataset (shared snapshot + indexes per process).
+
+    uvicorn nexus_ai.api:app --port 8000
+
+Paths come from NEXUS_DATA / NEXUS_STATES / NEXUS_DISTRICTS (default: the
+app's files).
+
+All query endpoints read the process-wide snapshot (dataset, risk cube,
+bbox window, nearest-cell lookup, aggregation pyramid, state trends), so
+no request loads data. Responses are cached per (dataset version,
+endpoint, parameters, format, encoding); the ETag is derived from that
+key, so a matching If-None-Match is answered with 304 before anything is
+computed, and a dataset reload changes every ETag. Formats: JSON (gzip
+when accepted) or Arrow IPC stream (format=arrow).
+
+Points farther than one cell diagonal from every grid cell are off the
+grid: 404 for /risk/point and /fusion, null score / level rows in
+/risk/points.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+from .export import EXPORT_FORMATS, PRODUCTS, Exporter, export_filename
+from .fusion import fuse, fusion_level
+from .risk_cube import cube_index, ensure_cube
+from .risk_hotspots import detect_hotspots, summarize_hotspots
+from .risk_pyramid import pyramid_index
+from .risk_table import LEVEL_CATEGORIES
+from .risk_trends import trends_index
+from .risk_window import window_index
+from .sensor_rules import DEFAULT_RULESET, SENSOR_FIELDS, compute_sensor_score
+from .snapshot import get_snapshot_manager
+from .spatial_fusion import EARTH_RADIUS_KM, CellNeighbourIndex
+from .state_geometry import load_state_geometry
+from .utils import RISK_LEVELS
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATA_PATH = Path(os.getenv("NEXUS_DATA", BASE_DIR / "daily_risk.parquet"))
+STATES_PATH = Path(os.getenv("NEXUS_STATES", BASE_DIR / "data" / "germany_states.geojson"))
+DISTRICTS_PATH = Path(os.getenv("NEXUS_DISTRICTS", BASE_DIR / "data" / "germany_districts.geojson"))
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+CACHE_CONTROL = "public, max-age=60"
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+# bodies below this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+MAX_BATCH_POINTS = 10_000
+# points farther than this many cell diagonals from every cell centre are off the grid
+OFF_GRID_DIAGONALS = 1.0
+
+API_INDEXES = ("cube", "window", "cells", "pyramid", "trends")
+
+
+def snapshot():
+    mgr = get_snapshot_manager(DATA_PATH)
+    if not set(API_INDEXES) <= set(mgr.index_builders):
+        mgr.add_indexes({
+            "cube": cube_index(DATA_PATH),
+            "window": window_index(DATA_PATH),
+            "cells": cells_index(DATA_PATH),
+            "pyramid": pyramid_index(DATA_PATH, {
+                "district": DISTRICTS_PATH if DISTRICTS_PATH.exists() else None,
+                "state": STATES_PATH,
+            }),
+            "trends": trends_index(DATA_PATH, STATES_PATH),
+        })
+    return mgr.current()
+
+
+def require_index(snap, name: str):
+    idx = snap.indexes.get(name)
+    if idx is None:
+        raise HTTPException(503, f"Index {name!r} is being prepared; retry shortly", headers={"Retry-After": "10"})
+    return idx
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # first load builds the dataset and every registered index before serving
+    await run_in_threadpool(snapshot)
+    yield
+
+
+app = FastAPI(title="NEXUS risk API", lifespan=lifespan)
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """
+    "lon0,lat0,lon1,lat1" -> tuple (400 on anything else).
+    """
+    if not bbox:
+        return None
+    try:
+        lon0, lat0, lon1, lat1 = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(400, "bbox must be lon0,lat0,lon1,lat1")
+    if not np.isfinite([lon0, lat0, lon1, lat1]).all():
+        raise HTTPException(400, "bbox coordinates must be finite numbers")
+    if lon0 > lon1 or lat0 > lat1:
+        raise HTTPException(400, "bbox must be lon0,lat0,lon1,lat1 with lon0 <= lon1 and lat0 <= lat1")
+    return lon0, lat0, lon1, lat1
+
+
+def parse_date(value: Optional[str], name: str):
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value).normalize()
+    except ValueError:
+        raise HTTPException(400, f"{name} must be a date (YYYY-MM-DD)")
+
+
+def cube_day(cube, date: Optional[str]) -> Tuple[int, pd.Timestamp]:
+    """
+    Day offset in the cube for a date parameter (default: latest day).
+    """
+    d = parse_date(date, "date")
+    day = cube.n_days - 1 if d is None else cube.day_of(d)
+    if not 0 <= day < cube.n_days:
+        raise HTTPException(404, f"No data for {d.date()} (available {cube.date_of(0)} to {cube.date_of(cube.n_days - 1)})")
+    return day, pd.Timestamp(cube.date_of(day))
+
+
+def risk_levels(scores) -> np.ndarray:
+    # same lower-case level names as the dataset's risk_level column
+    return np.array(list(LEVEL_CATEGORIES) + [None], dtype=object)[RISK_LEVELS.codes(scores)]
+
+
+# --------------------------------------------------
+# Response cache + conditional requests
+# --------------------------------------------------
+class ResponseCache:
+    """
+    LRU of encoded bodies bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: bytes):
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            self._bytes -= len(old) if old is not None else 0
+            self._items[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, dropped = self._items.popitem(last=False)
+                self._bytes -= len(dropped)
+
+
+RESPONSES = ResponseCache()
+
+Payload = Union[pd.DataFrame, dict]
+
+
+def _json_default(v):
+    if isinstance(v, np.generic):
+        return v.item()
+    if isinstance(v, (pd.Timestamp,)):
+        return v.isoformat()
+    return str(v)
+
+
+def _records(df: pd.DataFrame) -> List[dict]:
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def encode(payload: Payload, fmt: str, meta: dict) -> bytes:
+    if fmt == "arrow":
+        df = payload if isinstance(payload, pd.DataFrame) else pd.DataFrame([payload])
+        for c in df.columns:
+            if isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = df[c].astype(object)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({f"nexus.{k}": str(v) for k, v in meta.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    body = {**meta, "rows": _records(payload)} if isinstance(payload, pd.DataFrame) else {**meta, **payload}
+    return json.dumps(body, default=_json_default, allow_nan=False).encode("utf-8")
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def cached_response(
+    request: Request,
+    route: str,
+    params: dict,
+    build: Callable[[], Tuple[Payload, dict]],
+    fmt: str = "json",
+    version: Optional[str] = None,
+) -> Response:
+    """
+    build() -> (payload, meta) runs only on a cache miss; the key is
+    (dataset version, route, params, format, encoding).
+    """
+    if fmt not in ("json", "arrow"):
+        raise HTTPException(400, "format must be json or arrow")
+    version = version or get_snapshot_manager(DATA_PATH).version
+    gz = "gzip" in request.headers.get("accept-encoding", "")
+    raw_key = json.dumps([version, route, params, fmt], sort_keys=True, default=str)
+    digest = hashlib.blake2b(raw_key.encode("utf-8"), digest_size=12).hexdigest()
+    etag_plain = f'"{digest}"'
+    etag = f'"{digest}-gz"' if gz else etag_plain
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding", "X-Dataset-Version": str(version)}
+
+    if request.method == "GET" and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = ARROW_MEDIA_TYPE if fmt == "arrow" else "application/json"
+    body = RESPONSES.get(etag)
+    if body is None:
+        # the gzip variant is derived from the cached plain body
+        plain = RESPONSES.get(etag_plain)
+        if plain is None:
+            payload, meta = build()
+            plain = encode(payload, fmt, {"version": version, **meta})
+            RESPONSES.put(etag_plain, plain)
+        body = gzip.compress(plain, compresslevel=5) if gz and len(plain) >= GZIP_MIN_BYTES else plain
+        if body is not plain:
+            RESPONSES.put(etag, body)
+    if body[:2] == b"\x1f\x8b":
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+# --------------------------------------------------
+# Risk queries
+# --------------------------------------------------
+class Point(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+
+
+class PointsRequest(BaseModel):
+    points: List[Point]
+    date: Optional[str] = None
+
+
+def cell_diagonal_km(lat, lon) -> float:
+    """
+    Diagonal of one grid cell (median row / column spacing), measured at
+    the row nearest the equator where cells are widest.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    dlat, dlon = (float(np.median(np.diff(np.unique(v)))) if len(np.unique(v)) > 1 else np.nan for v in (lat, lon))
+    if np.isnan(dlat) and np.isnan(dlon):
+        # a single cell: nothing to measure
+        return np.inf
+    # a single row / column: assume square cells
+    dlat, dlon = np.nan_to_num(dlat, nan=dlon), np.nan_to_num(dlon, nan=dlat)
+    km_per_deg = EARTH_RADIUS_KM * np.pi / 180.0
+    return float(np.hypot(dlat * km_per_deg, dlon * km_per_deg * np.cos(np.radians(np.abs(lat).min()))))
+
+
+class CellLookup:
+    """
+    Nearest grid cell for free coordinates. A point farther than
+    OFF_GRID_DIAGONALS cell diagonals from every cell centre is off the
+    grid and gets no score.
+    """
+
+    def __init__(self, lat, lon):
+        self.neighbours = CellNeighbourIndex(lat, lon)
+        self.max_km = OFF_GRID_DIAGONALS * cell_diagonal_km(lat, lon)
+
+    @classmethod
+    def from_cube(cls, cube) -> "CellLookup":
+        return cls(cube.lat, cube.lon)
+
+    def nearest(self, lat, lon) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (cell_idx, dist_km, on_grid) for each query point.
+        """
+        cells, dist = self.neighbours.nearest(lat, lon)
+        return cells, dist, dist <= self.max_km
+
+
+def cells_index(parquet_path):
+    """
+    Snapshot index builder: CellLookup over the cube's cells.
+    """
+    return lambda dataset: CellLookup.from_cube(ensure_cube(parquet_path, dataset=dataset))
+
+
+def points_frame(cells_idx: CellLookup, cube, day: int, lat, lon) -> pd.DataFrame:
+    """
+    Nearest-cell risk per point; off-grid points get a null score / level.
+    """
+    cells, dist, on_grid = cells_idx.nearest(lat, lon)
+    scores = np.where(on_grid, np.asarray(cube.data[cells, day], dtype=np.float64), np.nan)
+    return pd.DataFrame({
+        "lat": np.asarray(lat, dtype=np.float64),
+        "lon": np.asarray(lon, dtype=np.float64),
+        "cell_lat": cube.lat[cells].astype(np.float64).round(4),
+        "cell_lon": cube.lon[cells].astype(np.float64).round(4),
+        "distance_km": dist.round(3),
+        "risk_score": scores,
+        "risk_level": risk_levels(scores),
+    })
+
+
+def off_grid(cells_idx: CellLookup, lat: float, lon: float, dist_km: float) -> HTTPException:
+    return HTTPException(
+        404, f"({lat}, {lon}) is {dist_km:.0f} km from the nearest grid cell (limit {cells_idx.max_km:.0f} km)"
+    )
+
+
+@app.get("/risk/point")
+def risk_point(
+    request: Request,
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    date: Optional[str] = None,
+    format: str = "json",
+):
+    """
+    Risk of the grid cell nearest to (lat, lon) on a date (default: latest);
+    404 when the point is off the grid.
+    """
+    snap = snapshot()
+    cube = require_index(snap, "cube")
+    cells_idx = require_index(snap, "cells")
+    day, d = cube_day(cube, date)
+
+    def build():
+        row = points_frame(cells_idx, cube, day, [lat], [lon]).iloc[0]
+        if row["distance_km"] > cells_idx.max_km:
+            raise off_grid(cells_idx, lat, lon, row["distance_km"])
+        return {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items()}, {"date": d.date()}
+
+    return cached_response(request, "risk/point", {"lat": lat, "lon": lon, "day": day}, build, format, snap.version)
+
+
+@app.post("/risk/points")
+def risk_points(request: Request, body: PointsRequest, format: str = "json"):
+    """
+    Nearest-cell risk for up to MAX_BATCH_POINTS points in one call
+    (off-grid points: null risk_score / risk_level).
+    """
+    if len(body.points) > MAX_BATCH_POINTS:
+        raise HTTPException(413, f"At most {MAX_BATCH_POINTS} points per request")
+    snap = snapshot()
+    cube = require_index(snap, "cube")
+    cells_idx = require_index(snap, "cells")
+    day, d = cube_day(cube, body.date)
+    lat = np.array([p.lat for p in body.points], dtype=np.float64)
+    lon = np.array([p.lon for p in body.points], dtype=np.float64)
+
+    def build():
+        return points_frame(cells_idx, cube, day, lat, lon), {"date": d.date(), "count": len(lat)}
+
+    params = {"day": day, "points": hashlib.blake2b(lat.tobytes() + lon.tobytes(), digest_size=12).hexdigest()}
+    return cached_response(request, "risk/points", params, build, format, snap.version)
+
+
+@app.get("/grid")
+def grid(
+    request: Request,
+    date: Optional[str] = None,
+    bbox: Optional[str] = Query(None, description="lon0,lat0,lon1,lat1"),
+    level: Optional[str] = Query(None, description="only cells of this risk level"),
+    format: str = "json",
+):
+    """
+    All grid cells of one day (optionally inside a bbox / of one level).
+    """
+    snap = snapshot()
+    cube = require_index(snap, "cube")
+    window = require_index(snap, "window")
+    day, d = cube_day(cube, date)
+    box = parse_bbox(bbox)
+    if level is not None and level not in LEVEL_CATEGORIES:
+        raise HTTPException(400, f"level must be one of {', '.join(LEVEL_CATEGORIES)}")
+
+    def build():
+        cells = np.arange(cube.n_cells) if box is None else window.bbox_cells(box)
+        scores = np.asarray(cube.data[cells, day], dtype=np.float64)
+        df = pd.DataFrame({
+            "lat": cube.lat[cells].astype(np.float64).round(4),
+            "lon": cube.lon[cells].astype(np.float64).round(4),
+            "risk_score": scores,
+            "risk_level": risk_levels(scores),
+        })
+        df = df[df["risk_score"].notna()]
+        if level is not None:
+            df = df[df["risk_level"] == level]
+        return df.reset_index(drop=True), {"date": d.date(), "count": len(df)}
+
+    return cached_response(request, "grid", {"day": day, "bbox": box, "level": level}, build, format, snap.version)
+
+
+@app.get("/states")
+def states(
+    request: Request,
+    date: Optional[str] = None,
+    level: str = Query("state", description="state, district or country"),
+    threshold: float = Query(0.7, ge=0.0, le=1.0),
+    format: str = "json",
+):
+    """
+    Area-weighted aggregates per region (pyramid level); state rows also
+    carry the trend engine's delta / trend / slope / streak.
+    """
+    snap = snapshot()
+    cube = require_index(snap, "cube")
+    pyramid = require_index(snap, "pyramid")
+    day, d = cube_day(cube, date)
+    if level not in pyramid.levels:
+        raise HTTPException(400, f"level must be one of {', '.join(pyramid.level_names)}")
+
+    def build():
+        result = pyramid.day((snap.version, "api", day, threshold), scores=cube.data[:, day], threshold=threshold)
+        df = result[level].copy()
+        trends = snap.indexes.get("trends")
+        if level == "state" and trends is not None:
+            tf = trends.day_frame(d)
+            keep = ["NAME_1", "delta", "trend", f"slope_{trends.slope_window}d", "streak", "trend_text"]
+            df = df.merge(tf[keep].rename(columns={"NAME_1": "region"}), on="region", how="left")
+        return df, {"date": d.date(), "level": level, "threshold": threshold}
+
+    params = {"day": day, "level": level, "threshold": threshold}
+    return cached_response(request, "states", params, build, format, snap.version)
+
+
+@app.get("/hotspots")
+def hotspots(
+    request: Request,
+    date: Optional[str] = None,
+    bbox: Optional[str] = Query(None, description="lon0,lat0,lon1,lat1"),
+    threshold: float = Query(0.7, ge=0.0, le=1.0),
+    eps_km: float = Query(25.0, gt=0.0, le=200.0),
+    min_samples: int = Query(10, ge=1, le=500),
+    format: str = "json",
+):
+    """
+    High-risk clusters of one day, one row per cluster.
+    """
+    snap = snapshot()
+    cube = require_index(snap, "cube")
+    window = require_index(snap, "window")
+    day, d = cube_day(cube, date)
+    box = parse_bbox(bbox)
+
+    def build():
+        cells = np.arange(cube.n_cells) if box is None else window.bbox_cells(box)
+        df = pd.DataFrame({
+            "lat": cube.lat[cells].astype(np.float64),
+            "lon": cube.lon[cells].astype(np.float64),
+            "risk_score": np.asarray(cube.data[cells, day], dtype=np.float64),
+        })
+        out = summarize_hotspots(detect_hotspots(df, score_threshold=threshold, eps_km=eps_km, min_samples=min_samples))
+        return out, {"date": d.date(), "count": len(out)}
+
+    params = {"day": day, "bbox": box, "threshold": threshold, "eps_km": eps_km, "min_samples": min_samples}
+    return cached_response(request, "hotspots", params, build, format, snap.version)
+
+
+# --------------------------------------------------
+# Sensor fusion
+# --------------------------------------------------
+class SensorReading(BaseModel):
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+    sensor_score: Optional[float] = Field(None, ge=0, le=1)
+    pm25: Optional[float] = None
+    temp_c: Optional[float] = None
+    rh: Optional[float] = None
+
+
+class FusionRequest(BaseModel):
+    climate: Optional[float] = Field(None, ge=0, le=1, description="climate score; default: grid cell at lat / lon")
+    sensor: Optional[SensorReading] = None
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+    date: Optional[str] = None
+    profile: Optional[str] = None
+
+
+class GridFusionRequest(BaseModel):
+    sensors: List[SensorReading]
+    date: Optional[str] = None
+    bbox: Optional[str] = None
+    profile: Optional[str] = None
+    influenced_only: bool = True
+
+
+def sensor_score_of(r: Optional[SensorReading]) -> Optional[float]:
+    if r is None:
+        return None
+    if r.sensor_score is not None:
+        return float(r.sensor_score)
+    return compute_sensor_score(pm25=r.pm25, temp_c=r.temp_c, rh=r.rh)
+
+
+@app.post("/fusion")
+def fusion(body: FusionRequest):
+    """
+    Climate + sensor fusion for one location (Birdhouse rule set + fusion
+    profile); 404 when the climate score would come from an off-grid point.
+    """
+    snap = snapshot()
+    climate, d = body.climate, None
+    if climate is None:
+        if body.lat is None or body.lon is None:
+            raise HTTPException(400, "climate or lat / lon is required")
+        cube = require_index(snap, "cube")
+        cells_idx = require_index(snap, "cells")
+        day, d = cube_day(cube, body.date)
+        row = points_frame(cells_idx, cube, day, [body.lat], [body.lon]).iloc[0]
+        if row["distance_km"] > cells_idx.max_km:
+            raise off_grid(cells_idx, body.lat, body.lon, row["distance_km"])
+        climate = float(row["risk_score"])
+    sensor = sensor_score_of(body.sensor)
+    try:
+        fused = fuse(climate, sensor, profile=body.profile)
+        level = fusion_level(fused, profile=body.profile)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {
+        "version": snap.version,
+        "date": None if d is None else str(d.date()),
+        "climate_score": climate,
+        "sensor_score": sensor,
+        "fusion_score": fused,
+        "fusion_level": level,
+    }
+
+
+@app.post("/fusion/grid")
+def fusion_grid(request: Request, body: GridFusionRequest, format: str = "json"):
+    """
+    Spatial fusion of sensor readings into one day's grid (kernel-weighted,
+    see spatial_fusion.py); by default only cells a sensor influences.
+    """
+    snap = snapshot()
+    cube = require_index(snap, "cube")
+    window = require_index(snap, "window")
+    cells_idx = require_index(snap, "cells")
+    day, d = cube_day(cube, body.date)
+    box = parse_bbox(body.bbox)
+    sensors = pd.DataFrame([s.model_dump() for s in body.sensors]).dropna(subset=["lat", "lon"]) if body.sensors else pd.DataFrame()
+    if not sensors.empty:
+        scores = sensors["sensor_score"].astype(float)
+        missing = scores.isna()
+        if missing.any():
+            # same rule set as /fusion; a reading without any usable field is no reading
+            rule_scores, _, _, usable = DEFAULT_RULESET.evaluate(
+                *(sensors.loc[missing, c].astype(float).to_numpy() for c in SENSOR_FIELDS)
+            )
+            scores[missing] = np.where(usable, rule_scores, np.nan)
+        sensors["sensor_score"] = scores
+        sensors = sensors[scores.notna()]
+
+    def build():
+        cells = np.arange(cube.n_cells) if box is None else window.bbox_cells(box)
+        climate = np.clip(np.nan_to_num(np.asarray(cube.data[:, day], dtype=np.float64)), 0.0, 1.0)
+        if sensors.empty:
+            fused, influence, local = climate, np.zeros(cube.n_cells), np.full(cube.n_cells, np.nan)
+        else:
+            fused, influence, local = cells_idx.neighbours.fuse(
+                climate, sensors["lat"].to_numpy(), sensors["lon"].to_numpy(), sensors["sensor_score"].to_numpy(),
+                profile=body.profile,
+            )
+        if body.influenced_only:
+            cells = cells[influence[cells] > 0]
+        df = pd.DataFrame({
+            "lat": cube.lat[cells].astype(np.float64).round(4),
+            "lon": cube.lon[cells].astype(np.float64).round(4),
+            "risk_score": climate[cells],
+            "sensor_local": local[cells],
+            "sensor_influence": influence[cells].round(3),
+            "fused_score": fused[cells],
+        })
+        return df, {"date": d.date(), "sensors": len(sensors), "count": len(df)}
+
+    params = {"day": day, "bbox": box, "profile": body.profile, "all": not body.influenced_only,
+              "sensors": _records(sensors) if not sensors.empty else []}
+    try:
+        return cached_response(request, "fusion/grid", params, build, format, snap.version)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@app.get("/health")
+def health():
+    snap = snapshot()
+    return {"version": snap.version, "indexes": sorted(snap.indexes), "rows": len(snap.dataset)}
+
+
+# --------------------------------------------------
+# Export
+# --------------------------------------------------
+@app.get("/export/{product}")
+def export(
+    product: str,
+    format: str = Query("parquet"),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    bbox: Optional[str] = Query(None, description="lon0,lat0,lon1,lat1"),
+    threshold: float = Query(0.7, ge=0.0, le=1.0),
+):
+    """
+    Streamed download of one product; rows are encoded chunk by chunk while
+    the response is sent, the full result is never built in memory.
+    """
+    if product not in PRODUCTS:
+        raise HTTPException(404, f"Unknown product {product!r}; one of {', '.join(PRODUCTS)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(400, f"Unknown format {format!r}; one of {', '.join(EXPORT_FORMATS)}")
+
+    start, end = parse_date(start, "start"), parse_date(end, "end")
+    snap = snapshot()
+    trends = snap.indexes.get("trends")
+    if product in ("states", "alerts") and trends is None:
+        raise HTTPException(503, "State trends are being prepared; retry shortly", headers={"Retry-After": "10"})
+
+    options = {"threshold": threshold} if product in ("hotspots", "alerts") else {}
+    exporter = Exporter(snap.dataset, trends, load_state_geometry(STATES_PATH))
+    try:
+        chunks = exporter.stream(product, format, start=start, end=end, bbox=parse_bbox(bbox), **options)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    media_type, _ = EXPORT_FORMATS[format]
+    filename = export_filename(product, format, start, end)
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Dataset-Version": snap.version,
+        },
+    )
@@ -1,15 +1,30 @@
+from nexus_ai.risk_query import top_k_rows, top_states
+
+# consecutive rising days before a state gets a trend alert
+RISING_STREAK_ALERT = 3
+
+NO_ALERTS = "✅ No critical alerts for the selected date based on current thresholds."
+
+
 def generate_alerts(states_risk, hotspots):
     alerts = []
 
     if states_risk is not None and not states_risk.empty:
-        high_states = states_risk[states_risk["mean_risk"] > 0.7]["NAME_1"].tolist()
-        for s in high_states[:6]:
+        # worst first
+        high_states = top_states(states_risk[states_risk["mean_risk"] > 0.7], 6)["NAME_1"].tolist()
+        for s in high_states:
             alerts.append(f"🔴 High wildfire risk in **{s}** (mean_risk > 0.7).")
 
+        # sustained escalation from the trend engine (streak column)
+        if "streak" in states_risk.columns:
+            rising = top_k_rows(states_risk[states_risk["streak"] >= RISING_STREAK_ALERT], "streak", 4)
+            for _, row in rising.iterrows():
+                alerts.append(f"📈 Risk in **{row['NAME_1']}** rising {int(row['streak'])} days in a row.")
+
     if hotspots is not None and not hotspots.empty:
         alerts.append(f"🔥 **{hotspots['cluster'].nunique()} hotspots** detected (high-risk clusters).")
 
     if not alerts:
-        alerts.append("✅ No critical alerts for the selected date based on current thresholds.")
+        alerts.append(NO_ALERTS)
 
     return alerts
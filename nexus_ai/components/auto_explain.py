@@ -1,21 +1,25 @@
+from nexus_ai.risk_query import top_k_rows, top_states
+
+
 def generate_risk_explanation(selected_date, states_trend, hotspots, alerts):
     lines = []
     lines.append(f"📅 **Date:** {selected_date}")
 
     if states_trend is not None and not states_trend.empty:
-        top = states_trend.sort_values("mean_risk", ascending=False).head(3)
+        top = top_states(states_trend, 3)
         names = ", ".join(top["NAME_1"].tolist())
         avg_top = float(top["mean_risk"].mean())
         lines.append(f"🏛️ **Top risk states:** {names} (avg ≈ {avg_top:.2f}).")
 
-        inc = states_trend[states_trend["trend"].str.contains("↑", na=False)]
+        trend = states_trend["trend"].astype(str)
+        inc = states_trend[trend == "increasing"]
         if not inc.empty:
-            inc_names = ", ".join(inc.sort_values("delta", ascending=False).head(4)["NAME_1"].tolist())
+            inc_names = ", ".join(top_k_rows(inc, "delta", 4)["NAME_1"].tolist())
             lines.append(f"📈 **Increasing trend** in: {inc_names}.")
 
-        dec = states_trend[states_trend["trend"].str.contains("↓", na=False)]
+        dec = states_trend[trend == "decreasing"]
         if not dec.empty:
-            dec_names = ", ".join(dec.sort_values("delta").head(4)["NAME_1"].tolist())
+            dec_names = ", ".join(top_k_rows(dec, "delta", 4, largest=False)["NAME_1"].tolist())
             lines.append(f"📉 **Decreasing trend** in: {dec_names}.")
 
         overall = float(states_trend["mean_risk"].mean())
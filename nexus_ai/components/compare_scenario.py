@@ -3,8 +3,19 @@ import pydeck as pdk
 import pandas as pd
 import numpy as np
 
+from nexus_ai.utils import DELTA_LEVELS
+
 DARK_STYLE = "https://basemaps.cartocdn.com/gl/dark-matter-gl-style/style.json"
 
+# colors per DELTA_LEVELS bin
+DELTA_COLORS = (
+    [0, 180, 0, 160],      # much better
+    [120, 200, 0, 160],    # better
+    [150, 150, 150, 120],  # similar
+    [255, 120, 0, 160],    # worse
+    [200, 0, 0, 180],      # much worse
+)
+
 
 def render_compare_map(real_df: pd.DataFrame, scenario_df: pd.DataFrame):
     """
@@ -37,19 +48,7 @@ def render_compare_map(real_df: pd.DataFrame, scenario_df: pd.DataFrame):
     # ------------------------------------------------------------
     df["delta"] = df["scenario_risk"] - df["risk_score"]
 
-    def delta_color(d):
-        if d > 0.2:
-            return [200, 0, 0, 180]      # much worse
-        elif d > 0.05:
-            return [255, 120, 0, 160]    # worse
-        elif d < -0.2:
-            return [0, 180, 0, 160]      # much better
-        elif d < -0.05:
-            return [120, 200, 0, 160]    # better
-        else:
-            return [150, 150, 150, 120]  # similar
-
-    df["color"] = df["delta"].apply(delta_color)
+    df["color"] = DELTA_LEVELS.lookup(df["delta"], DELTA_COLORS, default=DELTA_COLORS[2])
     df["radius"] = np.clip(np.abs(df["delta"]), 0, 1) * 9000 + 3000
 
     # ------------------------------------------------------------
@@ -1,23 +1,13 @@
-def compute_fusion_score(climate_score: float, sensor_score: float | None):
+from nexus_ai.fusion import fuse, fusion_level as _fusion_level
+
+
+def compute_fusion_score(climate_score, sensor_score=None, profile=None):
     """
     Combine climate (ERA5) risk with sensor-based risk into one final score
+    (scalars or arrays; see nexus_ai.fusion for the weight profiles)
     """
-    if sensor_score is None:
-        return climate_score
-
-    climate_score = float(climate_score)
-    sensor_score = float(sensor_score)
-
-    fusion = 0.6 * climate_score + 0.4 * sensor_score
-    return round(min(fusion, 1.0), 2)
+    return fuse(climate_score, sensor_score, profile=profile)
 
 
-def fusion_level(score: float):
-    if score < 0.3:
-        return "Low"
-    elif score < 0.55:
-        return "Moderate"
-    elif score < 0.75:
-        return "High"
-    else:
-        return "Critical"
+def fusion_level(score, profile=None):
+    return _fusion_level(score, profile=profile)
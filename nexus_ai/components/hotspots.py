@@ -1,35 +1,10 @@
 import streamlit as st
 import pydeck as pdk
-import numpy as np
-from sklearn.cluster import DBSCAN
 
-DARK_STYLE = "https://basemaps.cartocdn.com/gl/dark-matter-gl-style/style.json"
-
-
-def detect_hotspots(df, score_threshold=0.7, eps_km=25, min_samples=10):
-    if df.empty:
-        return df.iloc[0:0].copy()
+# detection lives in risk_hotspots (no streamlit); re-exported for the pages
+from ..risk_hotspots import detect_hotspots, summarize_hotspots
 
-    lat_col = next((c for c in df.columns if c.lower() in ["lat", "latitude"]), None)
-    lon_col = next((c for c in df.columns if c.lower() in ["lon", "long", "longitude"]), None)
-    if lat_col is None or lon_col is None:
-        raise ValueError("Latitude/Longitude columns not found in df.")
-    if "risk_score" not in df.columns:
-        raise ValueError("Column 'risk_score' not found in df.")
-
-    dfh = df[df["risk_score"] >= score_threshold].dropna(subset=[lat_col, lon_col]).copy()
-    if dfh.empty:
-        return dfh
-
-    # km -> degrees (approx): 1 deg ~ 111 km
-    eps_deg = eps_km / 111.0
-
-    coords = dfh[[lat_col, lon_col]].to_numpy()
-    labels = DBSCAN(eps=eps_deg, min_samples=min_samples).fit_predict(coords)
-    dfh["cluster"] = labels
-
-    dfh = dfh[dfh["cluster"] != -1].copy()
-    return dfh
+DARK_STYLE = "https://basemaps.cartocdn.com/gl/dark-matter-gl-style/style.json"
 
 
 def render_hotspots(df):
@@ -28,10 +28,34 @@ def _find_lat_lon(df: pd.DataFrame):
     return lat_col, lon_col
 
 
+def bbox_view_state(bbox, pitch=0):
+    # center and zoom on (min_lon, min_lat, max_lon, max_lat)
+    min_lon, min_lat, max_lon, max_lat = bbox
+    span = max(max_lon - min_lon, (max_lat - min_lat) * 1.6, 0.05)
+    return pdk.ViewState(
+        latitude=(min_lat + max_lat) / 2,
+        longitude=(min_lon + max_lon) / 2,
+        zoom=float(np.clip(np.log2(360.0 / span) - 0.3, 4.0, 11.0)),
+        pitch=pitch,
+    )
+
+
+def _view_state(df: pd.DataFrame, lat_col, lon_col, zoom, pitch, bbox=None):
+    # center on the selected window if given, else on the points
+    if bbox is not None:
+        return bbox_view_state(bbox, pitch=pitch)
+    return pdk.ViewState(
+        latitude=float(df[lat_col].mean()),
+        longitude=float(df[lon_col].mean()),
+        zoom=zoom,
+        pitch=pitch,
+    )
+
+
 # ==================================================
 # POINT MAP
 # ==================================================
-def render_point_risk_map(df: pd.DataFrame, date_label):
+def render_point_risk_map(df: pd.DataFrame, date_label, bbox=None):
     if df.empty:
         st.warning("⚠️ No data available.")
         return
@@ -76,12 +100,7 @@ def render_point_risk_map(df: pd.DataFrame, date_label):
         opacity=0.85,
     )
 
-    view_state = pdk.ViewState(
-        latitude=float(df[lat_col].mean()),
-        longitude=float(df[lon_col].mean()),
-        zoom=5.3,
-        pitch=0,
-    )
+    view_state = _view_state(df, lat_col, lon_col, zoom=5.3, pitch=0, bbox=bbox)
 
     deck = pdk.Deck(
         layers=[layer],
@@ -103,7 +122,7 @@ def render_point_risk_map(df: pd.DataFrame, date_label):
 # ==================================================
 # HEX MAP (FIXED VERSION)
 # ==================================================
-def render_hex_risk_map(df: pd.DataFrame, date_label):
+def render_hex_risk_map(df: pd.DataFrame, date_label, bbox=None):
     if df.empty:
         st.warning("⚠️ No data available.")
         return
@@ -133,12 +152,7 @@ def render_hex_risk_map(df: pd.DataFrame, date_label):
     # =========================
     # View state
     # =========================
-    view_state = pdk.ViewState(
-        latitude=float(df_hex[lat_col].mean()),
-        longitude=float(df_hex[lon_col].mean()),
-        zoom=6.0,
-        pitch=40,
-    )
+    view_state = _view_state(df_hex, lat_col, lon_col, zoom=6.0, pitch=40, bbox=bbox)
 
     # =========================
     # Hexagon layer
@@ -1,32 +1,29 @@
 import pandas as pd
 
+from nexus_ai.sensor_store import SensorRingStore, latest_readings
 
-def generate_sensor_alerts(df_sensors: pd.DataFrame):
+
+def generate_sensor_alerts(df_sensors):
     """
     Generates human-readable alerts based on Birdhouse sensor signals.
     This layer acts as a local confirmation / escalation logic.
+    Accepts a readings DataFrame or a SensorRingStore (O(devices) latest lookup).
     """
 
     alerts = []
 
-    if df_sensors is None or df_sensors.empty:
+    if df_sensors is None:
+        return alerts
+    if not isinstance(df_sensors, SensorRingStore) and df_sensors.empty:
         return alerts
 
+    # Use latest reading per device
+    df_latest = latest_readings(df_sensors)
+
     # Ensure numeric
     for c in ["pm25", "temp_c", "rh"]:
-        if c in df_sensors.columns:
-            df_sensors[c] = pd.to_numeric(df_sensors[c], errors="coerce")
-
-    # Use latest reading per device
-    if "timestamp_utc" in df_sensors.columns:
-        df_latest = (
-            df_sensors
-            .sort_values("timestamp_utc")
-            .groupby("device_id", as_index=False)
-            .tail(1)
-        )
-    else:
-        df_latest = df_sensors.copy()
+        if c in df_latest.columns:
+            df_latest[c] = pd.to_numeric(df_latest[c], errors="coerce")
 
     # --------------------------------------------------
     # Rule-based alerts (explainable & operational)
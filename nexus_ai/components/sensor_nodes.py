@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import pydeck as pdk
 
+from nexus_ai.sensor_store import SensorRingStore, latest_readings
+from nexus_ai.sensor_rollups import SensorRollups
+from nexus_ai.device_health import DeviceHealthMonitor
+
 
 # ============================================================
 # Load sensor CSV
@@ -34,30 +38,49 @@ def load_sensor_data(csv_path: str) -> pd.DataFrame:
 
 
 # ============================================================
-# Render sensor node map
+# Sensor ring-buffer store (shared across sessions)
 # ============================================================
-def render_sensor_nodes_map(df: pd.DataFrame):
+@st.cache_resource(show_spinner=False)
+def load_sensor_store(csv_path: str, mtime: float | None = None, capacity: int = 288) -> SensorRingStore:
     """
-    Displays Birdhouse nodes on a map with basic health tooltip.
+    Builds the per-device ring-buffer store from the sensor CSV once per
+    file version (pass the file mtime so a rewritten CSV is re-ingested).
     """
+    return SensorRingStore.from_frame(load_sensor_data(csv_path), capacity=capacity)
 
-    if df.empty:
-        st.info("No sensor nodes available.")
-        return
 
-    # Ensure required columns
-    if not {"lat", "lon"}.issubset(df.columns):
-        st.warning("Sensor data missing lat/lon.")
-        return
+@st.cache_resource(show_spinner=False)
+def load_sensor_rollups(csv_path: str, mtime: float | None = None) -> SensorRollups:
+    """
+    1-minute / 1-hour / 1-day aggregates per device for trend charts.
+    """
+    rollups = SensorRollups()
+    rollups.ingest(load_sensor_data(csv_path))
+    return rollups
 
-    # Aggregate per device (latest reading)
-    if "timestamp_utc" in df.columns:
-        df = (
-            df.sort_values("timestamp_utc")
-            .groupby("device_id", as_index=False)
-            .tail(1)
-        )
 
+@st.cache_resource(show_spinner=False)
+def load_device_health(csv_path: str, mtime: float | None = None) -> DeviceHealthMonitor:
+    """
+    Streaming battery / RSSI / reporting-interval health per node.
+    The CSV is a logged feed, so snapshot() judges silence at its newest
+    reading (pass now= for a live feed).
+    """
+    monitor = DeviceHealthMonitor()
+    monitor.update_frame(load_sensor_data(csv_path))
+    return monitor
+
+
+HEALTH_COLORS = {"OK": [34, 197, 94], "Warning": [250, 204, 21], "Offline": [239, 68, 68], "Unknown": [148, 163, 184]}
+
+
+# ============================================================
+# Render sensor node map
+# ============================================================
+def build_sensor_nodes_deck(df: pd.DataFrame) -> pdk.Deck:
+    """
+    pydeck Deck for the latest reading per node (df must have lat/lon).
+    """
     # Tooltip fields
     tooltip_fields = {
         "html": """
@@ -71,6 +94,16 @@ def render_sensor_nodes_map(df: pd.DataFrame):
         "style": {"backgroundColor": "#111", "color": "white"}
     }
 
+    # Color by streaming health status when available
+    fill_color = "[255, 80, 80]"
+    if "health_status" in df.columns:
+        df = df.copy()
+        df["color"] = df["health_status"].map(HEALTH_COLORS).apply(
+            lambda c: c if isinstance(c, list) else [255, 80, 80]
+        )
+        fill_color = "color"
+        tooltip_fields["html"] += "Health: {health_status}"
+
     layer = pdk.Layer(
         "ScatterplotLayer",
         data=df,
@@ -78,7 +111,7 @@ def render_sensor_nodes_map(df: pd.DataFrame):
         get_radius=120,
         pickable=True,
         auto_highlight=True,
-        get_fill_color="[255, 80, 80]",
+        get_fill_color=fill_color,
     )
 
     view = pdk.ViewState(
@@ -88,11 +121,30 @@ def render_sensor_nodes_map(df: pd.DataFrame):
         pitch=0,
     )
 
-    deck = pdk.Deck(
+    return pdk.Deck(
         layers=[layer],
         initial_view_state=view,
         map_style="mapbox://styles/mapbox/dark-v10",
         tooltip=tooltip_fields,
     )
 
-    st.pydeck_chart(deck, use_container_width=True)
+
+def render_sensor_nodes_map(df):
+    """
+    Displays Birdhouse nodes on a map with basic health tooltip.
+    Accepts a readings DataFrame or a SensorRingStore.
+    """
+
+    # Aggregate per device (latest reading)
+    df = latest_readings(df)
+
+    if df.empty:
+        st.info("No sensor nodes available.")
+        return
+
+    # Ensure required columns
+    if not {"lat", "lon"}.issubset(df.columns):
+        st.warning("Sensor data missing lat/lon.")
+        return
+
+    st.pydeck_chart(build_sensor_nodes_deck(df), use_container_width=True)
@@ -1,43 +1,29 @@
 import streamlit as st
-import geopandas as gpd
 import pydeck as pdk
 
-DARK_STYLE = "https://basemaps.cartocdn.com/gl/dark-matter-gl-style/style.json"
-
-
-@st.cache_data(show_spinner=False)
-def load_states(states_path):
-    gdf = gpd.read_file(states_path)
-
-    candidates = [
-        "NAME_1", "name", "NAME", "state", "STATE",
-        "VARNAME_1", "NL_NAME_1", "NAME_EN"
-    ]
+try:
+    import geopandas as gpd
+except ImportError:  # prebuilt geometry + zonal weights work without it
+    gpd = None
 
-    found = None
-    for c in candidates:
-        if c in gdf.columns:
-            found = c
-            break
+from nexus_ai.components.maps import bbox_view_state
+from nexus_ai.state_geometry import load_state_geometry
+from nexus_ai.zonal import zonal_weights
 
-    if found is None:
-        raise ValueError(
-            f"State name column not found. Available columns: {list(gdf.columns)}"
-        )
-
-    if found != "NAME_1":
-        gdf = gdf.rename(columns={found: "NAME_1"})
+DARK_STYLE = "https://basemaps.cartocdn.com/gl/dark-matter-gl-style/style.json"
 
-    # Ensure CRS is WGS84
-    if gdf.crs is None:
-        gdf = gdf.set_crs("EPSG:4326")
-    else:
-        gdf = gdf.to_crs("EPSG:4326")
 
-    return gdf
+@st.cache_resource(show_spinner=False)
+def load_states(states_path):
+    # prebuilt binary geometry (NAME_1, WGS84, exact tolerance); built once
+    # from the GeoJSON by nexus_ai.state_geometry if missing or stale
+    df = load_state_geometry(states_path).frame(0.0)
+    if gpd is None:
+        return df
+    return gpd.GeoDataFrame(df, geometry="geometry", crs="EPSG:4326")
 
 
-def compute_state_risk(df, states_gdf):
+def compute_state_risk(df, states_gdf, threshold=0.7, grid=None):
     lat_col = next((c for c in df.columns if c.lower() in ["lat", "latitude"]), None)
     lon_col = next((c for c in df.columns if c.lower() in ["lon", "long", "longitude"]), None)
 
@@ -46,57 +32,54 @@ def compute_state_risk(df, states_gdf):
     if "risk_score" not in df.columns:
         raise ValueError("Column 'risk_score' not found in df.")
 
-    gdf_pts = gpd.GeoDataFrame(
-        df.copy(),
-        geometry=gpd.points_from_xy(df[lon_col], df[lat_col]),
-        crs="EPSG:4326"
-    )
-
-    joined = gpd.sjoin(
-        gdf_pts,
-        states_gdf[["NAME_1", "geometry"]],
-        how="inner",
-        predicate="within"
-    )
-
-    agg = (
-        joined
-        .groupby("NAME_1")
-        .agg(
-            mean_risk=("risk_score", "mean"),
-            max_risk=("risk_score", "max"),
-            cells=("risk_score", "count"),
-        )
-        .reset_index()
-    )
+    # fractional cell/state overlap, computed once per grid and cached;
+    # pass grid=(lat, lon) of the full grid to reuse it across filtered frames
+    regions = dict(zip(states_gdf["NAME_1"], states_gdf.geometry))
+    g_lat, g_lon = grid if grid is not None else (df[lat_col].to_numpy(), df[lon_col].to_numpy())
+    weights = zonal_weights(g_lat, g_lon, regions)
+    agg = weights.stats(df, threshold=threshold)
 
+    # states without any data in df stay NaN (not 0 risk)
     out = states_gdf.merge(agg, on="NAME_1", how="left")
-    out["mean_risk"] = out["mean_risk"].fillna(0.0)
-    out["max_risk"] = out["max_risk"].fillna(0.0)
     out["cells"] = out["cells"].fillna(0).astype(int)
 
     return out
 
 
-def render_state_risk_map(states_gdf):
+def render_state_risk_map(states_gdf, geometry=None, bbox=None):
     if states_gdf.empty:
         st.warning("No state data to render.")
         return
 
+    # grey for states without data
+    states_gdf = states_gdf.copy()
+    r = states_gdf["mean_risk"]
+    states_gdf["fill_color"] = [
+        [int(255 * v), 60, int(255 * (1 - v))] if v == v else [120, 120, 120] for v in r
+    ]
+
+    view = pdk.ViewState(latitude=51.0, longitude=10.0, zoom=5.3) if bbox is None else bbox_view_state(bbox)
+
+    # simplified geometry for the zoom level (StateGeometry) instead of the
+    # full-resolution polygons
+    if geometry is not None:
+        data = geometry.feature_collection(states_gdf, zoom=view.zoom)
+        fill = "properties.fill_color"
+    else:
+        data, fill = states_gdf, "fill_color"
+
     layer = pdk.Layer(
         "GeoJsonLayer",
-        states_gdf,
+        data,
         pickable=True,
         opacity=0.55,
         stroked=True,
         filled=True,
         get_line_color=[220, 220, 220],
         get_line_width=80,
-        get_fill_color="[255 * mean_risk, 60, 255 * (1 - mean_risk)]",
+        get_fill_color=fill,
     )
 
-    view = pdk.ViewState(latitude=51.0, longitude=10.0, zoom=5.3)
-
     deck = pdk.Deck(
         layers=[layer],
         initial_view_state=view,
@@ -106,6 +89,7 @@ def render_state_risk_map(states_gdf):
             <b>{NAME_1}</b><br/>
             Mean risk: {mean_risk}<br/>
             Max risk: {max_risk}<br/>
+            Area ≥ threshold: {share_above}<br/>
             Cells: {cells}
             """,
             "style": {"backgroundColor": "#111", "color": "white"},
@@ -1,6 +1,9 @@
 import pandas as pd
 from typing import Optional
 
+# shared with the archive-wide trend engine
+from nexus_ai.utils import TREND_LEVELS
+
 
 def compute_state_trend(
     today_states: pd.DataFrame,
@@ -46,13 +49,6 @@ def compute_state_trend(
     merged["delta"] = merged["mean_risk"] - merged["mean_risk_yesterday"]
 
     # Trend classification
-    def label_trend(d: float) -> str:
-        if d > 0.05:
-            return "increasing"
-        if d < -0.05:
-            return "decreasing"
-        return "stable"
-
-    merged["trend"] = merged["delta"].apply(label_trend)
+    merged["trend"] = TREND_LEVELS.classify(merged["delta"])
 
     return merged
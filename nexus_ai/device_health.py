@@ -0,0 +1,272 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from nexus_ai.sensor_store import _NO_TS, _to_ns
+
+_NS_PER_S = 1_000_000_000
+
+
+@dataclass(frozen=True)
+class HealthConfig:
+    alpha: float = 0.2                 # weight of the newest reading (fast EWMA)
+    alpha_slow: float = 0.02           # long-term baseline EWMA
+    min_samples: int = 5               # no drain/link flags before this many readings
+    battery_low_v: float = 3.5
+    drain_v_per_h: float = 0.03        # sustained discharge faster than this = drain
+    battery_drop_z: float = -4.0       # sudden voltage drop vs. recent mean
+    rssi_weak_dbm: float = -115.0
+    rssi_drop_db: float = 8.0          # fast RSSI mean this far below baseline = degraded
+    silent_factor: float = 3.0         # no report for factor x usual interval = silent
+    min_interval_s: float = 60.0       # floor for the learned / configured interval
+
+
+HEALTH_CONFIG = HealthConfig()
+
+_STATE = (
+    "n", "last_ts",
+    "batt_mean", "batt_var", "batt_slope",
+    "rssi_mean", "rssi_var", "rssi_base",
+    "int_mean", "int_var",
+    "batt_z", "expected_s",
+)
+
+
+class DeviceHealthMonitor:
+    """
+    Streaming device health with constant memory per device.
+
+    For battery voltage, RSSI and the reporting interval it keeps an
+    exponentially weighted mean/variance (plus a slow RSSI baseline and an
+    EW battery slope), so every reading is an O(1) update and fleet health
+    never needs a pass over history.
+
+    A node is only judged silent once its reporting interval is known: two
+    readings, or an entry in expected_interval_s ({device_id: seconds}).
+    Until then its status is "Unknown" (unless drain / link already warn).
+
+    Silence is a gap up to `now` in snapshot(). Without one it is the
+    fleet's newest reading (watermark), which suits replayed / logged data
+    but cannot see the whole fleet going quiet; live callers should pass
+    the wall clock.
+    """
+
+    def __init__(self, config: HealthConfig = HEALTH_CONFIG, expected_interval_s: Optional[Dict[str, float]] = None):
+        self.config = config
+        self.expected_interval_s = {str(k): float(v) for k, v in (expected_interval_s or {}).items()}
+        self._dev_index: Dict[str, int] = {}
+        self._device_ids: List[str] = []
+        self._cap = 0
+        for name in _STATE:
+            setattr(self, "_" + name, np.zeros(0))
+        self.watermark_ns = _NO_TS
+
+    def __len__(self) -> int:
+        return len(self._device_ids)
+
+    def _rows_for(self, device_ids) -> np.ndarray:
+        codes, uniques = pd.factorize(pd.Series(device_ids, dtype=object).astype(str))
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        for i, d in enumerate(uniques):
+            row = self._dev_index.get(d)
+            if row is None:
+                row = len(self._device_ids)
+                self._dev_index[d] = row
+                self._device_ids.append(d)
+            lookup[i] = row
+
+        need = len(self._device_ids)
+        if need > self._cap:
+            new_cap = max(need, 2 * self._cap, 16)
+            for name in _STATE:
+                old = getattr(self, "_" + name)
+                fill = _NO_TS if name == "last_ts" else (np.nan if name not in ("n",) else 0)
+                arr = np.full(new_cap, fill, dtype=np.int64 if name in ("n", "last_ts") else np.float64)
+                arr[: len(old)] = old
+                setattr(self, "_" + name, arr)
+            self._cap = new_cap
+        for d in uniques:
+            if d in self.expected_interval_s:
+                self._expected_s[self._dev_index[d]] = self.expected_interval_s[d]
+        return lookup[codes]
+
+    def set_expected_interval(self, device_id: str, seconds: Optional[float]):
+        """
+        Configured reporting interval for one node (None: learn it from readings).
+        """
+        device_id = str(device_id)
+        if seconds is None:
+            self.expected_interval_s.pop(device_id, None)
+        else:
+            self.expected_interval_s[device_id] = float(seconds)
+        row = self._dev_index.get(device_id)
+        if row is not None:
+            self._expected_s[row] = np.nan if seconds is None else float(seconds)
+
+    # --------------------------------------------------
+    # Updates
+    # --------------------------------------------------
+    def update(self, device_id: str, timestamp_utc, battery_v=None, rssi=None):
+        """
+        Single reading, O(1).
+        """
+        self.update_frame(pd.DataFrame([{
+            "device_id": device_id, "timestamp_utc": timestamp_utc,
+            "battery_v": battery_v, "rssi": rssi,
+        }]))
+
+    def update_frame(self, df: pd.DataFrame):
+        """
+        Batch of readings. Applied in time order; readings of different
+        devices are updated together, one round per reading-per-device.
+        Rounds are contiguous slices after one sort, so a burst from one
+        device costs O(readings), not O(readings x rounds).
+        """
+        if df is None or df.empty:
+            return
+        if not {"device_id", "timestamp_utc"}.issubset(df.columns):
+            raise ValueError("Sensor readings must contain 'device_id' and 'timestamp_utc'.")
+
+        ts = _to_ns(df["timestamp_utc"])
+        ok = ts != _NO_TS
+        if not ok.any():
+            return
+        rows = self._rows_for(df["device_id"].to_numpy()[ok])
+        ts = ts[ok]
+        batt = _col(df, "battery_v")[ok]
+        rssi = _col(df, "rssi")[ok]
+
+        order = np.lexsort((ts, rows))
+        rows, ts, batt, rssi = rows[order], ts[order], batt[order], rssi[order]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        counts = np.diff(np.r_[starts, len(rows)])
+        seq = np.arange(len(rows)) - np.repeat(starts, counts)
+
+        # round k = every device's k-th reading
+        by_round = np.lexsort((rows, seq))
+        rows, ts, batt, rssi, seq = rows[by_round], ts[by_round], batt[by_round], rssi[by_round], seq[by_round]
+        bounds = np.searchsorted(seq, np.arange(int(seq[-1]) + 2))
+        for k0, k1 in zip(bounds[:-1], bounds[1:]):
+            self._step(rows[k0:k1], ts[k0:k1], batt[k0:k1], rssi[k0:k1])
+
+        self.watermark_ns = max(self.watermark_ns, int(ts.max()))
+
+    def _step(self, r: np.ndarray, ts: np.ndarray, batt: np.ndarray, rssi: np.ndarray):
+        """
+        One reading for each device in r (devices are unique here).
+        """
+        c = self.config
+        a, a_slow = c.alpha, c.alpha_slow
+
+        # drop late / duplicate readings
+        fresh = ts > self._last_ts[r]
+        r, ts, batt, rssi = r[fresh], ts[fresh], batt[fresh], rssi[fresh]
+        if not len(r):
+            return
+
+        first = self._n[r] == 0
+        dt_s = np.where(first, np.nan, (ts - self._last_ts[r]) / _NS_PER_S)
+
+        # reporting interval
+        _ew_update(self._int_mean, self._int_var, r, dt_s, a)
+
+        # battery: z-score vs. recent mean (before update), then a slow EW
+        # slope (V/h) of the smoothed mean so sensor noise does not read as drain
+        has_b = ~np.isnan(batt)
+        prev_mean = self._batt_mean[r].copy()
+        sd = np.sqrt(self._batt_var[r])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (batt - prev_mean) / np.where(sd > 1e-3, sd, 1e-3)
+        self._batt_z[r] = np.where(has_b, z, self._batt_z[r])
+        _ew_update(self._batt_mean, self._batt_var, r, batt, a)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = (self._batt_mean[r] - prev_mean) / (dt_s / 3600.0)
+        _ew_update(self._batt_slope, None, r, np.where(np.isfinite(slope), slope, np.nan), a_slow)
+
+        # RSSI: fast EWMA vs. slow baseline
+        _ew_update(self._rssi_mean, self._rssi_var, r, rssi, a)
+        _ew_update(self._rssi_base, None, r, rssi, a_slow)
+
+        self._n[r] += 1
+        self._last_ts[r] = ts
+
+    # --------------------------------------------------
+    # Fleet snapshot
+    # --------------------------------------------------
+    def snapshot(self, now=None) -> pd.DataFrame:
+        """
+        Current health per device, O(devices).
+        `now` (timestamp; wall clock for live feeds) defaults to the newest
+        reading seen by the fleet, so a fleet that stopped reporting as a
+        whole is only flagged when `now` is given.
+        """
+        c = self.config
+        n = len(self._device_ids)
+        now_ns = self.watermark_ns if now is None else int(_to_ns([now], missing_ok=False)[0])
+
+        cnt = self._n[:n]
+        warm = cnt >= c.min_samples
+        batt = self._batt_mean[:n]
+        slope = self._batt_slope[:n]
+        rssi = self._rssi_mean[:n]
+        base = self._rssi_base[:n]
+        interval = self._int_mean[:n]
+        gap_s = (now_ns - self._last_ts[:n]) / _NS_PER_S
+
+        # configured interval first, else the learned one (needs >= 2 readings)
+        expected = np.where(np.isnan(self._expected_s[:n]), interval, self._expected_s[:n])
+        known = ~np.isnan(expected)
+
+        with np.errstate(invalid="ignore"):
+            drain = (batt < c.battery_low_v) | (warm & ((slope < -c.drain_v_per_h) | (self._batt_z[:n] < c.battery_drop_z)))
+            link = (rssi < c.rssi_weak_dbm) | (warm & (rssi < base - c.rssi_drop_db))
+            silent = known & (gap_s > c.silent_factor * np.fmax(expected, c.min_interval_s))
+
+        status = np.where(
+            silent, "Offline",
+            np.where(drain | link, "Warning", np.where(known, "OK", "Unknown")),
+        )
+
+        return pd.DataFrame({
+            "device_id": self._device_ids,
+            "last_seen": pd.to_datetime(self._last_ts[:n], utc=True),
+            "readings": cnt,
+            "battery_v_ewm": batt.round(3),
+            "battery_slope_v_h": slope.round(4),
+            "rssi_ewm": rssi.round(1),
+            "rssi_baseline": base.round(1),
+            "interval_s_ewm": interval.round(0),
+            "drain": drain,
+            "link_degraded": link,
+            "silent": silent,
+            "health_status": status,
+        })
+
+
+def _ew_update(mean: np.ndarray, var: Optional[np.ndarray], r: np.ndarray, x: np.ndarray, a: float):
+    """
+    In-place EW mean/variance update for rows r (NaN x = no observation).
+    """
+    has = ~np.isnan(x)
+    if not has.any():
+        return
+    r, x = r[has], x[has]
+    m = mean[r]
+    init = np.isnan(m)
+    delta = np.where(init, 0.0, x - m)
+    mean[r] = np.where(init, x, m + a * delta)
+    if var is not None:
+        v = np.where(np.isnan(var[r]), 0.0, var[r])
+        var[r] = np.where(init, 0.0, (1 - a) * (v + a * delta * delta))
+
+
+def _col(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+
+
+HEALTH_ICONS = {"OK": "🟢", "Warning": "🟡", "Offline": "🔴", "Unknown": "⚪"}
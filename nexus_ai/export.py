@@ -0,0 +1,422 @@
+"""
+Streaming export of the daily products to Parquet, GeoJSON lines and CSV.
+
+Products:
+    grid      one row per cell and day (date, lat, lon, risk_score, risk_level)
+    states    one row per state and day from the trend engine
+    hotspots  one row per hotspot cluster and day
+    alerts    one row per alert text and day
+
+Every product is produced as a sequence of Arrow record batches (at most
+`chunk_rows` rows, read day by day from the memory-mapped dataset) and every
+format is written batch by batch, so an export of the whole archive never
+holds more than one chunk in memory. Parquet gets one row group per chunk;
+GeoJSON lines are one Feature per line (RFC 8142 without the record
+separator), CSV has one header.
+
+    python -m nexus_ai.export grid --format parquet --start 2024-06-01 --end 2024-08-31 \\
+        --bbox 9.5 47.2 13.9 50.6 -o bavaria_summer.parquet
+"""
+from __future__ import annotations
+import argparse
+import io
+import json
+import math
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import shapely
+
+PRODUCTS = ("grid", "states", "hotspots", "alerts")
+
+# format -> (media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "geojsonl": ("application/geo+json-seq", "geojsonl"),
+    "csv": ("text/csv", "csv"),
+}
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+# features per json.dumps flush in GeoJSON lines
+_GEOJSON_LINES = 5000
+
+# degrees; state outlines in GeoJSON exports (see state_geometry.TOLERANCES)
+EXPORT_TOLERANCE = 0.005
+
+GRID_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("lat", pa.float32()),
+    ("lon", pa.float32()),
+    ("risk_score", pa.float32()),
+    ("risk_level", pa.string()),
+])
+
+HOTSPOT_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("cluster", pa.int32()),
+    ("cells", pa.int32()),
+    ("lat", pa.float32()),
+    ("lon", pa.float32()),
+    ("mean_risk", pa.float32()),
+    ("max_risk", pa.float32()),
+    ("lat_min", pa.float32()),
+    ("lat_max", pa.float32()),
+    ("lon_min", pa.float32()),
+    ("lon_max", pa.float32()),
+])
+
+ALERT_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("alert", pa.string()),
+])
+
+
+def state_schema(slope_window: int = 7) -> pa.Schema:
+    return pa.schema([
+        ("date", pa.date32()),
+        ("NAME_1", pa.string()),
+        ("mean_risk", pa.float32()),
+        ("delta", pa.float32()),
+        ("trend", pa.string()),
+        (f"slope_{slope_window}d", pa.float32()),
+        ("streak", pa.int32()),
+    ])
+
+
+def _dates(epoch: pd.Timestamp, days) -> pa.Array:
+    d = np.asarray(days, dtype=np.int64) + (epoch.normalize() - pd.Timestamp(0)).days
+    return pa.array(d.astype(np.int32), type=pa.int32()).cast(pa.date32())
+
+
+def _in_bbox(lat, lon, bbox) -> np.ndarray:
+    lon0, lat0, lon1, lat1 = bbox
+    return (lat >= lat0) & (lat <= lat1) & (lon >= lon0) & (lon <= lon1)
+
+
+def _rechunk(tables: Iterator[pa.Table], schema: pa.Schema, chunk_rows: int) -> Iterator[pa.RecordBatch]:
+    """
+    Merge small (per-day) tables into batches of exactly chunk_rows rows
+    (the last one shorter); the remainder is carried into the next batch.
+    """
+    pending: List[pa.Table] = []
+    n = 0
+    for t in tables:
+        if not t.num_rows:
+            continue
+        pending.append(t.cast(schema))
+        n += t.num_rows
+        if n >= chunk_rows:
+            buf = pa.concat_tables(pending).combine_chunks()
+            while buf.num_rows >= chunk_rows:
+                yield buf.slice(0, chunk_rows).to_batches()[0]
+                buf = buf.slice(chunk_rows)
+            pending, n = [buf], buf.num_rows
+    if n:
+        yield pa.concat_tables(pending).combine_chunks().to_batches()[0]
+
+
+# --------------------------------------------------
+# Writers
+# --------------------------------------------------
+class _Drain(io.RawIOBase):
+    # write-only sink whose contents are taken after every row group
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts = []
+        return out
+
+
+def iter_parquet(schema: pa.Schema, batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def iter_csv(schema: pa.Schema, batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    header = True
+    for batch in batches:
+        buf = pa.BufferOutputStream()
+        pacsv.write_csv(batch, buf, pacsv.WriteOptions(include_header=header))
+        header = False
+        yield buf.getvalue().to_pybytes()
+    if header:
+        yield (",".join(schema.names) + "\n").encode("utf-8")
+
+
+def iter_geojsonl(
+    schema: pa.Schema,
+    batches: Iterator[pa.RecordBatch],
+    geometry: Callable[[dict], Optional[dict]],
+) -> Iterator[bytes]:
+    floats = [f.name for f in schema if pa.types.is_floating(f.type)]
+    for batch in batches:
+        for start in range(0, batch.num_rows, _GEOJSON_LINES):
+            rows = batch.slice(start, _GEOJSON_LINES).to_pylist()
+            lines = []
+            for r in rows:
+                for c in floats:
+                    v = r.get(c)
+                    if v is not None:
+                        # float32 -> shortest useful decimal; NaN is not JSON
+                        r[c] = None if math.isnan(v) else round(v, 6)
+                lines.append(json.dumps({"type": "Feature", "geometry": geometry(r), "properties": r}, default=str))
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _point(r: dict) -> dict:
+    return {"type": "Point", "coordinates": [round(r["lon"], 5), round(r["lat"], 5)]}
+
+
+# --------------------------------------------------
+# Products
+# --------------------------------------------------
+class Exporter:
+    """
+    dataset: ArrowRiskDataset; trends: StateTrends (states / alerts);
+    geometry: StateGeometry (bbox filter + GeoJSON outlines of states).
+    """
+
+    def __init__(self, dataset, trends=None, geometry=None, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.dataset = dataset
+        self.trends = trends
+        self.geometry = geometry
+        self.chunk_rows = int(chunk_rows)
+
+    # day range -> positions in the dataset's day index
+    def _day_positions(self, start=None, end=None) -> range:
+        values, _, _ = self.dataset.day_index
+        lo = 0 if start is None else int(np.searchsorted(values, self.dataset.day_of(start), side="left"))
+        hi = len(values) if end is None else int(np.searchsorted(values, self.dataset.day_of(end), side="right"))
+        return range(lo, hi)
+
+    def _day_frame(self, i: int, bbox=None) -> pd.DataFrame:
+        values, _, _ = self.dataset.day_index
+        df = self.dataset.day_frame(self.dataset.date_of(values[i]))
+        if bbox is not None:
+            df = df[_in_bbox(df["lat"].to_numpy(), df["lon"].to_numpy(), bbox)]
+        return df
+
+    def _state_names(self, bbox=None) -> List[str]:
+        names = list(self.trends.names)
+        if bbox is None or self.geometry is None:
+            return names
+        box = shapely.box(*bbox)
+        shapes = self.geometry.shapes(0.0)
+        return [n for n in names if n in shapes and shapes[n].intersects(box)]
+
+    # --------------------------------------------------
+    def grid(self, start=None, end=None, bbox=None) -> Iterator[pa.RecordBatch]:
+        ds = self.dataset
+        values, starts, ends = ds.day_index
+
+        def tables():
+            for i in self._day_positions(start, end):
+                part = ds.table.slice(int(starts[i]), int(ends[i] - starts[i]))
+                lat = ds.column("lat", part)
+                lon = ds.column("lon", part)
+                score = ds.scores(part)
+                level = part.column("risk_level").cast(pa.string())
+                if bbox is not None:
+                    keep = _in_bbox(lat, lon, bbox)
+                    lat, lon, score = lat[keep], lon[keep], score[keep]
+                    level = level.filter(pa.array(keep))
+                yield pa.table({
+                    "date": _dates(ds.epoch, np.full(len(lat), values[i])),
+                    "lat": lat,
+                    "lon": lon,
+                    "risk_score": np.asarray(score, dtype=np.float32),
+                    "risk_level": level,
+                })
+
+        return _rechunk(tables(), GRID_SCHEMA, self.chunk_rows)
+
+    def states(self, start=None, end=None, bbox=None) -> Iterator[pa.RecordBatch]:
+        if self.trends is None:
+            raise RuntimeError("State export needs the trend index")
+        tr = self.trends
+        rows = [tr.names.index(n) for n in self._state_names(bbox)]
+        d0 = 0 if start is None else max(tr.day_of(start), 0)
+        d1 = tr.n_days if end is None else min(tr.day_of(end) + 1, tr.n_days)
+        days_per_chunk = max(self.chunk_rows // max(len(rows), 1), 1)
+        schema = state_schema(tr.slope_window)
+        from .utils import TREND_LEVELS
+
+        def tables():
+            for c0 in range(d0, d1, days_per_chunk):
+                days = np.arange(c0, min(c0 + days_per_chunk, d1))
+                # day-major: all states of a day together
+                r = np.tile(rows, len(days))
+                d = np.repeat(days, len(rows))
+                delta = tr.delta[r, d]
+                yield pa.table({
+                    "date": _dates(tr.epoch, d),
+                    "NAME_1": [tr.names[i] for i in r],
+                    "mean_risk": tr.series[r, d],
+                    "delta": delta.astype(np.float32),
+                    "trend": pa.array(list(TREND_LEVELS.classify(delta)), type=pa.string(), from_pandas=True),
+                    f"slope_{tr.slope_window}d": tr.slope[r, d],
+                    "streak": tr.streak[r, d],
+                })
+
+        return _rechunk(tables(), schema, self.chunk_rows)
+
+    def _hotspots(self, df: pd.DataFrame, threshold: float, eps_km: float, min_samples: int) -> pd.DataFrame:
+        from .risk_hotspots import detect_hotspots
+        return detect_hotspots(df, score_threshold=threshold, eps_km=eps_km, min_samples=min_samples)
+
+    def hotspots(self, start=None, end=None, bbox=None, threshold: float = 0.7, eps_km: float = 25,
+                 min_samples: int = 10) -> Iterator[pa.RecordBatch]:
+        from .risk_hotspots import summarize_hotspots
+
+        values, _, _ = self.dataset.day_index
+
+        def tables():
+            for i in self._day_positions(start, end):
+                hot = self._hotspots(self._day_frame(i, bbox), threshold, eps_km, min_samples)
+                if hot.empty:
+                    continue
+                out = summarize_hotspots(hot)
+                out.insert(0, "date", pd.Timestamp(self.dataset.date_of(values[i])).date())
+                yield pa.Table.from_pandas(out, preserve_index=False)
+
+        return _rechunk(tables(), HOTSPOT_SCHEMA, self.chunk_rows)
+
+    def alerts(self, start=None, end=None, bbox=None, threshold: float = 0.7, eps_km: float = 25,
+               min_samples: int = 10) -> Iterator[pa.RecordBatch]:
+        from .components.alerts import NO_ALERTS, generate_alerts
+
+        values, _, _ = self.dataset.day_index
+        names = set(self._state_names(bbox)) if self.trends is not None else set()
+
+        def tables():
+            for i in self._day_positions(start, end):
+                day = self.dataset.date_of(values[i])
+                states = None
+                if self.trends is not None and 0 <= self.trends.day_of(day) < self.trends.n_days:
+                    states = self.trends.day_frame(day)
+                    states = states[states["NAME_1"].isin(names)]
+                hot = self._hotspots(self._day_frame(i, bbox), threshold, eps_km, min_samples)
+                texts = [a.replace("**", "") for a in generate_alerts(states, hot) if a != NO_ALERTS]
+                if texts:
+                    yield pa.table({"date": _dates(self.dataset.epoch, np.full(len(texts), values[i])), "alert": texts})
+
+        return _rechunk(tables(), ALERT_SCHEMA, self.chunk_rows)
+
+    # --------------------------------------------------
+    # Formats
+    # --------------------------------------------------
+    def schema(self, product: str) -> pa.Schema:
+        if product == "states":
+            return state_schema(self.trends.slope_window if self.trends is not None else 7)
+        return {"grid": GRID_SCHEMA, "hotspots": HOTSPOT_SCHEMA, "alerts": ALERT_SCHEMA}[product]
+
+    def _geometry_fn(self, product: str) -> Callable[[dict], Optional[dict]]:
+        if product in ("grid", "hotspots"):
+            return _point
+        if product == "states" and self.geometry is not None:
+            outlines = self.geometry.features(EXPORT_TOLERANCE)
+            return lambda r: outlines.get(r["NAME_1"])
+        return lambda r: None
+
+    def stream(self, product: str, fmt: str, start=None, end=None, bbox: Optional[Sequence[float]] = None,
+               **options) -> Iterator[bytes]:
+        """
+        Encoded chunks of one product (see PRODUCTS / EXPORT_FORMATS).
+        options: threshold / eps_km / min_samples for hotspots and alerts.
+        """
+        if product not in PRODUCTS:
+            raise ValueError(f"Unknown product: {product}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        bbox = tuple(float(v) for v in bbox) if bbox is not None else None
+        batches = getattr(self, product)(start=start, end=end, bbox=bbox, **options)
+        schema = self.schema(product)
+        if fmt == "parquet":
+            return iter_parquet(schema, batches)
+        if fmt == "csv":
+            return iter_csv(schema, batches)
+        return iter_geojsonl(schema, batches, self._geometry_fn(product))
+
+    def write(self, product: str, fmt: str, path, **kwargs) -> Path:
+        """
+        Stream an export to a file (temp name, renamed when complete).
+        """
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in self.stream(product, fmt, **kwargs):
+                    f.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return path
+
+
+def export_filename(product: str, fmt: str, start=None, end=None) -> str:
+    span = "_".join(pd.Timestamp(d).strftime("%Y%m%d") for d in (start, end) if d is not None)
+    return f"nexus_{product}{'_' + span if span else ''}.{EXPORT_FORMATS[fmt][1]}"
+
+
+def main(argv=None):
+    from .risk_trends import trends_index
+    from .snapshot import get_snapshot_manager
+    from .state_geometry import load_state_geometry
+
+    ap = argparse.ArgumentParser(description="Export daily risk products")
+    ap.add_argument("product", choices=PRODUCTS)
+    ap.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    ap.add_argument("--data", default="daily_risk.parquet")
+    ap.add_argument("--states", default="data/germany_states.geojson")
+    ap.add_argument("--start", default=None)
+    ap.add_argument("--end", default=None)
+    ap.add_argument("--bbox", type=float, nargs=4, default=None, metavar=("LON0", "LAT0", "LON1", "LAT1"))
+    ap.add_argument("--threshold", type=float, default=0.7)
+    ap.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    ap.add_argument("-o", "--out", default=None)
+    args = ap.parse_args(argv)
+
+    dataset = get_snapshot_manager(args.data).current().dataset
+    geometry = load_state_geometry(args.states) if args.product in ("states", "alerts") else None
+    trends = trends_index(args.data, args.states)(dataset) if args.product in ("states", "alerts") else None
+    options = {"threshold": args.threshold} if args.product in ("hotspots", "alerts") else {}
+
+    out = Path(args.out or export_filename(args.product, args.format, args.start, args.end))
+    Exporter(dataset, trends, geometry, chunk_rows=args.chunk_rows).write(
+        args.product, args.format, out, start=args.start, end=args.end, bbox=args.bbox, **options
+    )
+    print(f"Wrote {out} ({out.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .config import THRESHOLDS
+from .utils import ThresholdTable
+
+
+@dataclass(frozen=True)
+class FusionProfile:
+    """
+    Versioned fusion weights and level thresholds.
+    `missing_sensor_factor` scales the climate score when no sensor reports.
+    """
+    version: str
+    climate_weight: float = 0.6
+    sensor_weight: float = 0.4
+    missing_sensor_factor: float = 1.0
+    thresholds: Tuple[float, ...] = (THRESHOLDS.low, THRESHOLDS.medium, THRESHOLDS.high)
+    levels: Tuple[str, ...] = ("LOW", "MEDIUM", "HIGH", "EXTREME")
+
+    @property
+    def table(self) -> ThresholdTable:
+        return ThresholdTable(edges=tuple(self.thresholds), labels=tuple(self.levels))
+
+
+PROFILES: Dict[str, FusionProfile] = {
+    p.version: p for p in (
+        # current: one rule for every page
+        FusionProfile("v1"),
+        # earlier per-page variants, kept for comparisons / reproducing old reports
+        FusionProfile("legacy-components", thresholds=(0.30, 0.55, 0.75),
+                      levels=("Low", "Moderate", "High", "Critical")),
+        FusionProfile("legacy-hub", missing_sensor_factor=0.9,
+                      levels=("LOW", "MODERATE", "HIGH", "EXTREME")),
+        FusionProfile("legacy-decision-engine", climate_weight=0.65, sensor_weight=0.35),
+    )
+}
+DEFAULT_PROFILE = PROFILES["v1"]
+
+LEVEL_ICONS = {
+    "LOW": "🟢", "MEDIUM": "🟡", "MODERATE": "🟡", "HIGH": "🟠", "EXTREME": "🔴",
+    "Low": "🟢", "Moderate": "🟡", "High": "🟠", "Critical": "🔴",
+}
+
+
+def get_profile(version: str | FusionProfile | None = None) -> FusionProfile:
+    if version is None:
+        return DEFAULT_PROFILE
+    if isinstance(version, FusionProfile):
+        return version
+    try:
+        return PROFILES[version]
+    except KeyError:
+        raise ValueError(f"Unknown fusion profile: {version} (available: {', '.join(PROFILES)})") from None
+
+
+def fuse(climate, sensor=None, profile: str | FusionProfile | None = None):
+    """
+    Climate risk + sensor risk -> fusion score in [0, 1].
+
+    Works on scalars and arrays alike (broadcasting); a None / NaN sensor
+    value means "no ground truth" and falls back to the scaled climate score.
+    Scalars in -> float out.
+    """
+    p = get_profile(profile)
+    c = np.clip(np.asarray(climate, dtype=np.float64), 0.0, 1.0)
+    s = np.asarray(np.nan if sensor is None else sensor, dtype=np.float64)
+
+    with np.errstate(invalid="ignore"):
+        fused = np.where(
+            np.isnan(s),
+            p.missing_sensor_factor * c,
+            p.climate_weight * c + p.sensor_weight * np.clip(s, 0.0, 1.0),
+        )
+    fused = np.clip(fused, 0.0, 1.0)
+    return float(fused) if fused.ndim == 0 else fused
+
+
+def fusion_level(score, profile: str | FusionProfile | None = None):
+    """
+    Fusion score(s) -> level of the profile (str for scalars,
+    ordered Categorical for arrays).
+    """
+    return get_profile(profile).table.classify(score)
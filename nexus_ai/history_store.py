@@ -0,0 +1,236 @@
+"""
+Persistent, append-only history of computed risk scores and decisions.
+
+Every score the app computes is one row in a local SQLite database (WAL
+mode, so any number of sessions and processes read while one writes):
+timestamp, location, inputs, model version and the resulting score / level.
+Rows are never updated or deleted by the app.
+
+Locations are indexed on a ~1 km key (lat / lon in 1/100 degree), together
+with the timestamp, so "history here in the last 24 h" and "the score here
+about a day ago" are index range scans rather than session-state lookups.
+"""
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+# location key resolution: 1/100 degree (~1.1 km)
+LOC_SCALE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS score_history (
+    id            INTEGER PRIMARY KEY,
+    ts_ns         INTEGER NOT NULL,
+    loc_lat       INTEGER,
+    loc_lon       INTEGER,
+    lat           REAL,
+    lon           REAL,
+    kind          TEXT NOT NULL,
+    score         REAL NOT NULL,
+    level         TEXT,
+    model_version TEXT,
+    source        TEXT,
+    inputs        TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_score_loc_ts ON score_history (kind, loc_lat, loc_lon, ts_ns);
+CREATE INDEX IF NOT EXISTS ix_score_ts ON score_history (kind, ts_ns);
+"""
+
+_COLUMNS = ["id", "ts_ns", "lat", "lon", "kind", "score", "level", "model_version", "source", "inputs"]
+
+
+def _ts_ns(ts=None) -> int:
+    t = pd.Timestamp.now(tz="UTC") if ts is None else pd.Timestamp(ts)
+    if t.tzinfo is None:
+        t = t.tz_localize("UTC")
+    return int(t.value)
+
+
+def _loc_key(lat, lon):
+    if lat is None or lon is None:
+        return None, None
+    return int(round(float(lat) * LOC_SCALE)), int(round(float(lon) * LOC_SCALE))
+
+
+@dataclass(frozen=True)
+class HistoryRecord:
+    ts: pd.Timestamp
+    score: float
+    level: Optional[str]
+    model_version: Optional[str]
+    inputs: Dict[str, Any]
+
+
+class HistoryStore:
+    """
+    kind separates series in the same file (e.g. "fri", "decision").
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as con:
+            con.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread (sqlite3 connections are not shared)
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(str(self.path), timeout=5.0)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    # --------------------------------------------------
+    # Append
+    # --------------------------------------------------
+    def record(
+        self,
+        score: float,
+        kind: str = "fri",
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        level: Optional[str] = None,
+        model_version: Optional[str] = None,
+        source: Optional[str] = None,
+        inputs: Optional[Dict[str, Any]] = None,
+        ts=None,
+    ) -> int:
+        loc_lat, loc_lon = _loc_key(lat, lon)
+        with self._conn() as con:
+            cur = con.execute(
+                "INSERT INTO score_history (ts_ns, loc_lat, loc_lon, lat, lon, kind, score, level, model_version, source, inputs)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    _ts_ns(ts), loc_lat, loc_lon,
+                    None if lat is None else float(lat), None if lon is None else float(lon),
+                    kind, float(score), level, model_version, source,
+                    json.dumps(inputs or {}, default=float),
+                ),
+            )
+            return int(cur.lastrowid)
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+    def _where(self, kind, lat, lon, radius_km: float, any_location: bool):
+        sql, args = ["kind = ?"], [kind]
+        if any_location:
+            return sql, args
+        loc_lat, loc_lon = _loc_key(lat, lon)
+        if loc_lat is None:
+            sql.append("loc_lat IS NULL")
+        else:
+            d = max(int(round(radius_km / 111.0 * LOC_SCALE)), 0)
+            if d == 0:
+                # equality on both keys: the time condition is an index range too
+                sql.append("loc_lat = ? AND loc_lon = ?")
+                args += [loc_lat, loc_lon]
+            else:
+                sql.append("loc_lat BETWEEN ? AND ? AND loc_lon BETWEEN ? AND ?")
+                args += [loc_lat - d, loc_lat + d, loc_lon - d, loc_lon + d]
+        return sql, args
+
+    def history(
+        self,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        since=None,
+        until=None,
+        kind: str = "fri",
+        radius_km: float = 0.0,
+        any_location: bool = False,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Rows for a location (or all locations) in [since, until], oldest first.
+        """
+        sql, args = self._where(kind, lat, lon, radius_km, any_location)
+        if since is not None:
+            sql.append("ts_ns >= ?")
+            args.append(_ts_ns(since))
+        if until is not None:
+            sql.append("ts_ns <= ?")
+            args.append(_ts_ns(until))
+        q = f"SELECT {', '.join(_COLUMNS)} FROM score_history WHERE {' AND '.join(sql)} ORDER BY ts_ns DESC"
+        if limit:
+            # newest `limit` rows
+            q += f" LIMIT {int(limit)}"
+        rows = self._conn().execute(q, args).fetchall()[::-1]
+        df = pd.DataFrame(rows, columns=_COLUMNS)
+        df["ts"] = pd.to_datetime(df["ts_ns"], utc=True)
+        return df.drop(columns=["ts_ns"])
+
+    def _one(self, sql, args) -> Optional[HistoryRecord]:
+        row = self._conn().execute(sql, args).fetchone()
+        if row is None:
+            return None
+        ts_ns, score, level, model_version, inputs = row
+        return HistoryRecord(pd.Timestamp(ts_ns, tz="UTC"), float(score), level, model_version, json.loads(inputs or "{}"))
+
+    def latest(self, lat=None, lon=None, before=None, kind: str = "fri", radius_km: float = 0.0) -> Optional[HistoryRecord]:
+        """
+        Most recent record at the location strictly before `before` (default: now).
+        """
+        sql, args = self._where(kind, lat, lon, radius_km, False)
+        sql.append("ts_ns < ?")
+        args.append(_ts_ns(before))
+        return self._one(
+            f"SELECT ts_ns, score, level, model_version, inputs FROM score_history WHERE {' AND '.join(sql)}"
+            " ORDER BY ts_ns DESC LIMIT 1",
+            args,
+        )
+
+    def baseline(
+        self,
+        lat=None,
+        lon=None,
+        at=None,
+        lag=pd.Timedelta(days=1),
+        tolerance=pd.Timedelta(hours=6),
+        kind: str = "fri",
+        radius_km: float = 0.0,
+    ) -> Optional[HistoryRecord]:
+        """
+        The record closest to (at - lag), within +/- tolerance, e.g. "about
+        this time yesterday". None when history has no such record.
+        """
+        target = _ts_ns(at) - int(pd.Timedelta(lag).value)
+        tol = int(pd.Timedelta(tolerance).value)
+        sql, args = self._where(kind, lat, lon, radius_km, False)
+        sql.append("ts_ns BETWEEN ? AND ?")
+        args += [target - tol, target + tol]
+        return self._one(
+            f"SELECT ts_ns, score, level, model_version, inputs FROM score_history WHERE {' AND '.join(sql)}"
+            " ORDER BY ABS(ts_ns - ?) LIMIT 1",
+            args + [target],
+        )
+
+    def count(self, kind: Optional[str] = None) -> int:
+        if kind is None:
+            return int(self._conn().execute("SELECT COUNT(*) FROM score_history").fetchone()[0])
+        return int(self._conn().execute("SELECT COUNT(*) FROM score_history WHERE kind = ?", (kind,)).fetchone()[0])
+
+
+_STORES: Dict[str, HistoryStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_history_store(path) -> HistoryStore:
+    """
+    Process-wide store per database file.
+    """
+    key = str(Path(path).resolve())
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = HistoryStore(path)
+        return store
@@ -1,31 +1,56 @@
 import pandas as pd
 import numpy as np
 
-_DF = None
+from nexus_ai.snapshot import get_snapshot_manager
+from nexus_ai.spatial_fusion import CellNeighbourIndex
 
-def load_daily_risk(path="daily_risk.parquet"):
-    global _DF
-    if _DF is None:
-        _DF = pd.read_parquet(path)
-    return _DF
+DAILY_RISK_PATH = "daily_risk.parquet"
 
 
-def get_risk_from_location(lat, lon, month=None):
+def _latest_day_index(dataset):
+    """
+    Derived index for a snapshot: latest day's cells + nearest-cell tree.
+    """
+    cells = dataset.day_frame(dataset.dates[-1])
+    return cells, CellNeighbourIndex(cells["lat"].to_numpy(), cells["lon"].to_numpy())
+
+
+def load_daily_risk(path=DAILY_RISK_PATH):
+    """
+    Current snapshot of the risk dataset (hot-reloaded when the file changes).
+    """
+    mgr = get_snapshot_manager(path)
+    if "latest_day" not in mgr.index_builders:
+        mgr.add_indexes({"latest_day": _latest_day_index})
+    return mgr.current()
+
+
+def get_risk_from_location(lat, lon, month=None, path=DAILY_RISK_PATH):
     """
     Returns nearest AI-computed risk from daily_risk.parquet
+    (latest day, or the latest day of `month` when given)
     """
 
-    df = load_daily_risk()
+    snap = load_daily_risk(path)
+    dataset = snap.dataset
+    cells, index = snap.indexes.get("latest_day") or _latest_day_index(dataset)
 
     # optional month filter
-    if month is not None and "month" in df.columns:
-        df = df[df["month"] == month]
+    if month is not None and dataset.dates[-1].month != month:
+        days = [d for d in dataset.dates if d.month == month]
+        if days:
+            cells = dataset.day_frame(days[-1])
+            index = None
 
     # nearest grid point
-    dist = (df["latitude"] - lat) ** 2 + (df["longitude"] - lon) ** 2
-    row = df.loc[dist.idxmin()]
+    if index is not None:
+        i = int(index.nearest(lat, lon)[0][0])
+    else:
+        dist = (cells["lat"] - lat) ** 2 + (cells["lon"] - lon) ** 2
+        i = int(np.argmin(dist.to_numpy()))
+    row = cells.iloc[i]
 
     return {
         "risk_score": float(row["risk_score"]),
-        "risk_level": row["risk_level"],
+        "risk_level": str(row["risk_level"]),
     }
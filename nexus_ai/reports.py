@@ -0,0 +1,705 @@
+"""
+Batch PDF reports: templated layouts, pre-rendered charts, content-hash cache.
+
+A report is a plain document (title, subtitle and a list of blocks: key /
+value rows, text, tables, line charts) built by a template function from
+data. Its cache key is a hash of that document, so a report whose content
+did not change is never rendered again, and the same content rendered for
+two callers is one file.
+
+Missing reports are rendered in a process pool (fpdf is pure Python, so
+processes rather than threads). Chart images are rendered once per chart
+hash before the reports that embed them (matplotlib when installed; without
+it charts are drawn as vectors by the layout itself).
+
+Cache files are touched when served, and after each render the cache is
+pruned to CACHE_MAX_AGE_DAYS / CACHE_MAX_BYTES, least recently used first.
+One-off documents (the AI Hub's per-run point report) bypass the cache:
+render_pdf() directly.
+
+Batch run for one day (states, hotspots and the week ending that day):
+    python -m nexus_ai.reports --date 2024-09-01 --weekly --out reports
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from fpdf import FPDF
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+# bump when the layout code changes (invalidates every cached report)
+LAYOUT_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path("data") / "report_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 30.0
+
+SERIES_COLORS = [(255, 75, 75), (80, 160, 255), (255, 190, 60), (120, 200, 120)]
+
+_TEXT_REPLACEMENTS = {
+    "▬": "STABLE",
+    "↑": "UP",
+    "↓": "DOWN",
+    "—": "-",
+    "🟢": "LOW",
+    "🟡": "MODERATE",
+    "🟠": "HIGH",
+    "🔴": "EXTREME",
+}
+
+
+def pdf_safe(text) -> str:
+    """
+    Latin-1 text for the core PDF fonts (arrows / level emoji spelled out).
+    """
+    if text is None:
+        return ""
+    text = str(text)
+    for k, v in _TEXT_REPLACEMENTS.items():
+        text = text.replace(k, v)
+    return text.encode("latin-1", errors="ignore").decode("latin-1")
+
+
+def _plain(v):
+    # numpy / pandas scalars -> JSON-able, NaN -> None
+    if isinstance(v, (np.integer,)):
+        return int(v)
+    if isinstance(v, (float, np.floating)):
+        return None if np.isnan(v) else round(float(v), 6)
+    if isinstance(v, (pd.Timestamp, datetime)):
+        return v.isoformat()
+    if isinstance(v, dict):
+        return {str(k): _plain(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple, np.ndarray)):
+        return [_plain(x) for x in v]
+    return v
+
+
+def _digest(obj) -> str:
+    return hashlib.blake2b(json.dumps(obj, sort_keys=True, default=str).encode("utf-8"), digest_size=16).hexdigest()
+
+
+# --------------------------------------------------
+# Documents
+# --------------------------------------------------
+@dataclass(frozen=True)
+class Report:
+    """
+    name: output file stem; blocks: {"type": "kv" | "text" | "table" | "chart", ...}.
+    """
+    name: str
+    title: str
+    subtitle: str = ""
+    blocks: Tuple[dict, ...] = field(default_factory=tuple)
+
+    @property
+    def key(self) -> str:
+        return _digest({"v": LAYOUT_VERSION, "title": self.title, "subtitle": self.subtitle, "blocks": self.blocks})
+
+
+def kv_block(rows: Sequence[Tuple[str, object]], heading: str = "") -> dict:
+    return {"type": "kv", "heading": heading, "rows": [[str(k), _plain(v)] for k, v in rows]}
+
+
+def text_block(text: str, heading: str = "") -> dict:
+    return {"type": "text", "heading": heading, "text": str(text)}
+
+
+def table_block(df: pd.DataFrame, heading: str = "", digits: int = 3) -> dict:
+    rows = df.round(digits).astype(object).where(df.notna(), None).values.tolist() if len(df) else []
+    return {"type": "table", "heading": heading, "columns": [str(c) for c in df.columns], "rows": _plain(rows)}
+
+
+def chart_block(x: Sequence, series: Dict[str, Sequence[float]], heading: str = "", y_range=(0.0, 1.0)) -> dict:
+    """
+    Line chart; x are labels (dates), series name -> values (NaN = gap).
+    """
+    return {
+        "type": "chart",
+        "heading": heading,
+        "x": [str(v) for v in x],
+        "series": {str(k): _plain(list(v)) for k, v in series.items()},
+        "y_range": list(y_range) if y_range else None,
+    }
+
+
+def chart_key(block: dict) -> str:
+    return _digest({"v": LAYOUT_VERSION, "chart": block})
+
+
+# --------------------------------------------------
+# Charts
+# --------------------------------------------------
+def _y_range(block: dict) -> Tuple[float, float]:
+    if block.get("y_range"):
+        return tuple(block["y_range"])
+    vals = [v for s in block["series"].values() for v in s if v is not None]
+    if not vals:
+        return 0.0, 1.0
+    lo, hi = min(vals), max(vals)
+    return (lo, hi) if hi > lo else (lo - 0.5, hi + 0.5)
+
+
+def render_chart_png(block: dict, path) -> Path:
+    """
+    Rasterize a chart block (needs matplotlib); written to a temp name and renamed.
+    """
+    path = Path(path)
+    fig, ax = plt.subplots(figsize=(7.5, 2.6), dpi=120)
+    n = len(block["x"])
+    for i, (name, values) in enumerate(block["series"].items()):
+        color = tuple(c / 255 for c in SERIES_COLORS[i % len(SERIES_COLORS)])
+        ax.plot(range(n), [np.nan if v is None else v for v in values], label=name, color=color, linewidth=1.6)
+    ax.set_ylim(*_y_range(block))
+    step = max(n // 6, 1)
+    ax.set_xticks(range(0, n, step))
+    ax.set_xticklabels(block["x"][::step], fontsize=7)
+    ax.tick_params(axis="y", labelsize=7)
+    ax.grid(alpha=0.3)
+    if len(block["series"]) > 1:
+        ax.legend(fontsize=7, loc="upper left")
+    fig.tight_layout()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fig.savefig(tmp, format="png")
+    plt.close(fig)
+    os.replace(tmp, path)
+    return path
+
+
+def _draw_chart(pdf: FPDF, block: dict, x: float, y: float, w: float, h: float):
+    # vector fallback: axes, 3 grid lines, one polyline per series
+    lo, hi = _y_range(block)
+    n = len(block["x"])
+    pdf.set_draw_color(180, 180, 180)
+    pdf.set_line_width(0.2)
+    pdf.rect(x, y, w, h)
+    pdf.set_font("Arial", size=7)
+    for frac in (0.0, 0.5, 1.0):
+        gy = y + h - frac * h
+        pdf.line(x, gy, x + w, gy)
+        pdf.text(x - 9, gy + 1, f"{lo + frac * (hi - lo):.2f}")
+    if n:
+        pdf.text(x, y + h + 4, pdf_safe(block["x"][0]))
+        pdf.text(x + w - 18, y + h + 4, pdf_safe(block["x"][-1]))
+
+    def px(i, v):
+        return x + (w * i / max(n - 1, 1)), y + h - (min(max(v, lo), hi) - lo) / (hi - lo) * h
+
+    pdf.set_line_width(0.5)
+    for s, (name, values) in enumerate(block["series"].items()):
+        pdf.set_draw_color(*SERIES_COLORS[s % len(SERIES_COLORS)])
+        prev = None
+        for i, v in enumerate(values):
+            cur = None if v is None else px(i, v)
+            if prev is not None and cur is not None:
+                pdf.line(prev[0], prev[1], cur[0], cur[1])
+            prev = cur
+        if len(block["series"]) > 1:
+            pdf.set_text_color(*SERIES_COLORS[s % len(SERIES_COLORS)])
+            pdf.text(x + 2 + 35 * s, y + 4, pdf_safe(name))
+            pdf.set_text_color(0, 0, 0)
+    pdf.set_draw_color(0, 0, 0)
+    pdf.set_line_width(0.2)
+
+
+# --------------------------------------------------
+# Layout
+# --------------------------------------------------
+def _heading(pdf: FPDF, text: str):
+    if text:
+        pdf.ln(2)
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 7, txt=pdf_safe(text), ln=True)
+
+
+def _fmt(v) -> str:
+    if v is None:
+        return "-"
+    if isinstance(v, float):
+        return f"{v:.3f}"
+    return str(v)
+
+
+def _layout_kv(pdf: FPDF, block: dict, chart_dir):
+    _heading(pdf, block.get("heading"))
+    pdf.set_font("Arial", size=11)
+    for k, v in block["rows"]:
+        pdf.set_font("Arial", "B", 11)
+        pdf.cell(60, 7, txt=pdf_safe(f"{k}:"))
+        pdf.set_font("Arial", size=11)
+        pdf.cell(0, 7, txt=pdf_safe(_fmt(v)), ln=True)
+
+
+def _layout_text(pdf: FPDF, block: dict, chart_dir):
+    _heading(pdf, block.get("heading"))
+    pdf.set_font("Arial", size=11)
+    pdf.multi_cell(0, 6, txt=pdf_safe(block["text"]))
+
+
+def _layout_table(pdf: FPDF, block: dict, chart_dir):
+    _heading(pdf, block.get("heading"))
+    cols = block["columns"]
+    if not cols:
+        return
+    width = (pdf.w - pdf.l_margin - pdf.r_margin) / len(cols)
+    pdf.set_font("Arial", "B", 9)
+    pdf.set_fill_color(235, 235, 235)
+    for c in cols:
+        pdf.cell(width, 6, txt=pdf_safe(c), border=1, fill=1)
+    pdf.ln()
+    pdf.set_font("Arial", size=9)
+    for row in block["rows"]:
+        for v in row:
+            pdf.cell(width, 6, txt=pdf_safe(_fmt(v)), border=1)
+        pdf.ln()
+
+
+def _layout_chart(pdf: FPDF, block: dict, chart_dir):
+    _heading(pdf, block.get("heading"))
+    w = pdf.w - pdf.l_margin - pdf.r_margin
+    h = w * 2.6 / 7.5
+    if pdf.get_y() + h + 8 > pdf.h - pdf.b_margin:
+        pdf.add_page()
+    x, y = pdf.l_margin, pdf.get_y() + 1
+    png = Path(chart_dir) / f"{chart_key(block)}.png" if chart_dir else None
+    if png is not None and png.exists():
+        pdf.image(str(png), x=x, y=y, w=w, h=h)
+    else:
+        _draw_chart(pdf, block, x + 10, y + 2, w - 12, h - 8)
+    pdf.set_y(y + h + 2)
+
+
+LAYOUTS = {
+    "kv": _layout_kv,
+    "text": _layout_text,
+    "table": _layout_table,
+    "chart": _layout_chart,
+}
+
+
+def render_pdf(report: Report, chart_dir=None) -> bytes:
+    """
+    Lay out one report (no cache involved).
+    """
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=12)
+    pdf.add_page()
+
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, txt=pdf_safe(report.title), ln=True, align="C")
+    if report.subtitle:
+        pdf.set_font("Arial", size=11)
+        pdf.set_text_color(90, 90, 90)
+        pdf.cell(0, 6, txt=pdf_safe(report.subtitle), ln=True, align="C")
+        pdf.set_text_color(0, 0, 0)
+    pdf.ln(4)
+
+    for block in report.blocks:
+        LAYOUTS[block["type"]](pdf, block, chart_dir)
+        pdf.ln(1)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+# --------------------------------------------------
+# Cache + batch rendering
+# --------------------------------------------------
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _render_to_cache(report: Report, cache_dir: str) -> str:
+    # pool worker: render + store under the content hash
+    cache_dir = Path(cache_dir)
+    out = cache_dir / f"{report.key}.pdf"
+    if not out.exists():
+        _write_atomic(out, render_pdf(report, chart_dir=cache_dir / "charts"))
+    return str(out)
+
+
+def _chart_to_cache(block: dict, chart_dir: str) -> str:
+    out = Path(chart_dir) / f"{chart_key(block)}.png"
+    if not out.exists():
+        render_chart_png(block, out)
+    return str(out)
+
+
+def _touch(paths: Iterable[Path]):
+    # mtime = last use, so pruning drops the least recently used files
+    for p in paths:
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+
+
+def prune_cache(
+    cache_dir=DEFAULT_CACHE_DIR,
+    max_bytes: Optional[int] = CACHE_MAX_BYTES,
+    max_age_days: Optional[float] = CACHE_MAX_AGE_DAYS,
+    keep: Iterable[Path] = (),
+) -> int:
+    """
+    Delete cached reports / charts unused for max_age_days, then the least
+    recently used until the cache fits max_bytes (files in `keep` stay).
+    Returns the number of files removed.
+    """
+    cache_dir = Path(cache_dir)
+    keep = {Path(p).resolve() for p in keep}
+    files = []
+    for d in (cache_dir, cache_dir / "charts"):
+        if not d.is_dir():
+            continue
+        with os.scandir(d) as it:
+            for e in it:
+                if e.is_file() and e.name.endswith((".pdf", ".png")):
+                    st = e.stat()
+                    files.append((st.st_mtime, st.st_size, Path(e.path)))
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+    removed = 0
+    for mtime, size, path in files:
+        too_old = cutoff is not None and mtime < cutoff
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            break
+        if path.resolve() in keep:
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def render_report(report: Report, cache_dir=DEFAULT_CACHE_DIR) -> bytes:
+    """
+    One report in-process (e.g. a download button), through the cache.
+    """
+    cache_dir = Path(cache_dir)
+    (cache_dir / "charts").mkdir(parents=True, exist_ok=True)
+    out = cache_dir / f"{report.key}.pdf"
+    if out.exists():
+        _touch([out])
+    else:
+        if plt is not None:
+            for block in report.blocks:
+                if block["type"] == "chart":
+                    _chart_to_cache(block, str(cache_dir / "charts"))
+        _render_to_cache(report, str(cache_dir))
+        prune_cache(cache_dir, keep=[out])
+    return out.read_bytes()
+
+
+def render_reports(
+    reports: Iterable[Report],
+    out_dir=None,
+    cache_dir=DEFAULT_CACHE_DIR,
+    workers: Optional[int] = None,
+) -> Dict[str, Path]:
+    """
+    Render every report not yet in the cache (process pool), then place
+    `<name>.pdf` links / copies in out_dir. Returns name -> file.
+    """
+    reports = list(reports)
+    cache_dir = Path(cache_dir)
+    chart_dir = cache_dir / "charts"
+    chart_dir.mkdir(parents=True, exist_ok=True)
+
+    todo = {r.key: r for r in reports if not (cache_dir / f"{r.key}.pdf").exists()}
+    charts = {}
+    if plt is not None:
+        for r in todo.values():
+            for b in r.blocks:
+                if b["type"] == "chart" and not (chart_dir / f"{chart_key(b)}.png").exists():
+                    charts[chart_key(b)] = b
+
+    workers = workers or min(os.cpu_count() or 1, 8)
+    if len(todo) + len(charts) <= 2 or workers <= 1:
+        for b in charts.values():
+            _chart_to_cache(b, str(chart_dir))
+        for r in todo.values():
+            _render_to_cache(r, str(cache_dir))
+    elif todo or charts:
+        # spawn: safe to start from a multi-threaded server process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            list(pool.map(_chart_to_cache, charts.values(), [str(chart_dir)] * len(charts)))
+            list(pool.map(_render_to_cache, todo.values(), [str(cache_dir)] * len(todo), chunksize=4))
+
+    paths = {r.name: cache_dir / f"{r.key}.pdf" for r in reports}
+    _touch(paths.values())
+    if todo:
+        prune_cache(cache_dir, keep=paths.values())
+    if out_dir is None:
+        return paths
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    placed = {}
+    for name, src in paths.items():
+        dst = out_dir / f"{name}.pdf"
+        if dst.exists() and os.path.samefile(dst, src):
+            placed[name] = dst
+            continue
+        dst.unlink(missing_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+        placed[name] = dst
+    return placed
+
+
+# --------------------------------------------------
+# Templates
+# --------------------------------------------------
+def _slug(text: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in str(text)).strip("_")
+
+
+def point_report(score, level, verdict, params, baseline_text, explanation, ts=None, history: Optional[pd.DataFrame] = None) -> Report:
+    """
+    Single-location report of the AI Hub (FRI 0-300).
+    history: optional FRI series (index = time) charted as the last 24h.
+    """
+    ts = pd.Timestamp(ts if ts is not None else datetime.now())
+    blocks = [
+        kv_block([
+            ("Timestamp", ts.strftime("%Y-%m-%d %H:%M:%S")),
+            ("Risk Score (FRI)", f"{float(score):.2f} / 300"),
+            ("Risk Level", level),
+            ("System Verdict", verdict),
+        ]),
+        text_block(baseline_text, heading="Baseline vs Yesterday"),
+        text_block(explanation, heading="Explanation"),
+        kv_block(list((params or {}).items()), heading="Inputs"),
+    ]
+    if history is not None and len(history) >= 2:
+        col = history.columns[0]
+        blocks.append(chart_block(
+            [t.strftime("%H:%M") for t in history.index],
+            {"FRI": history[col].to_numpy()},
+            heading="FRI - last 24h",
+            y_range=(0.0, 300.0),
+        ))
+    return Report(name=f"NEXUS_Report_{ts:%Y%m%d_%H%M%S}", title="NEXUS AI - Wildfire Intelligence Report", blocks=tuple(blocks))
+
+
+def state_daily_report(day, stats: pd.Series, series: Optional[pd.DataFrame], top_cells: pd.DataFrame) -> Report:
+    """
+    stats: one row of state stats (mean_risk, max_risk, share_above, cells,
+    plus delta / trend / trend_text when the trend engine is available).
+    series: daily mean_risk of the last weeks (index = date).
+    """
+    day = pd.Timestamp(day)
+    name = stats["NAME_1"]
+    rows = [
+        ("Mean risk", stats.get("mean_risk")),
+        ("Max risk", stats.get("max_risk")),
+        ("Area share above threshold", stats.get("share_above")),
+        ("Grid cells", stats.get("cells")),
+    ]
+    if "delta" in stats:
+        rows += [("Change vs yesterday", stats.get("delta")), ("Trend", stats.get("trend")), ("Streak", stats.get("trend_text"))]
+    blocks = [kv_block(rows)]
+    if series is not None and len(series):
+        blocks.append(chart_block(
+            [d.strftime("%m-%d") for d in series.index],
+            {"mean risk": series["mean_risk"].to_numpy()},
+            heading=f"Daily mean risk, last {len(series)} days",
+        ))
+    if top_cells is not None and len(top_cells):
+        blocks.append(table_block(top_cells, heading="Highest-risk cells"))
+    return Report(
+        name=f"{day:%Y-%m-%d}_state_{_slug(name)}",
+        title=f"{name} - Daily Wildfire Risk",
+        subtitle=f"{day:%A, %d %B %Y}",
+        blocks=tuple(blocks),
+    )
+
+
+def hotspot_daily_report(day, cluster: int, cells: pd.DataFrame, state: Optional[str] = None) -> Report:
+    """
+    cells: the hotspot's grid cells (lat / lon / risk_score).
+    """
+    day = pd.Timestamp(day)
+    s = cells["risk_score"]
+    rows = [
+        ("Cells", len(cells)),
+        ("Centre", f"{cells['lat'].mean():.3f} N, {cells['lon'].mean():.3f} E"),
+        ("Extent", f"{cells['lat'].min():.2f}-{cells['lat'].max():.2f} N, {cells['lon'].min():.2f}-{cells['lon'].max():.2f} E"),
+        ("Mean risk", s.mean()),
+        ("Max risk", s.max()),
+    ]
+    if state:
+        rows.insert(0, ("State", state))
+    top = cells.iloc[np.argsort(-s.to_numpy(), kind="stable")[:10]][["lat", "lon", "risk_score"]]
+    return Report(
+        name=f"{day:%Y-%m-%d}_hotspot_{int(cluster):03d}",
+        title=f"Hotspot #{int(cluster)} - Daily Report",
+        subtitle=f"{day:%A, %d %B %Y}" + (f" - {state}" if state else ""),
+        blocks=(kv_block(rows), table_block(top, heading="Highest-risk cells")),
+    )
+
+
+def weekly_state_report(week_end, name: str, series: pd.DataFrame) -> Report:
+    """
+    series: daily mean_risk for the two weeks ending at week_end.
+    """
+    week_end = pd.Timestamp(week_end)
+    this = series["mean_risk"].iloc[-7:]
+    prev = series["mean_risk"].iloc[:-7]
+    rows = [
+        ("Week mean risk", this.mean()),
+        ("Previous week", prev.mean() if len(prev) else None),
+        ("Week-over-week change", this.mean() - prev.mean() if len(prev) else None),
+        ("Highest daily mean", this.max()),
+        ("Days rising", int((this.diff() > 0).sum())),
+    ]
+    return Report(
+        name=f"{week_end:%Y-%m-%d}_weekly_{_slug(name)}",
+        title=f"{name} - Weekly Roll-up",
+        subtitle=f"{week_end - pd.Timedelta(days=6):%d %b} - {week_end:%d %b %Y}",
+        blocks=(
+            kv_block(rows),
+            chart_block([d.strftime("%m-%d") for d in series.index], {"mean risk": series["mean_risk"].to_numpy()},
+                        heading="Daily mean risk, last two weeks"),
+        ),
+    )
+
+
+def weekly_overview_report(week_end, table: pd.DataFrame) -> Report:
+    """
+    table: one row per state (NAME_1, week_mean, prev_week_mean, change, max_day).
+    """
+    week_end = pd.Timestamp(week_end)
+    return Report(
+        name=f"{week_end:%Y-%m-%d}_weekly_overview",
+        title="Germany - Weekly Wildfire Risk Roll-up",
+        subtitle=f"{week_end - pd.Timedelta(days=6):%d %b} - {week_end:%d %b %Y}",
+        blocks=(table_block(table.sort_values("week_mean", ascending=False), heading="States by weekly mean risk"),),
+    )
+
+
+# --------------------------------------------------
+# Batch builders
+# --------------------------------------------------
+def daily_state_reports(day, df_day: pd.DataFrame, regions: Dict[str, object], trends=None,
+                        threshold: float = 0.7, history_days: int = 30, top_k: int = 10) -> List[Report]:
+    from .risk_query import top_k_indices
+    from .zonal import zonal_weights
+
+    zw = zonal_weights(df_day["lat"].to_numpy(), df_day["lon"].to_numpy(), regions)
+    stats = zw.stats(df_day, threshold=threshold)
+    if trends is not None:
+        stats = stats.merge(trends.day_frame(day)[["NAME_1", "delta", "trend", "trend_text"]], on="NAME_1", how="left")
+    scores = zw.scores(df_day)
+
+    reports = []
+    for r, row in stats.iterrows():
+        cells = zw.weights[r].indices
+        top = cells[top_k_indices(scores[cells], top_k)]
+        top_cells = pd.DataFrame({"lat": zw.lat[top], "lon": zw.lon[top], "risk_score": scores[top]})
+        series = None
+        if trends is not None:
+            series = trends.series_of(row["NAME_1"], pd.Timestamp(day) - pd.Timedelta(days=history_days - 1), day)
+        reports.append(state_daily_report(day, row, series, top_cells))
+    return reports
+
+
+def daily_hotspot_reports(day, df_day: pd.DataFrame, regions: Optional[Dict[str, object]] = None,
+                          threshold: float = 0.7) -> List[Report]:
+    import shapely
+    from .risk_hotspots import detect_hotspots
+
+    hot = detect_hotspots(df_day, score_threshold=threshold)
+    reports = []
+    for cluster, cells in hot.groupby("cluster"):
+        state = None
+        if regions:
+            centre = shapely.Point(cells["lon"].mean(), cells["lat"].mean())
+            state = next((n for n, g in regions.items() if g.contains(centre)), None)
+        reports.append(hotspot_daily_report(day, cluster, cells, state=state))
+    return reports
+
+
+def weekly_reports(week_end, trends) -> List[Report]:
+    week_end = pd.Timestamp(week_end)
+    reports, rows = [], []
+    for name in trends.names:
+        series = trends.series_of(name, week_end - pd.Timedelta(days=13), week_end)
+        reports.append(weekly_state_report(week_end, name, series))
+        this, prev = series["mean_risk"].iloc[-7:], series["mean_risk"].iloc[:-7]
+        rows.append({
+            "NAME_1": name,
+            "week_mean": this.mean(),
+            "prev_week_mean": prev.mean() if len(prev) else np.nan,
+            "change": this.mean() - prev.mean() if len(prev) else np.nan,
+            "max_day": this.max(),
+        })
+    reports.append(weekly_overview_report(week_end, pd.DataFrame(rows)))
+    return reports
+
+
+def main(argv=None):
+    from .risk_trends import trends_index
+    from .snapshot import get_snapshot_manager
+    from .state_geometry import load_state_geometry
+
+    ap = argparse.ArgumentParser(description="Render daily / weekly PDF reports")
+    ap.add_argument("--data", default="daily_risk.parquet")
+    ap.add_argument("--states", default="data/germany_states.geojson")
+    ap.add_argument("--date", default=None, help="YYYY-MM-DD (default: latest day)")
+    ap.add_argument("--weekly", action="store_true", help="also the week ending at --date")
+    ap.add_argument("--no-hotspots", action="store_true")
+    ap.add_argument("--threshold", type=float, default=0.7)
+    ap.add_argument("--out", default="reports")
+    ap.add_argument("--cache", default=str(DEFAULT_CACHE_DIR))
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    dataset = get_snapshot_manager(args.data).current().dataset
+    day = pd.Timestamp(args.date) if args.date else pd.Timestamp(dataset.dates[-1])
+    df_day = dataset.day_frame(day)
+    regions = load_state_geometry(args.states).shapes(0.0)
+    trends = trends_index(args.data, args.states)(dataset)
+
+    reports = daily_state_reports(day, df_day, regions, trends, threshold=args.threshold)
+    if not args.no_hotspots:
+        reports += daily_hotspot_reports(day, df_day, regions, threshold=args.threshold)
+    if args.weekly:
+        reports += weekly_reports(day, trends)
+    t1 = time.perf_counter()
+
+    cached = sum((Path(args.cache) / f"{r.key}.pdf").exists() for r in reports)
+    paths = render_reports(reports, args.out, cache_dir=args.cache, workers=args.workers)
+    print(f"{len(paths)} reports for {day:%Y-%m-%d} in {args.out} "
+          f"({len(reports) - cached} rendered, {cached} cached; data {t1 - t0:.1f}s, render {time.perf_counter() - t1:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Memory-mapped Arrow IPC copy of the daily risk table.
+
+The parquet archive is converted once into an uncompressed, day-sorted
+Arrow IPC file next to it (daily_risk.arrow). Opening that file maps it
+instead of reading it, so every session and every process shares the same
+OS page cache; per-day access is a zero-copy slice and only the rows that
+reach the UI are converted to pandas.
+"""
+from __future__ import annotations
+import os
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .risk_table import LEVEL_CATEGORIES, compact_risk_frame, dequantize_scores
+
+_META_EPOCH = b"nexus.epoch"
+_META_QUANTIZED = b"nexus.quantized"
+_META_SOURCE_MTIME = b"nexus.source_mtime"
+
+
+def arrow_path_for(parquet_path) -> Path:
+    return Path(parquet_path).with_suffix(".arrow")
+
+
+def build_arrow_cache(parquet_path, arrow_path=None, quantize: bool = False, force: bool = False) -> Path:
+    """
+    Write the compact risk table as a single-batch Arrow IPC file.
+    Skipped when the existing file was built from the same parquet version
+    with the same score encoding (float or quantized).
+    The file is written to a temp name and renamed, so readers never see
+    a partial file.
+    """
+    parquet_path = Path(parquet_path)
+    arrow_path = Path(arrow_path) if arrow_path else arrow_path_for(parquet_path)
+    src_mtime = str(parquet_path.stat().st_mtime_ns).encode()
+
+    if arrow_path.exists() and not force:
+        try:
+            with pa.memory_map(str(arrow_path)) as src:
+                meta = pa.ipc.open_file(src).schema.metadata or {}
+            if meta.get(_META_SOURCE_MTIME) == src_mtime and meta.get(_META_QUANTIZED) == (b"1" if quantize else b"0"):
+                return arrow_path
+        except pa.ArrowInvalid:
+            pass
+
+    table = compact_risk_frame(pd.read_parquet(str(parquet_path)), quantize=quantize)
+    at = pa.Table.from_pandas(table.df, preserve_index=False)
+    at = at.replace_schema_metadata({
+        **(at.schema.metadata or {}),
+        _META_EPOCH: table.epoch.isoformat().encode(),
+        _META_QUANTIZED: b"1" if table.quantized else b"0",
+        _META_SOURCE_MTIME: src_mtime,
+    })
+
+    tmp = arrow_path.with_name(f".{arrow_path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, at.schema) as writer:
+            writer.write_table(at, max_chunksize=max(at.num_rows, 1))
+    os.replace(tmp, arrow_path)
+    return arrow_path
+
+
+class ArrowRiskDataset:
+    """
+    Read-only handle over a memory-mapped risk table (same query surface
+    as RiskTable: dates, day_frame, daily_mean, levels).
+    """
+
+    def __init__(self, arrow_path):
+        self.path = Path(arrow_path)
+        self._source = pa.memory_map(str(self.path), "r")
+        self.table = pa.ipc.open_file(self._source).read_all()
+
+        meta = self.table.schema.metadata or {}
+        self.epoch = pd.Timestamp(meta[_META_EPOCH].decode())
+        self.quantized = meta.get(_META_QUANTIZED) == b"1"
+        self._score_col = "risk_score_q" if self.quantized else "risk_score"
+
+        # day column is read straight from the mapped buffer (rows are day-sorted)
+        days = self.column("day")
+        self._day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(days) else np.zeros(0, dtype=np.int64)
+        self._day_values = days[self._day_starts].astype(np.int64)
+        self._day_ends = np.r_[self._day_starts[1:], len(days)]
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the mapped data (resident only as far as it is touched).
+        """
+        return int(self.table.nbytes)
+
+    def column(self, name: str, table: Optional[pa.Table] = None) -> np.ndarray:
+        col = (self.table if table is None else table).column(name)
+        if col.num_chunks == 1:
+            return col.chunk(0).to_numpy(zero_copy_only=col.null_count == 0)
+        return col.to_numpy()
+
+    @property
+    def day_index(self):
+        """
+        (day offsets, row starts, row ends) of the day-sorted table.
+        """
+        return self._day_values, self._day_starts, self._day_ends
+
+    # --------------------------------------------------
+    # Dates / levels
+    # --------------------------------------------------
+    @property
+    def dates(self) -> List[date]:
+        return [self.date_of(d) for d in self._day_values]
+
+    def day_of(self, d) -> int:
+        return int((pd.Timestamp(d).normalize() - self.epoch).days)
+
+    def date_of(self, day: int) -> date:
+        return (self.epoch + pd.Timedelta(days=int(day))).date()
+
+    @property
+    def levels(self) -> List[str]:
+        col = self.table.column("risk_level")
+        if col.num_chunks and pa.types.is_dictionary(col.type):
+            used = set(col.chunk(0).dictionary.to_pylist())
+            return [l for l in LEVEL_CATEGORIES if l in used]
+        return list(LEVEL_CATEGORIES)
+
+    # --------------------------------------------------
+    # Access
+    # --------------------------------------------------
+    def day_table(self, d) -> pa.Table:
+        """
+        Zero-copy Arrow slice of one date (empty if the date is absent).
+        """
+        day = self.day_of(d)
+        i = np.searchsorted(self._day_values, day)
+        if i >= len(self._day_values) or self._day_values[i] != day:
+            return self.table.slice(0, 0)
+        start = int(self._day_starts[i])
+        return self.table.slice(start, int(self._day_ends[i]) - start)
+
+    def day_frame(self, d) -> pd.DataFrame:
+        """
+        One date as pandas, with a float risk_score and a `date` column.
+        """
+        part = self.day_table(d)
+        out = part.to_pandas()
+        if self.quantized:
+            out["risk_score"] = dequantize_scores(out.pop("risk_score_q").to_numpy())
+        out["date"] = pd.Timestamp(self.date_of(self.day_of(d)))
+        return out
+
+    def scores(self, table: Optional[pa.Table] = None) -> np.ndarray:
+        """
+        Float risk scores of the table or of a slice of it (only that
+        slice is dequantized).
+        """
+        s = self.column(self._score_col, table)
+        return dequantize_scores(s) if self.quantized else s
+
+    def daily_mean(self, last: Optional[int] = None) -> pd.Series:
+        """
+        Mean risk per date over the mapped score column.
+        """
+        if not len(self):
+            return pd.Series(dtype=float)
+        starts, ends, values = self._day_starts, self._day_ends, self._day_values
+        if last:
+            starts, ends, values = starts[-last:], ends[-last:], values[-last:]
+        s = self.scores()
+        sums = np.add.reduceat(s[starts[0]:].astype(np.float64), starts - starts[0])
+        return pd.Series(sums / (ends - starts), index=[self.date_of(d) for d in values], name="risk_score")
+
+
+def open_risk_dataset(parquet_path, quantize: bool = False) -> ArrowRiskDataset:
+    """
+    Build (if stale) and map the Arrow copy of a daily risk parquet file.
+    """
+    return ArrowRiskDataset(build_arrow_cache(parquet_path, quantize=quantize))
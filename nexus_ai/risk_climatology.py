@@ -0,0 +1,132 @@
+"""
+Per-cell, per-calendar-month climatology of the daily risk score.
+
+Built in one streaming pass over the risk cube (blocks of days): running
+sums give mean/std, and a small fixed-bin histogram per (month, cell) gives
+percentiles and percentile ranks without keeping the raw values.
+"""
+from __future__ import annotations
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .risk_cube import RiskCube, ensure_cube
+
+CLIM_PERCENTILES = (10, 50, 90)
+
+# days read per step while building
+_BUILD_BLOCK_DAYS = 64
+
+
+class RiskClimatology:
+    """
+    mean / std / percentiles: float32 arrays (12, cells), month index 0 = January.
+    hist: uint16 (12, cells, bins) counts of scores in [0, 1].
+    """
+
+    def __init__(self, cube: RiskCube, bins: int = 50, percentiles: Sequence[int] = CLIM_PERCENTILES):
+        self.cube = cube
+        self.bins = int(bins)
+        self.percentiles = tuple(percentiles)
+        n_cells = cube.n_cells
+
+        count = np.zeros((12, n_cells), dtype=np.int64)
+        s1 = np.zeros((12, n_cells), dtype=np.float64)
+        s2 = np.zeros((12, n_cells), dtype=np.float64)
+        hist = np.zeros((12, n_cells, self.bins), dtype=np.uint32)
+
+        months = pd.date_range(cube.epoch, periods=cube.n_days, freq="D").month.to_numpy() - 1
+        cell_base = np.arange(n_cells, dtype=np.int64) * self.bins
+        for b0 in range(0, cube.n_days, _BUILD_BLOCK_DAYS):
+            block = np.asarray(cube.data[:, b0:b0 + _BUILD_BLOCK_DAYS], dtype=np.float64)
+            block_months = months[b0:b0 + block.shape[1]]
+            for m in np.unique(block_months):
+                x = block[:, block_months == m]
+                has = ~np.isnan(x)
+                xv = np.where(has, x, 0.0)
+                count[m] += has.sum(axis=1)
+                s1[m] += xv.sum(axis=1)
+                s2[m] += (xv * xv).sum(axis=1)
+                b = np.clip((xv * self.bins).astype(np.int64), 0, self.bins - 1)
+                flat = (cell_base[:, None] + b)[has]
+                hist[m] += np.bincount(flat, minlength=n_cells * self.bins).reshape(n_cells, self.bins).astype(np.uint32)
+
+        self.count = count.astype(np.int32)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = s1 / count
+            var = np.maximum(s2 / count - mean * mean, 0.0)
+        self.mean = mean.astype(np.float32)
+        self.std = np.sqrt(var).astype(np.float32)
+        self.hist = np.minimum(hist, np.iinfo(np.uint16).max).astype(np.uint16)
+        self._cdf = np.cumsum(self.hist, axis=2, dtype=np.uint32)
+        self.quantiles = {p: self._quantile(p / 100.0) for p in self.percentiles}
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.count.nbytes + self.mean.nbytes + self.std.nbytes + self.hist.nbytes
+                   + self._cdf.nbytes + sum(q.nbytes for q in self.quantiles.values()))
+
+    def _quantile(self, q: float) -> np.ndarray:
+        """
+        (12, cells) quantile from the histograms (linear within a bin).
+        """
+        total = self._cdf[:, :, -1].astype(np.float64)
+        target = q * total
+        b = (self._cdf < target[:, :, None]).sum(axis=2)
+        b = np.minimum(b, self.bins - 1)
+        below = np.where(b > 0, np.take_along_axis(self._cdf, np.maximum(b - 1, 0)[:, :, None], axis=2)[:, :, 0], 0)
+        in_bin = np.take_along_axis(self.hist, b[:, :, None], axis=2)[:, :, 0].astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(in_bin > 0, (target - below) / in_bin, 0.0)
+        out = (b + np.clip(frac, 0.0, 1.0)) / self.bins
+        return np.where(total > 0, out, np.nan).astype(np.float32)
+
+    def percentile_rank(self, month: int, cells: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """
+        Share (0-100) of the cell's historical days in `month` below each
+        score; NaN for missing scores.
+        """
+        m = int(month) - 1
+        cells = np.asarray(cells)
+        v = np.asarray(scores, dtype=np.float64)
+        missing = np.isnan(v)
+        x = np.clip(np.where(missing, 0.0, v) * self.bins, 0.0, self.bins - 1e-9)
+        b = x.astype(np.int64)
+        cdf = self._cdf[m, cells]
+        total = cdf[:, -1].astype(np.float64)
+        below = np.where(b > 0, cdf[np.arange(len(cells)), np.maximum(b - 1, 0)], 0).astype(np.float64)
+        in_bin = self.hist[m, cells, b].astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rank = np.where(total > 0, 100.0 * (below + (x - b) * in_bin) / total, np.nan)
+        return np.where(missing, np.nan, rank).astype(np.float32)
+
+    def attach(self, df: pd.DataFrame, d) -> pd.DataFrame:
+        """
+        Copy of a day frame (lat, lon, risk_score) with clim_mean,
+        risk_anomaly (z-score vs. the cell's month) and risk_pct_rank.
+        """
+        month = pd.Timestamp(d).month
+        out = df.copy()
+        cells = self.cube.cell_ids(out["lat"].to_numpy(), out["lon"].to_numpy())
+        known = cells >= 0
+        c = np.where(known, cells, 0)
+        score = pd.to_numeric(out["risk_score"], errors="coerce").to_numpy(dtype=np.float64)
+
+        mean = self.mean[month - 1, c]
+        std = self.std[month - 1, c]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (score - mean) / np.where(std > 1e-6, std, np.nan)
+        rank = self.percentile_rank(month, c, score)
+
+        out["clim_mean"] = np.where(known, mean, np.nan).astype(np.float32)
+        out["risk_anomaly"] = np.where(known, z, np.nan).astype(np.float32)
+        out["risk_pct_rank"] = np.where(known, rank, np.nan).astype(np.float32)
+        return out
+
+
+def climatology_index(parquet_path, bins: int = 50):
+    """
+    Snapshot index builder: SnapshotManager.add_indexes({"climatology": climatology_index(path)}).
+    """
+    return lambda dataset: RiskClimatology(ensure_cube(parquet_path, dataset=dataset), bins=bins)
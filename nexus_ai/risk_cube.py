@@ -0,0 +1,245 @@
+"""
+Dense cells x days float32 cube of the daily risk archive.
+
+Stored next to the parquet as two files:
+    daily_risk.cube.npy   float32 (cells, days), C-order, opened with mmap
+    daily_risk.cube.npz   cell coordinates + metadata (epoch, source version)
+
+Each cell's history is one contiguous row, so per-cell time series,
+rolling windows and multi-day maxima are slice reads; nothing beyond the
+touched pages has to be in RAM. Missing (cell, day) values are NaN.
+"""
+from __future__ import annotations
+import os
+from datetime import date
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .risk_arrow import open_risk_dataset
+from .risk_table import LEVEL_CATEGORIES
+from .spatial_fusion import CellNeighbourIndex
+from .utils import RISK_LEVELS
+
+# days written per block while building (bounds memory to cells * block)
+_BUILD_BLOCK_DAYS = 64
+
+
+def cube_paths_for(parquet_path) -> Tuple[Path, Path]:
+    p = Path(parquet_path)
+    return p.with_suffix(".cube.npy"), p.with_suffix(".cube.npz")
+
+
+def _cell_keys(lat, lon) -> np.ndarray:
+    """
+    Exact (float32 lat, float32 lon) -> sortable int64 key.
+    """
+    la = np.ascontiguousarray(lat, dtype=np.float32).view(np.uint32).astype(np.uint64)
+    lo = np.ascontiguousarray(lon, dtype=np.float32).view(np.uint32).astype(np.uint64)
+    return ((la << np.uint64(32)) | lo).view(np.int64)
+
+
+def _source_version(parquet_path) -> str:
+    st = Path(parquet_path).stat()
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+class RiskCube:
+    def __init__(self, data: np.ndarray, lat: np.ndarray, lon: np.ndarray, epoch: pd.Timestamp, source_version: str = "",
+                 path: Optional[Path] = None):
+        self.data = data
+        self.lat = lat
+        self.lon = lon
+        self.epoch = epoch
+        self.source_version = source_version
+        # cube file (None for an in-memory cube); derived indexes store files next to it
+        self.path = path
+        self._keys = _cell_keys(lat, lon)
+        self._order = np.argsort(self._keys, kind="stable")
+        self._index: Optional[CellNeighbourIndex] = None
+
+    @classmethod
+    def open(cls, cube_path, meta_path) -> "RiskCube":
+        meta = np.load(str(meta_path))
+        data = np.load(str(cube_path), mmap_mode="r")
+        if data.shape != (len(meta["lat"]), int(meta["n_days"])):
+            raise ValueError(f"Cube {cube_path} does not match its metadata (rebuild needed).")
+        return cls(data, meta["lat"], meta["lon"], pd.Timestamp(str(meta["epoch"])), str(meta["source_version"]),
+                   path=Path(cube_path))
+
+    # --------------------------------------------------
+    # Shape / dates
+    # --------------------------------------------------
+    @property
+    def n_cells(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def n_days(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def dates(self) -> List[date]:
+        return [d.date() for d in pd.date_range(self.epoch, periods=self.n_days, freq="D")]
+
+    def day_of(self, d) -> int:
+        return int((pd.Timestamp(d).normalize() - self.epoch).days)
+
+    def date_of(self, day: int) -> date:
+        return (self.epoch + pd.Timedelta(days=int(day))).date()
+
+    def day_range(self, start=None, end=None) -> Tuple[int, int]:
+        """
+        Inclusive date range -> clipped [d0, d1) column range (empty when
+        the range lies outside the archive).
+        """
+        d0 = 0 if start is None else min(max(self.day_of(start), 0), self.n_days)
+        d1 = self.n_days if end is None else min(self.day_of(end) + 1, self.n_days)
+        return d0, max(d0, d1)
+
+    # --------------------------------------------------
+    # Cells
+    # --------------------------------------------------
+    def cell_ids(self, lat, lon) -> np.ndarray:
+        """
+        Exact coordinate lookup (float32 grid coordinates); -1 if unknown.
+        """
+        keys = _cell_keys(np.atleast_1d(lat), np.atleast_1d(lon))
+        pos = np.searchsorted(self._keys[self._order], keys)
+        pos = np.clip(pos, 0, len(self._order) - 1)
+        hit = self._keys[self._order][pos] == keys
+        return np.where(hit, self._order[pos], -1)
+
+    def nearest_cell(self, lat, lon) -> np.ndarray:
+        if self._index is None:
+            self._index = CellNeighbourIndex(self.lat, self.lon)
+        return self._index.nearest(lat, lon)[0]
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+    def series(self, cell: int, start=None, end=None) -> pd.Series:
+        """
+        One cell's history (contiguous row slice).
+        """
+        d0, d1 = self.day_range(start, end)
+        idx = pd.date_range(self.epoch + pd.Timedelta(days=d0), periods=d1 - d0, freq="D")
+        return pd.Series(np.asarray(self.data[int(cell), d0:d1]), index=idx, name="risk_score")
+
+    def window(self, start=None, end=None, cells=None) -> np.ndarray:
+        """
+        (cells, days) view for a date range (no copy for a full-cell read).
+        """
+        d0, d1 = self.day_range(start, end)
+        return self.data[:, d0:d1] if cells is None else self.data[np.asarray(cells), d0:d1]
+
+    def day(self, d) -> np.ndarray:
+        return np.asarray(self.data[:, self.day_of(d)])
+
+    def day_frame(self, d, cells=None) -> pd.DataFrame:
+        """
+        One date as a day frame (lat, lon, risk_score, risk_level, date),
+        reading only the given cells (e.g. a window query's result).
+        Cells without data that day are dropped.
+        """
+        rows = np.arange(self.n_cells) if cells is None else np.asarray(cells, dtype=np.int64)
+        day = self.day_of(d)
+        if 0 <= day < self.n_days:
+            score = np.asarray(self.data[rows, day])
+        else:
+            score = np.full(len(rows), np.nan, dtype=np.float32)
+        keep = ~np.isnan(score)
+        rows, score = rows[keep], score[keep]
+        return pd.DataFrame({
+            "lat": self.lat[rows],
+            "lon": self.lon[rows],
+            "risk_score": score,
+            "risk_level": RISK_LEVELS.classify(score).rename_categories(list(LEVEL_CATEGORIES)),
+            "date": pd.Timestamp(self.date_of(day)),
+        })
+
+    def rolling_mean(self, cell: int, window: int, start=None, end=None) -> pd.Series:
+        return self.series(cell, start, end).rolling(window, min_periods=1).mean()
+
+    def max_over(self, start=None, end=None, block_cells: int = 65536) -> np.ndarray:
+        """
+        Per-cell maximum over a date range, read in cell blocks.
+        """
+        d0, d1 = self.day_range(start, end)
+        out = np.full(self.n_cells, np.nan, dtype=np.float32)
+        if d1 <= d0:
+            return out
+        for c0 in range(0, self.n_cells, block_cells):
+            block = self.data[c0:c0 + block_cells, d0:d1]
+            with np.errstate(invalid="ignore"):
+                has = ~np.isnan(block).all(axis=1)
+                out[c0:c0 + block_cells][has] = np.nanmax(block[has], axis=1)
+        return out
+
+
+def build_cube(parquet_path, dataset=None) -> RiskCube:
+    """
+    Build the cube files from the (memory-mapped) risk dataset, one block of
+    days at a time. Files are written under temp names and renamed.
+    """
+    parquet_path = Path(parquet_path)
+    cube_path, meta_path = cube_paths_for(parquet_path)
+    version = _source_version(parquet_path)
+    dataset = dataset if dataset is not None else open_risk_dataset(parquet_path)
+
+    # cell table: every distinct coordinate pair in the archive
+    lat = dataset.column("lat")
+    lon = dataset.column("lon")
+    keys, first = np.unique(_cell_keys(lat, lon), return_index=True)
+    cell_lat, cell_lon = lat[first].astype(np.float32), lon[first].astype(np.float32)
+    days, starts, ends = dataset.day_index
+    n_days = int(days[-1]) + 1 if len(days) else 0
+
+    tmp_cube = cube_path.with_name(f".{cube_path.name}.{os.getpid()}.tmp.npy")
+    cube = np.lib.format.open_memmap(str(tmp_cube), mode="w+", dtype=np.float32, shape=(len(keys), n_days))
+
+    scores = dataset.scores()
+    for b0 in range(0, n_days, _BUILD_BLOCK_DAYS):
+        b1 = min(b0 + _BUILD_BLOCK_DAYS, n_days)
+        block = np.full((len(keys), b1 - b0), np.nan, dtype=np.float32)
+        for i in np.flatnonzero((days >= b0) & (days < b1)):
+            s, e = starts[i], ends[i]
+            cell = np.searchsorted(keys, _cell_keys(lat[s:e], lon[s:e]))
+            block[cell, days[i] - b0] = scores[s:e]
+        cube[:, b0:b1] = block
+    cube.flush()
+    del cube
+
+    tmp_meta = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp.npz")
+    np.savez(
+        str(tmp_meta),
+        lat=cell_lat, lon=cell_lon, n_days=n_days,
+        epoch=str(dataset.epoch.date()), source_version=version,
+    )
+    os.replace(tmp_cube, cube_path)
+    os.replace(tmp_meta, meta_path)
+    return RiskCube.open(cube_path, meta_path)
+
+
+def ensure_cube(parquet_path, dataset=None) -> RiskCube:
+    """
+    Open the cube, rebuilding it when it is missing or older than the parquet.
+    """
+    cube_path, meta_path = cube_paths_for(parquet_path)
+    if cube_path.exists() and meta_path.exists():
+        try:
+            cube = RiskCube.open(cube_path, meta_path)
+            if cube.source_version == _source_version(parquet_path):
+                return cube
+        except (ValueError, OSError, KeyError):
+            pass
+    return build_cube(parquet_path, dataset=dataset)
+
+
+def cube_index(parquet_path):
+    """
+    Snapshot index builder: SnapshotManager.add_indexes({"cube": cube_index(path)}).
+    """
+    return lambda dataset: ensure_cube(parquet_path, dataset=dataset)
@@ -0,0 +1,88 @@
+"""
+High-risk cluster detection on a day's grid (no UI dependencies, so the
+API and exports can use it; components/hotspots.py renders the result).
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+try:
+    from sklearn.cluster import DBSCAN
+except ImportError:
+    DBSCAN = None
+
+
+def _radius_clusters(coords, eps, min_samples):
+    """
+    DBSCAN labels without sklearn: core points have >= min_samples points
+    within eps (self included); cores within eps are one cluster, border
+    points join a neighbouring core's cluster, the rest is noise (-1).
+    """
+    n = len(coords)
+    pairs = cKDTree(coords).query_pairs(eps, output_type="ndarray")
+    i, j = pairs[:, 0], pairs[:, 1]
+    core = np.bincount(np.r_[i, j], minlength=n) + 1 >= min_samples
+
+    both = core[i] & core[j]
+    graph = sparse.coo_matrix((np.ones(int(both.sum())), (i[both], j[both])), shape=(n, n))
+    _, comp = connected_components(graph, directed=False)
+
+    labels = np.full(n, -1, dtype=np.int64)
+    _, labels[core] = np.unique(comp[core], return_inverse=True)
+    for a, b in ((i, j), (j, i)):
+        border = core[a] & ~core[b] & (labels[b] == -1)
+        labels[b[border]] = labels[a[border]]
+    return labels
+
+
+def detect_hotspots(df, score_threshold=0.7, eps_km=25, min_samples=10):
+    if df.empty:
+        return df.iloc[0:0].copy()
+
+    lat_col = next((c for c in df.columns if c.lower() in ["lat", "latitude"]), None)
+    lon_col = next((c for c in df.columns if c.lower() in ["lon", "long", "longitude"]), None)
+    if lat_col is None or lon_col is None:
+        raise ValueError("Latitude/Longitude columns not found in df.")
+    if "risk_score" not in df.columns:
+        raise ValueError("Column 'risk_score' not found in df.")
+
+    dfh = df[df["risk_score"] >= score_threshold].dropna(subset=[lat_col, lon_col]).copy()
+    if dfh.empty:
+        return dfh
+
+    # km -> degrees (approx): 1 deg ~ 111 km
+    eps_deg = eps_km / 111.0
+
+    coords = dfh[[lat_col, lon_col]].to_numpy()
+    if DBSCAN is not None:
+        labels = DBSCAN(eps=eps_deg, min_samples=min_samples).fit_predict(coords)
+    else:
+        labels = _radius_clusters(coords, eps_deg, min_samples)
+    dfh["cluster"] = labels
+
+    dfh = dfh[dfh["cluster"] != -1].copy()
+    return dfh
+
+
+def summarize_hotspots(dfh):
+    """
+    One row per cluster: cells, centre (lat / lon), mean / max risk and extent.
+    """
+    if dfh.empty:
+        return pd.DataFrame(columns=["cluster", "cells", "lat", "lon", "mean_risk", "max_risk",
+                                     "lat_min", "lat_max", "lon_min", "lon_max"])
+    lat_col = next(c for c in dfh.columns if c.lower() in ["lat", "latitude"])
+    lon_col = next(c for c in dfh.columns if c.lower() in ["lon", "long", "longitude"])
+    return dfh.groupby("cluster").agg(
+        cells=("risk_score", "size"),
+        lat=(lat_col, "mean"),
+        lon=(lon_col, "mean"),
+        mean_risk=("risk_score", "mean"),
+        max_risk=("risk_score", "max"),
+        lat_min=(lat_col, "min"),
+        lat_max=(lat_col, "max"),
+        lon_min=(lon_col, "min"),
+        lon_max=(lon_col, "max"),
+    ).reset_index()
@@ -0,0 +1,203 @@
+"""
+Hierarchical aggregation of the risk grid: cell -> district -> state -> country.
+
+Each region level is a sparse (regions x cells) weight matrix built once
+from boundary polygons, so all levels of a day come from a handful of sparse
+matrix-vector products. Weights are the fraction of each cell inside the
+region (overlap=True, see zonal.py) or 1 per cell whose centre is inside,
+times the cell's relative area (cos(lat)) with area_weighted=True.
+
+District boundaries are optional (e.g. Landkreise as a local GeoJSON file);
+without them the pyramid is cell -> state -> country.
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .risk_cube import _cell_keys, ensure_cube
+from .risk_window import GridWindowIndex, load_regions
+from .zonal import ZONAL_COLUMNS, overlap_weights, zonal_stats
+
+LEVELS = ("cell", "district", "state", "country")
+COUNTRY_NAME = "Germany"
+
+
+@dataclass(frozen=True)
+class RegionLevel:
+    name: str
+    regions: List[str]
+    weights: sparse.csr_matrix   # (regions, cells) membership / overlap fraction
+    parent: np.ndarray           # region -> row in the next coarser level (-1: none)
+
+
+def cell_area_weights(lat) -> np.ndarray:
+    """
+    Relative cell area on a regular lat/lon grid (proportional to cos(lat)).
+    """
+    return np.cos(np.radians(np.asarray(lat, dtype=np.float64)))
+
+
+def membership_matrix(index: GridWindowIndex, regions: Dict[str, object], cell_weights=None) -> sparse.csr_matrix:
+    """
+    (regions x cells) matrix: cell_weights[c] (or 1) where cell c's centre is in the region.
+    """
+    rows, cols = [], []
+    for r, geom in enumerate(regions.values()):
+        cells = index.cells(geom)
+        rows.append(np.full(len(cells), r, dtype=np.int64))
+        cols.append(cells)
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    data = np.ones(len(cols)) if cell_weights is None else np.asarray(cell_weights, dtype=np.float64)[cols]
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(regions), len(index)))
+
+
+class RiskPyramid:
+    """
+    levels: coarse-to-fine independent boundary sets, e.g.
+        {"district": {name: geom}, "state": {name: geom}}
+    The country level is the union of the coarsest given level.
+    """
+
+    def __init__(
+        self,
+        lat,
+        lon,
+        levels: Dict[str, Dict[str, object]],
+        area_weighted: bool = True,
+        overlap: bool = True,
+        cache_size: int = 32,
+    ):
+        self.lat = np.asarray(lat, dtype=np.float32)
+        self.lon = np.asarray(lon, dtype=np.float32)
+        self.n_cells = len(self.lat)
+        self.area_weighted = area_weighted
+        self.cell_weights = cell_area_weights(self.lat) if area_weighted else np.ones(self.n_cells)
+
+        ordered = [name for name in LEVELS if name in levels and levels[name]]
+        if overlap:
+            mats = {name: overlap_weights(self.lat, self.lon, levels[name]) for name in ordered}
+        else:
+            index = GridWindowIndex(self.lat, self.lon)
+            mats = {name: membership_matrix(index, levels[name]) for name in ordered}
+
+        # country = union of the coarsest level
+        if ordered:
+            in_country = np.minimum(np.asarray(mats[ordered[-1]].sum(axis=0)).ravel(), 1.0)
+        else:
+            in_country = np.ones(self.n_cells)
+        mats["country"] = sparse.csr_matrix(in_country[None, :])
+        ordered.append("country")
+        names = {name: list(levels[name]) for name in ordered[:-1]}
+        names["country"] = [COUNTRY_NAME]
+
+        self.levels: Dict[str, RegionLevel] = {}
+        for i, name in enumerate(ordered):
+            weights = mats[name]
+            parent = np.full(weights.shape[0], -1, dtype=np.int64)
+            if i + 1 < len(ordered):
+                # parent = coarser region sharing the most area
+                shared = (weights @ mats[ordered[i + 1]].T).toarray()
+                has = shared.max(axis=1) > 0 if shared.size else np.zeros(len(parent), dtype=bool)
+                parent[has] = shared[has].argmax(axis=1)
+            self.levels[name] = RegionLevel(name, names[name], weights, parent)
+
+        self._keys = _cell_keys(self.lat, self.lon)
+        self._order = np.argsort(self._keys, kind="stable")
+        self._cache: "OrderedDict[Hashable, Dict[str, pd.DataFrame]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    @property
+    def level_names(self) -> List[str]:
+        return list(self.levels)
+
+    def parent_level(self, level: str) -> Optional[str]:
+        names = self.level_names
+        i = names.index(level)
+        return names[i + 1] if i + 1 < len(names) else None
+
+    def child_level(self, level: str) -> Optional[str]:
+        names = self.level_names
+        i = names.index(level)
+        return names[i - 1] if i > 0 else None
+
+    # --------------------------------------------------
+    # Aggregation
+    # --------------------------------------------------
+    def cell_ids(self, lat, lon) -> np.ndarray:
+        keys = _cell_keys(np.asarray(lat, dtype=np.float32), np.asarray(lon, dtype=np.float32))
+        sorted_keys = self._keys[self._order]
+        pos = np.clip(np.searchsorted(sorted_keys, keys), 0, max(len(sorted_keys) - 1, 0))
+        return np.where(sorted_keys[pos] == keys, self._order[pos], -1)
+
+    def scores_from_frame(self, df: pd.DataFrame, score_col: str = "risk_score") -> np.ndarray:
+        """
+        Frame rows -> per-cell score vector (NaN for cells not in the frame).
+        """
+        x = np.full(self.n_cells, np.nan)
+        cells = self.cell_ids(df["lat"].to_numpy(), df["lon"].to_numpy())
+        known = cells >= 0
+        x[cells[known]] = pd.to_numeric(df[score_col], errors="coerce").to_numpy(dtype=np.float64)[known]
+        return x
+
+    def aggregate(self, scores, threshold: float = 0.7) -> Dict[str, pd.DataFrame]:
+        """
+        level -> DataFrame(region, parent, mean_risk, max_risk, share_above,
+        cells) for one cell vector.
+        """
+        x = np.asarray(scores, dtype=np.float64)
+        out = {}
+        for name, lvl in self.levels.items():
+            parent_lvl = self.parent_level(name)
+            parents = [self.levels[parent_lvl].regions[p] if p >= 0 else None for p in lvl.parent] if parent_lvl else [None] * len(lvl.regions)
+            stats = zonal_stats(lvl.weights, x, threshold=threshold, area=self.cell_weights)
+            stats.insert(0, "parent", parents)
+            stats.insert(0, "region", lvl.regions)
+            out[name] = stats
+        return out
+
+    def day(self, key: Hashable, scores=None, df: Optional[pd.DataFrame] = None, threshold: float = 0.7) -> Dict[str, pd.DataFrame]:
+        """
+        Cached aggregate() per key (e.g. (version, period, filter, threshold));
+        pass a cell vector or a frame with lat / lon / risk_score.
+        """
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+        out = self.aggregate(scores if scores is not None else self.scores_from_frame(df), threshold=threshold)
+        with self._lock:
+            self._cache[key] = out
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return out
+
+    def children(self, result: Dict[str, pd.DataFrame], level: str, region: str) -> pd.DataFrame:
+        """
+        Rows of the next finer level whose parent is `region` (drill-down).
+        """
+        child = self.child_level(level)
+        if child is None:
+            return pd.DataFrame(columns=["region", "parent"] + ZONAL_COLUMNS)
+        frame = result[child]
+        return frame[frame["parent"] == region]
+
+
+def pyramid_index(parquet_path, boundaries: Dict[str, object], area_weighted: bool = True, overlap: bool = True):
+    """
+    Snapshot index builder over the cube's cell table, boundaries as
+    {level: geojson path}: SnapshotManager.add_indexes({"pyramid": pyramid_index(path, {...})}).
+    """
+    def build(dataset):
+        cube = ensure_cube(parquet_path, dataset=dataset)
+        levels = {name: load_regions(p) for name, p in boundaries.items() if p is not None}
+        return RiskPyramid(cube.lat, cube.lon, levels, area_weighted=area_weighted, overlap=overlap)
+    return build
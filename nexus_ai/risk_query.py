@@ -0,0 +1,115 @@
+"""
+Top-K and percentile queries with partial selection (np.argpartition /
+np.partition) instead of full sorts, plus a small per-day result cache.
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def top_k_indices(values, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Positions of the k largest (or smallest) values, best first. NaNs never win.
+    O(n + k log k).
+    """
+    v = np.asarray(values, dtype=np.float64)
+    v = np.where(np.isnan(v), -np.inf if largest else np.inf, v)
+    n = len(v)
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    key = -v if largest else v
+    part = np.argpartition(key, k - 1)[:k] if k < n else np.arange(n)
+    return part[np.argsort(key[part], kind="stable")]
+
+
+def top_k_rows(df: pd.DataFrame, column: str, k: int, largest: bool = True) -> pd.DataFrame:
+    """
+    Drop-in for df.sort_values(column, ascending=not largest).head(k).
+    """
+    if df is None or df.empty:
+        return df
+    scores = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+    return df.iloc[top_k_indices(scores, k, largest=largest)]
+
+
+def percentiles(values, qs: Sequence[float]) -> Dict[float, float]:
+    """
+    Percentiles (0-100, linear interpolation like np.percentile) from one
+    np.partition over the needed order statistics.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    v = v[~np.isnan(v)]
+    if not len(v):
+        return {q: float("nan") for q in qs}
+    pos = {q: (len(v) - 1) * q / 100.0 for q in qs}
+    kth = sorted({int(np.floor(p)) for p in pos.values()} | {int(np.ceil(p)) for p in pos.values()})
+    part = np.partition(v, kth)
+    out = {}
+    for q, p in pos.items():
+        lo, hi = int(np.floor(p)), int(np.ceil(p))
+        out[q] = float(part[lo] + (part[hi] - part[lo]) * (p - lo))
+    return out
+
+
+class DayQuery:
+    """
+    Queries over one day's grid; results are memoized per argument set.
+    """
+
+    def __init__(self, df: pd.DataFrame, score_col: str = "risk_score"):
+        self.df = df
+        self.scores = pd.to_numeric(df[score_col], errors="coerce").to_numpy(dtype=np.float64)
+        self._memo: Dict[Hashable, object] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key, fn):
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        out = fn()
+        with self._lock:
+            self._memo[key] = out
+        return out
+
+    def top_cells(self, k: int = 10, largest: bool = True) -> pd.DataFrame:
+        return self._cached(("top", k, largest), lambda: self.df.iloc[top_k_indices(self.scores, k, largest)])
+
+    def percentiles(self, qs: Sequence[float] = (50, 90, 99)) -> Dict[float, float]:
+        return self._cached(("pct", tuple(qs)), lambda: percentiles(self.scores, qs))
+
+    def share_above(self, threshold: float) -> float:
+        def run():
+            valid = ~np.isnan(self.scores)
+            return float((self.scores[valid] >= threshold).mean()) if valid.any() else 0.0
+        return self._cached(("above", threshold), run)
+
+
+def top_states(states: pd.DataFrame, k: int = 3, column: str = "mean_risk", largest: bool = True) -> pd.DataFrame:
+    return top_k_rows(states, column, k, largest=largest)
+
+
+_DAY_CACHE: "OrderedDict[Hashable, DayQuery]" = OrderedDict()
+_DAY_CACHE_LOCK = threading.Lock()
+_DAY_CACHE_SIZE = 32
+
+
+def day_query(key: Hashable, df: pd.DataFrame, score_col: str = "risk_score") -> DayQuery:
+    """
+    Shared DayQuery per key (e.g. (dataset version, date, filter)), LRU-bounded.
+    """
+    with _DAY_CACHE_LOCK:
+        q = _DAY_CACHE.get(key)
+        if q is not None:
+            _DAY_CACHE.move_to_end(key)
+            return q
+    q = DayQuery(df, score_col=score_col)
+    with _DAY_CACHE_LOCK:
+        _DAY_CACHE[key] = q
+        while len(_DAY_CACHE) > _DAY_CACHE_SIZE:
+            _DAY_CACHE.popitem(last=False)
+    return q
@@ -0,0 +1,210 @@
+"""
+Date-range aggregation over the risk cube in time independent of the
+range length.
+
+- mean / sum / count: per-cell prefix sums, one subtraction per cell
+- max / min: block extrema (block_days wide) with a sparse table over the
+  blocks, plus at most two partial edge blocks read from the cube
+
+The prefix sums are (cells, days + 1) float64 / int32, several times the
+float32 cube, so for a cube opened from disk they are stored next to it
+and memory-mapped like the cube itself:
+    daily_risk.cube.csum.npy     float64 running sums
+    daily_risk.cube.ccount.npy   int32 running counts of days with data
+    daily_risk.cube.sums.npz     source version of the cube they belong to
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .risk_cube import RiskCube, ensure_cube
+from .risk_table import LEVEL_CATEGORIES
+from .utils import RISK_LEVELS
+
+AGGREGATIONS = ("mean", "max", "min")
+
+# cells processed per step while building (bounds temporary memory)
+_BUILD_BLOCK_CELLS = 16384
+
+
+def sums_paths_for(cube_path) -> Tuple[Path, Path, Path]:
+    p = Path(cube_path)
+    return p.with_suffix(".csum.npy"), p.with_suffix(".ccount.npy"), p.with_suffix(".sums.npz")
+
+
+def _open_sums(cube: RiskCube, shape) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Memory-mapped prefix sums stored for this cube, None if missing / stale.
+    """
+    if cube.path is None:
+        return None
+    csum_path, ccount_path, meta_path = sums_paths_for(cube.path)
+    try:
+        if str(np.load(str(meta_path))["source_version"]) != cube.source_version:
+            return None
+        csum = np.load(str(csum_path), mmap_mode="r")
+        ccount = np.load(str(ccount_path), mmap_mode="r")
+    except (ValueError, OSError, KeyError):
+        return None
+    if csum.shape != shape or ccount.shape != shape:
+        return None
+    return csum, ccount
+
+
+class RangeAggregator:
+    def __init__(self, cube: RiskCube, block_days: int = 32):
+        self.cube = cube
+        self.block_days = int(block_days)
+        n_cells, n_days = cube.data.shape
+        self.n_blocks = n_days // self.block_days
+
+        shape = (n_cells, n_days + 1)
+        sums = _open_sums(cube, shape)
+        build_sums = sums is None
+        if not build_sums:
+            self._csum, self._ccount = sums
+        elif cube.path is None:
+            self._csum = np.zeros(shape, dtype=np.float64)
+            self._ccount = np.zeros(shape, dtype=np.int32)
+        else:
+            # written under temp names and renamed (as the cube itself)
+            tmp = [p.with_name(f".{p.name}.{os.getpid()}.tmp.npy") for p in sums_paths_for(cube.path)[:2]]
+            self._csum = np.lib.format.open_memmap(str(tmp[0]), mode="w+", dtype=np.float64, shape=shape)
+            self._ccount = np.lib.format.open_memmap(str(tmp[1]), mode="w+", dtype=np.int32, shape=shape)
+        bmax = np.full((n_cells, self.n_blocks), np.nan, dtype=np.float32)
+        bmin = np.full((n_cells, self.n_blocks), np.nan, dtype=np.float32)
+
+        full = self.n_blocks * self.block_days
+        for c0 in range(0, n_cells, _BUILD_BLOCK_CELLS):
+            rows = slice(c0, c0 + _BUILD_BLOCK_CELLS)
+            x = np.asarray(cube.data[rows])
+            has = ~np.isnan(x)
+            if build_sums:
+                np.cumsum(np.where(has, x, 0.0), axis=1, out=self._csum[rows, 1:])
+                np.cumsum(has, axis=1, out=self._ccount[rows, 1:])
+            if self.n_blocks:
+                xb = x[:, :full].reshape(x.shape[0], self.n_blocks, self.block_days)
+                bmax[rows] = np.fmax.reduce(xb, axis=2)
+                bmin[rows] = np.fmin.reduce(xb, axis=2)
+        if build_sums and cube.path is not None:
+            self._csum, self._ccount = self._store_sums(tmp)
+
+        # sparse tables over blocks: level k covers 2**k consecutive blocks
+        self._smax: List[np.ndarray] = [bmax]
+        self._smin: List[np.ndarray] = [bmin]
+        k = 1
+        while (1 << k) <= self.n_blocks:
+            half = 1 << (k - 1)
+            prev_max, prev_min = self._smax[-1], self._smin[-1]
+            self._smax.append(np.fmax(prev_max[:, :-half], prev_max[:, half:]))
+            self._smin.append(np.fmin(prev_min[:, :-half], prev_min[:, half:]))
+            k += 1
+
+    def _store_sums(self, tmp: List[Path]) -> Tuple[np.ndarray, np.ndarray]:
+        csum_path, ccount_path, meta_path = sums_paths_for(self.cube.path)
+        self._csum.flush()
+        self._ccount.flush()
+        self._csum = self._ccount = None
+        tmp_meta = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp.npz")
+        np.savez(str(tmp_meta), source_version=self.cube.source_version)
+        os.replace(tmp[0], csum_path)
+        os.replace(tmp[1], ccount_path)
+        # meta last: a half-written set never matches the cube version
+        os.replace(tmp_meta, meta_path)
+        return np.load(str(csum_path), mmap_mode="r"), np.load(str(ccount_path), mmap_mode="r")
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held in RAM (memory-mapped prefix sums are not counted).
+        """
+        sums = [a for a in (self._csum, self._ccount) if not isinstance(a, np.memmap)]
+        return int(sum(a.nbytes for a in sums)
+                   + sum(a.nbytes for a in self._smax) + sum(a.nbytes for a in self._smin))
+
+    # --------------------------------------------------
+    # Queries (inclusive date range; None = open end; cells = cube rows
+    # to read, e.g. a window query's result, default all)
+    # --------------------------------------------------
+    def _range(self, start, end) -> Tuple[int, int]:
+        return self.cube.day_range(start, end)
+
+    @staticmethod
+    def _rows(cells):
+        return slice(None) if cells is None else np.asarray(cells, dtype=np.int64)
+
+    def count(self, start=None, end=None, cells=None) -> np.ndarray:
+        d0, d1 = self._range(start, end)
+        rows = self._rows(cells)
+        return self._ccount[rows, d1] - self._ccount[rows, d0]
+
+    def sum(self, start=None, end=None, cells=None) -> np.ndarray:
+        d0, d1 = self._range(start, end)
+        rows = self._rows(cells)
+        return self._csum[rows, d1] - self._csum[rows, d0]
+
+    def mean(self, start=None, end=None, cells=None) -> np.ndarray:
+        n = self.count(start, end, cells)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, self.sum(start, end, cells) / n, np.nan).astype(np.float32)
+
+    def _extreme(self, start, end, table: List[np.ndarray], op, cells=None) -> np.ndarray:
+        d0, d1 = self._range(start, end)
+        rows = self._rows(cells)
+        out = np.full(self.cube.n_cells if cells is None else len(rows), np.nan, dtype=np.float32)
+        if d1 <= d0:
+            return out
+        B = self.block_days
+        b0, b1 = -(-d0 // B), d1 // B
+
+        if b0 >= b1:
+            return op.reduce(np.asarray(self.cube.data[rows, d0:d1]), axis=1)
+
+        k = (b1 - b0).bit_length() - 1
+        out = op(table[k][rows, b0], table[k][rows, b1 - (1 << k)])
+        if d0 < b0 * B:
+            out = op(out, op.reduce(np.asarray(self.cube.data[rows, d0:b0 * B]), axis=1))
+        if b1 * B < d1:
+            out = op(out, op.reduce(np.asarray(self.cube.data[rows, b1 * B:d1]), axis=1))
+        return out
+
+    def max(self, start=None, end=None, cells=None) -> np.ndarray:
+        return self._extreme(start, end, self._smax, np.fmax, cells)
+
+    def min(self, start=None, end=None, cells=None) -> np.ndarray:
+        return self._extreme(start, end, self._smin, np.fmin, cells)
+
+    def aggregate(self, start=None, end=None, how: str = "mean", cells=None) -> np.ndarray:
+        if how not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation: {how} (expected one of {AGGREGATIONS})")
+        return getattr(self, how)(start, end, cells)
+
+    def frame(self, start=None, end=None, how: str = "mean", cells=None) -> pd.DataFrame:
+        """
+        Map for a date range over all cells or only `cells`: lat, lon,
+        risk_score, risk_level, days (days with data). Cells without data
+        in the range are dropped.
+        """
+        score = self.aggregate(start, end, how, cells)
+        days = self.count(start, end, cells)
+        keep = days > 0
+        idx = np.flatnonzero(keep) if cells is None else np.asarray(cells, dtype=np.int64)[keep]
+        score = score[keep]
+        return pd.DataFrame({
+            "lat": self.cube.lat[idx],
+            "lon": self.cube.lon[idx],
+            "risk_score": score,
+            "risk_level": RISK_LEVELS.classify(score).rename_categories(list(LEVEL_CATEGORIES)),
+            "days": days[keep],
+        })
+
+
+def ranges_index(parquet_path, block_days: int = 32):
+    """
+    Snapshot index builder: SnapshotManager.add_indexes({"ranges": ranges_index(path)}).
+    """
+    return lambda dataset: RangeAggregator(ensure_cube(parquet_path, dataset=dataset), block_days=block_days)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .utils import RISK_LEVELS
+
+# Stored level categories (lowercase, as the maps expect)
+LEVEL_CATEGORIES = tuple(l.lower() for l in RISK_LEVELS.labels)
+
+# uint16 quantization step for scores in [0, 1]
+SCORE_Q_MAX = np.iinfo(np.uint16).max
+
+_DATE_COLS = ("date", "time")
+_LAT_COLS = ("lat", "latitude")
+_LON_COLS = ("lon", "long", "longitude")
+
+
+def _pick(df: pd.DataFrame, names) -> Optional[str]:
+    return next((c for c in df.columns if c.lower() in names), None)
+
+
+def quantize_scores(scores) -> np.ndarray:
+    s = np.clip(np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=0.0), 0.0, 1.0)
+    return np.rint(s * SCORE_Q_MAX).astype(np.uint16)
+
+
+def dequantize_scores(q) -> np.ndarray:
+    return (np.asarray(q, dtype=np.float32) / np.float32(SCORE_Q_MAX)).astype(np.float32)
+
+
+class RiskTable:
+    """
+    Daily risk grid in a compact, schema-checked layout:
+
+    - day        int16 offset from `epoch` (rows sorted by day)
+    - lat / lon  float32
+    - risk_score float32, or risk_score_q uint16 when quantized
+    - risk_level categorical (one byte per row)
+    - other numeric columns downcast to 32 bit, strings categorical
+    """
+
+    def __init__(self, df: pd.DataFrame, epoch: pd.Timestamp, quantized: bool = False):
+        self.df = df
+        self.epoch = epoch
+        self.quantized = quantized
+        days = df["day"].to_numpy()
+        self._day_values, self._day_starts = np.unique(days, return_index=True)
+        self._day_ends = np.r_[self._day_starts[1:], len(days)]
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.df.memory_usage(index=True, deep=True).sum())
+
+    # --------------------------------------------------
+    # Dates
+    # --------------------------------------------------
+    @property
+    def dates(self) -> List[date]:
+        return [self.date_of(d) for d in self._day_values]
+
+    def day_of(self, d) -> int:
+        return int((pd.Timestamp(d).normalize() - self.epoch).days)
+
+    def date_of(self, day: int) -> date:
+        return (self.epoch + pd.Timedelta(days=int(day))).date()
+
+    # --------------------------------------------------
+    # Access
+    # --------------------------------------------------
+    def scores(self, df: Optional[pd.DataFrame] = None) -> np.ndarray:
+        df = self.df if df is None else df
+        if self.quantized:
+            return dequantize_scores(df["risk_score_q"].to_numpy())
+        return df["risk_score"].to_numpy()
+
+    def day_frame(self, d) -> pd.DataFrame:
+        """
+        Rows of one date (contiguous slice, no scan) with a float risk_score
+        and a `date` column for the UI.
+        """
+        day = self.day_of(d)
+        i = np.searchsorted(self._day_values, day)
+        if i >= len(self._day_values) or self._day_values[i] != day:
+            return self.df.iloc[0:0].assign(risk_score=np.float32(0), date=pd.NaT)
+        out = self.df.iloc[self._day_starts[i]:self._day_ends[i]]
+        if self.quantized:
+            out = out.assign(risk_score=self.scores(out))
+        return out.assign(date=pd.Timestamp(self.date_of(day)))
+
+    def daily_mean(self, last: Optional[int] = None) -> pd.Series:
+        """
+        Mean risk per date (one reduceat over the day-sorted scores).
+        """
+        s = self.scores().astype(np.float64)
+        if not len(s):
+            return pd.Series(dtype=float)
+        sums = np.add.reduceat(s, self._day_starts)
+        out = pd.Series(sums / (self._day_ends - self._day_starts), index=self.dates, name="risk_score")
+        return out.tail(last) if last else out
+
+
+def compact_risk_frame(df: pd.DataFrame, quantize: bool = False) -> RiskTable:
+    """
+    Raw daily risk frame -> RiskTable. Raises ValueError when the schema
+    (date/time, lat/lon, risk_score) is not met.
+    """
+    date_col = _pick(df, _DATE_COLS)
+    if date_col is None:
+        raise ValueError("Risk table missing a date/time column (expected 'date' or 'time').")
+    lat_col, lon_col = _pick(df, _LAT_COLS), _pick(df, _LON_COLS)
+    if lat_col is None or lon_col is None:
+        raise ValueError("Risk table missing latitude/longitude columns.")
+    if "risk_score" not in df.columns:
+        raise ValueError("Risk table missing 'risk_score' column.")
+
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+    dates = dates.dt.normalize()
+    score = pd.to_numeric(df["risk_score"], errors="coerce")
+    ok = dates.notna().to_numpy() & score.notna().to_numpy()
+    if not ok.any():
+        raise ValueError("Risk table has no rows with a valid date and risk_score.")
+
+    dates, score = dates[ok], score[ok].to_numpy(dtype=np.float64)
+    epoch = dates.min()
+    day = (dates - epoch).dt.days.to_numpy()
+    if day.max() > np.iinfo(np.int16).max:
+        raise ValueError("Risk table spans more than 32767 days.")
+
+    out = pd.DataFrame({
+        "day": day.astype(np.int16),
+        "lat": pd.to_numeric(df[lat_col], errors="coerce").to_numpy(dtype=np.float32)[ok],
+        "lon": pd.to_numeric(df[lon_col], errors="coerce").to_numpy(dtype=np.float32)[ok],
+    })
+    if quantize:
+        out["risk_score_q"] = quantize_scores(score)
+    else:
+        out["risk_score"] = score.astype(np.float32)
+
+    # stored levels where valid, otherwise derived from the score
+    derived = RISK_LEVELS.classify(score).rename_categories(LEVEL_CATEGORIES)
+    if "risk_level" in df.columns:
+        given = pd.Categorical(df["risk_level"].astype(str).str.lower().to_numpy()[ok], categories=LEVEL_CATEGORIES)
+        level = np.where(given.codes >= 0, given.codes, derived.codes)
+        out["risk_level"] = pd.Categorical.from_codes(level.astype(np.int8), categories=list(LEVEL_CATEGORIES), ordered=True)
+    else:
+        out["risk_level"] = derived
+
+    skip = {date_col, lat_col, lon_col, "risk_score", "risk_level"}
+    for c in df.columns:
+        if c in skip:
+            continue
+        col = df[c][ok].reset_index(drop=True)
+        if pd.api.types.is_float_dtype(col):
+            out[c] = col.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(col):
+            out[c] = pd.to_numeric(col, downcast="integer")
+        elif pd.api.types.is_bool_dtype(col):
+            out[c] = col
+        else:
+            out[c] = col.astype("category")
+
+    out = out.iloc[np.argsort(out["day"].to_numpy(), kind="stable")].reset_index(drop=True)
+    return RiskTable(out, epoch=epoch, quantized=quantize)
+
+
+def load_risk_table(path, quantize: bool = False) -> RiskTable:
+    return compact_risk_frame(pd.read_parquet(str(path)), quantize=quantize)
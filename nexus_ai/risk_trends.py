@@ -0,0 +1,163 @@
+"""
+Day-over-day trend engine for per-state risk over the whole archive.
+
+The per-state daily series (area-weighted mean over the fractional cell /
+state overlap, see zonal.py) is materialized once per dataset version as a
+(states x days) matrix: one sparse product per block of cells over the risk
+cube. Deltas, rolling least-squares slopes and rising / falling streaks are
+then computed for all states and days at once, so the UI only reads rows.
+"""
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .risk_cube import RiskCube, ensure_cube
+from .state_geometry import load_state_geometry
+from .utils import TREND_LEVELS
+from .zonal import overlap_weights
+
+# smallest day-over-day change that extends a rising / falling streak
+STREAK_EPS = 0.005
+
+# cells per sparse product while building
+_BUILD_BLOCK_CELLS = 16384
+
+
+def rolling_slope(y: np.ndarray, window: int) -> np.ndarray:
+    """
+    Least-squares slope (per day) over the trailing `window` days along axis 1,
+    ignoring NaNs; NaN where fewer than 2 points are available.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    has = ~np.isnan(y)
+    t = np.arange(y.shape[1], dtype=np.float64)[None, :]
+    terms = [has, np.where(has, t, 0.0), np.where(has, t * t, 0.0), np.where(has, y, 0.0), np.where(has, t * y, 0.0)]
+
+    def windowed(a):
+        c = np.zeros((a.shape[0], a.shape[1] + 1))
+        np.cumsum(a, axis=1, out=c[:, 1:])
+        lo = np.maximum(np.arange(1, a.shape[1] + 1) - window, 0)
+        return c[:, 1:] - c[:, lo]
+
+    n, st, stt, sy, sty = (windowed(np.broadcast_to(a, y.shape).astype(np.float64)) for a in terms)
+    den = n * stt - st * st
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where((n >= 2) & (den > 0), (n * sty - st * sy) / den, np.nan)
+
+
+def signed_streaks(delta: np.ndarray, eps: float = STREAK_EPS) -> np.ndarray:
+    """
+    Length of the current run of same-direction changes ending at each day:
+    +k = rising k days in a row, -k = falling, 0 = flat / no data.
+    """
+    sgn = np.where(delta > eps, 1, np.where(delta < -eps, -1, 0)).astype(np.int64)
+    days = np.arange(sgn.shape[1])[None, :]
+    starts = np.ones_like(sgn, dtype=bool)
+    starts[:, 1:] = sgn[:, 1:] != sgn[:, :-1]
+    run_start = np.maximum.accumulate(np.where(starts, days, 0), axis=1)
+    return (days - run_start + 1) * sgn
+
+
+def streak_text(streak: int) -> str:
+    if streak >= 2:
+        return f"rising {streak} days"
+    if streak <= -2:
+        return f"falling {-streak} days"
+    return "—"
+
+
+class StateTrends:
+    """
+    series: float32 (states, days) daily area-weighted mean risk;
+    delta / slope / streak are (states, days) arrays derived from it.
+    """
+
+    def __init__(self, names: List[str], epoch: pd.Timestamp, series: np.ndarray, slope_window: int = 7):
+        self.names = list(names)
+        self.epoch = epoch
+        self.series = np.asarray(series, dtype=np.float32)
+        self.slope_window = int(slope_window)
+
+        s = self.series.astype(np.float64)
+        self.delta = np.full_like(s, np.nan)
+        self.delta[:, 1:] = s[:, 1:] - s[:, :-1]
+        self.slope = rolling_slope(s, self.slope_window).astype(np.float32)
+        self.streak = signed_streaks(np.nan_to_num(self.delta, nan=0.0)).astype(np.int32)
+
+    @classmethod
+    def from_cube(cls, cube: RiskCube, regions, slope_window: int = 7) -> "StateTrends":
+        weights = overlap_weights(cube.lat, cube.lon, regions)
+        weights = (weights @ sparse.diags(np.cos(np.radians(cube.lat.astype(np.float64))))).tocsc()
+        num = np.zeros((weights.shape[0], cube.n_days))
+        den = np.zeros((weights.shape[0], cube.n_days))
+        for c0 in range(0, cube.n_cells, _BUILD_BLOCK_CELLS):
+            block = np.asarray(cube.data[c0:c0 + _BUILD_BLOCK_CELLS], dtype=np.float64)
+            has = ~np.isnan(block)
+            w = weights[:, c0:c0 + block.shape[0]]
+            num += w @ np.where(has, block, 0.0)
+            den += w @ has.astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            series = np.where(den > 0, num / den, np.nan)
+        return cls(list(regions), cube.epoch, series, slope_window=slope_window)
+
+    @property
+    def n_days(self) -> int:
+        return self.series.shape[1]
+
+    def day_of(self, d) -> int:
+        return int((pd.Timestamp(d).normalize() - self.epoch).days)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.series.nbytes + self.delta.nbytes + self.slope.nbytes + self.streak.nbytes)
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+    def day_frame(self, d) -> pd.DataFrame:
+        """
+        One row per state: mean_risk, mean_risk_yesterday, delta, trend,
+        slope_<w>d, streak and trend_text ("rising 4 days").
+        """
+        i = self.day_of(d)
+        if not 0 <= i < self.n_days:
+            raise KeyError(f"{pd.Timestamp(d).date()} is outside the trend table")
+        delta = self.delta[:, i]
+        return pd.DataFrame({
+            "NAME_1": self.names,
+            "mean_risk": self.series[:, i],
+            "mean_risk_yesterday": self.series[:, i - 1] if i > 0 else np.full(len(self.names), np.nan, dtype=np.float32),
+            "delta": delta,
+            "trend": TREND_LEVELS.classify(delta),
+            f"slope_{self.slope_window}d": self.slope[:, i],
+            "streak": self.streak[:, i],
+            "trend_text": [streak_text(s) for s in self.streak[:, i]],
+        })
+
+    def series_of(self, name: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Daily mean / delta / slope / streak for one state.
+        """
+        r = self.names.index(name)
+        d0 = 0 if start is None else max(self.day_of(start), 0)
+        d1 = self.n_days if end is None else min(self.day_of(end) + 1, self.n_days)
+        idx = pd.date_range(self.epoch + pd.Timedelta(days=d0), periods=max(d1 - d0, 0), freq="D")
+        return pd.DataFrame({
+            "mean_risk": self.series[r, d0:d1],
+            "delta": self.delta[r, d0:d1],
+            f"slope_{self.slope_window}d": self.slope[r, d0:d1],
+            "streak": self.streak[r, d0:d1],
+        }, index=idx)
+
+
+def trends_index(parquet_path, states_path, slope_window: int = 7):
+    """
+    Snapshot index builder: SnapshotManager.add_indexes({"trends": trends_index(path, states)}).
+    """
+    def build(dataset):
+        cube = ensure_cube(parquet_path, dataset=dataset)
+        return StateTrends.from_cube(cube, load_state_geometry(states_path).shapes(0.0), slope_window=slope_window)
+    return build
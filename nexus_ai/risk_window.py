@@ -0,0 +1,220 @@
+"""
+Bounding-box and polygon window queries on the risk grid.
+
+Cells are sorted once by (lat, lon), so every grid row (one latitude) is a
+contiguous run. A bbox resolves to one [start, end) range per row with two
+binary searches, never a scan of the whole grid. A polygon is resolved to
+its bbox ranges first and only those candidates are tested; the resulting
+cell list is cached per shape.
+
+Shapes are (min_lon, min_lat, max_lon, max_lat) tuples (shapely's bounds
+order), shapely geometries, or GeoJSON geometry mappings.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import shape as geojson_shape
+
+from .risk_cube import ensure_cube
+
+BBox = Tuple[float, float, float, float]
+
+# GeoJSON properties tried (in order) for a region's display name
+REGION_NAME_KEYS = ("NAME_1", "name", "NAME", "state", "STATE", "GEN", "VARNAME_1", "NL_NAME_1", "NAME_EN")
+
+
+class GridWindowIndex:
+    """
+    Window queries over a fixed set of cells (a day frame or the cube's
+    cell table). Returned cell ids are positions into the original lat/lon
+    arrays, ascending.
+    """
+
+    def __init__(self, lat, lon, mask_cache_size: int = 64):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.order = np.lexsort((self.lon, self.lat))
+        self._slat = self.lat[self.order]
+        self._slon = self.lon[self.order]
+        self.row_lat, self._row_start = np.unique(self._slat, return_index=True)
+        self._row_end = np.append(self._row_start[1:], len(self.order))
+
+        self._masks: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._mask_cache_size = mask_cache_size
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_cube(cls, cube) -> "GridWindowIndex":
+        return cls(cube.lat, cube.lon)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @property
+    def bounds(self) -> BBox:
+        if not len(self.order):
+            return (np.nan, np.nan, np.nan, np.nan)
+        return (float(self.lon.min()), float(self.lat.min()), float(self.lon.max()), float(self.lat.max()))
+
+    # --------------------------------------------------
+    # Bounding boxes
+    # --------------------------------------------------
+    def ranges(self, bbox: BBox) -> List[Tuple[int, int]]:
+        """
+        [start, end) ranges into the (lat, lon)-sorted cell order, one per
+        grid row that intersects the bbox (empty rows are dropped).
+        """
+        min_lon, min_lat, max_lon, max_lat = bbox
+        r0 = int(np.searchsorted(self.row_lat, min_lat, side="left"))
+        r1 = int(np.searchsorted(self.row_lat, max_lat, side="right"))
+        out = []
+        for s, e in zip(self._row_start[r0:r1], self._row_end[r0:r1]):
+            row = self._slon[s:e]
+            a = s + int(np.searchsorted(row, min_lon, side="left"))
+            b = s + int(np.searchsorted(row, max_lon, side="right"))
+            if b > a:
+                out.append((a, b))
+        return out
+
+    def bbox_cells(self, bbox: BBox) -> np.ndarray:
+        spans = self.ranges(bbox)
+        if not spans:
+            return np.zeros(0, dtype=np.int64)
+        pos = np.concatenate([np.arange(a, b) for a, b in spans])
+        return np.sort(self.order[pos])
+
+    # --------------------------------------------------
+    # Polygons
+    # --------------------------------------------------
+    def polygon_cells(self, geom) -> np.ndarray:
+        """
+        Cells whose centre lies inside (or on the boundary of) the polygon.
+        Cached per shape (by WKB).
+        """
+        key = shapely.to_wkb(geom)
+        with self._lock:
+            cells = self._masks.get(key)
+            if cells is not None:
+                self._masks.move_to_end(key)
+                return cells
+
+        candidates = self.bbox_cells(geom.bounds)
+        shapely.prepare(geom)
+        inside = shapely.intersects_xy(geom, self.lon[candidates], self.lat[candidates])
+        cells = candidates[inside]
+        cells.setflags(write=False)
+
+        with self._lock:
+            self._masks[key] = cells
+            while len(self._masks) > self._mask_cache_size:
+                self._masks.popitem(last=False)
+        return cells
+
+    # --------------------------------------------------
+    # Entry points
+    # --------------------------------------------------
+    def cells(self, shape) -> np.ndarray:
+        """
+        Cell ids inside a bbox tuple, shapely geometry or GeoJSON mapping.
+        """
+        if isinstance(shape, dict):
+            shape = geojson_shape(shape)
+        if isinstance(shape, shapely.Geometry):
+            return self.polygon_cells(shape)
+        return self.bbox_cells(tuple(float(v) for v in shape))
+
+    def rows(self, df: pd.DataFrame, shape) -> pd.DataFrame:
+        """
+        Rows of the frame this index was built from that fall inside the shape.
+        """
+        return df.iloc[self.cells(shape)]
+
+
+# ==================================================
+# Shared indexes
+# ==================================================
+_GRID_CACHE: "OrderedDict[Hashable, GridWindowIndex]" = OrderedDict()
+_GRID_CACHE_LOCK = threading.Lock()
+_GRID_CACHE_SIZE = 16
+
+
+def grid_key(lat, lon) -> str:
+    """
+    Identity of an ordered cell grid: same cells in the same order -> same
+    key, so one index (and its cached masks) serves every date over it.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(lat, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(lon, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def grid_window(key: Hashable, lat, lon) -> GridWindowIndex:
+    """
+    Shared GridWindowIndex per key (e.g. grid_key(lat, lon)), LRU-bounded.
+    Polygon masks live on the index, so they are reused for the same grid.
+    """
+    with _GRID_CACHE_LOCK:
+        idx = _GRID_CACHE.get(key)
+        if idx is not None:
+            _GRID_CACHE.move_to_end(key)
+            return idx
+    idx = GridWindowIndex(lat, lon)
+    with _GRID_CACHE_LOCK:
+        _GRID_CACHE[key] = idx
+        while len(_GRID_CACHE) > _GRID_CACHE_SIZE:
+            _GRID_CACHE.popitem(last=False)
+    return idx
+
+
+def window_index(parquet_path):
+    """
+    Snapshot index builder over the cube's cell table:
+    SnapshotManager.add_indexes({"window": window_index(path)}).
+    Its cell ids are cube rows, so a region reads only its own cube rows
+    (RiskCube.day_frame / RangeAggregator.frame with cells=...).
+    """
+    return lambda dataset: GridWindowIndex.from_cube(ensure_cube(parquet_path, dataset=dataset))
+
+
+# ==================================================
+# Region shapes
+# ==================================================
+def _region_name(props: dict, i: int, name_key: str | None = None) -> str:
+    """
+    Display name of the i-th feature (first REGION_NAME_KEYS hit).
+    """
+    keys = (name_key,) if name_key else REGION_NAME_KEYS
+    return next((str(props[k]) for k in keys if props.get(k)), f"region {i + 1}")
+
+
+@lru_cache(maxsize=8)
+def _load_regions(path: str, mtime_ns: int, name_key: str | None) -> Dict[str, "shapely.Geometry"]:
+    with open(path, encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+    out: Dict[str, shapely.Geometry] = {}
+    for i, feat in enumerate(features):
+        name = _region_name(feat.get("properties") or {}, i, name_key)
+        if feat.get("geometry"):
+            out[name] = shapely.make_valid(geojson_shape(feat["geometry"]))
+    return out
+
+
+def load_regions(geojson_path, name_key: str | None = None) -> Dict[str, "shapely.Geometry"]:
+    """
+    name -> shapely geometry for every feature of a local GeoJSON file
+    (cached until the file changes).
+    """
+    p = Path(geojson_path)
+    if not p.exists():
+        raise FileNotFoundError(f"Boundary file not found: {p}")
+    return _load_regions(str(p), p.stat().st_mtime_ns, name_key)
@@ -0,0 +1,278 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from nexus_ai.sensor_store import _NO_TS, _to_ns
+
+ROLLUP_FIELDS = ("pm25", "temp_c", "rh")
+
+_NS = 1_000_000_000
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    name: str
+    bucket_s: int
+    retention_s: Optional[int]  # None = keep forever
+
+
+TIERS = (
+    RollupTier("1min", 60, 2 * 86400),
+    RollupTier("1h", 3600, 90 * 86400),
+    RollupTier("1d", 86400, None),
+)
+
+
+class _TierTable:
+    """
+    One aggregation tier: a row per (device, bucket) with min/max/sum/count/last
+    per field, stored in growable numpy arrays + a dict from key to row.
+    """
+
+    def __init__(self, tier: RollupTier, n_fields: int):
+        self.tier = tier
+        self.bucket_ns = tier.bucket_s * _NS
+        self.n_fields = n_fields
+        self._rows: Dict[int, int] = {}
+        self.n = 0
+        self._alloc(0)
+
+    def _alloc(self, size: int):
+        f = self.n_fields
+        self.dev = np.zeros(size, dtype=np.int32)
+        self.bucket = np.zeros(size, dtype=np.int64)
+        self.vmin = np.full((size, f), np.inf, dtype=np.float32)
+        self.vmax = np.full((size, f), -np.inf, dtype=np.float32)
+        self.vsum = np.zeros((size, f), dtype=np.float64)
+        self.count = np.zeros((size, f), dtype=np.int32)
+        self.last = np.full((size, f), np.nan, dtype=np.float32)
+        self.last_ts = np.full(size, _NO_TS, dtype=np.int64)
+
+    def _arrays(self):
+        return ("dev", "bucket", "vmin", "vmax", "vsum", "count", "last", "last_ts")
+
+    def _grow(self, need: int):
+        size = len(self.dev)
+        if need <= size:
+            return
+        new_size = max(need, 2 * size, 1024)
+        old = {a: getattr(self, a) for a in self._arrays()}
+        self._alloc(new_size)
+        for a, arr in old.items():
+            getattr(self, a)[: self.n] = arr[: self.n]
+
+    def merge(self, dev: np.ndarray, bucket: np.ndarray, g_min, g_max, g_sum, g_count, g_last, g_last_ts):
+        """
+        Fold per-(device, bucket) partial aggregates of a batch into the table.
+        """
+        keys = (dev.astype(np.int64) << 32) | bucket
+        rows = np.empty(len(keys), dtype=np.int64)
+        new = 0
+        for i, k in enumerate(keys.tolist()):
+            r = self._rows.get(k)
+            if r is None:
+                r = self.n + new
+                self._rows[k] = r
+                new += 1
+            rows[i] = r
+
+        if new:
+            self._grow(self.n + new)
+            fresh = slice(self.n, self.n + new)
+            self.vmin[fresh] = np.inf
+            self.vmax[fresh] = -np.inf
+            self.vsum[fresh] = 0.0
+            self.count[fresh] = 0
+            self.last[fresh] = np.nan
+            self.last_ts[fresh] = _NO_TS
+            self.n += new
+        self.dev[rows] = dev
+        self.bucket[rows] = bucket
+
+        self.vmin[rows] = np.fmin(self.vmin[rows], g_min)
+        self.vmax[rows] = np.fmax(self.vmax[rows], g_max)
+        self.vsum[rows] += g_sum
+        self.count[rows] += g_count
+
+        newer = g_last_ts >= self.last_ts[rows]
+        upd = rows[newer]
+        self.last_ts[upd] = g_last_ts[newer]
+        # keep the previous "last" for fields the newer batch did not report
+        self.last[upd] = np.where(np.isnan(g_last[newer]), self.last[upd], g_last[newer])
+
+    def evict_before(self, bucket_cutoff: int):
+        keep = self.bucket[: self.n] >= bucket_cutoff
+        if keep.all():
+            return
+        idx = np.flatnonzero(keep)
+        for a in self._arrays():
+            arr = getattr(self, a)
+            arr[: len(idx)] = arr[idx]
+        self.n = len(idx)
+        self._rows = {
+            int(k): i for i, k in enumerate(((self.dev[: self.n].astype(np.int64) << 32) | self.bucket[: self.n]).tolist())
+        }
+
+
+class SensorRollups:
+    """
+    Incremental 1-minute / 1-hour / 1-day aggregates per device
+    (min, max, mean, count, last for each field).
+
+    Each ingested batch is reduced once per tier with a vectorized group-by
+    and folded into the tier tables, so cost is O(batch) and never touches
+    raw history again. Range queries read the coarsest tier that still
+    gives enough points.
+    """
+
+    def __init__(self, fields: Sequence[str] = ROLLUP_FIELDS, tiers: Sequence[RollupTier] = TIERS):
+        self.fields = tuple(fields)
+        self.tiers = tuple(sorted(tiers, key=lambda t: t.bucket_s))
+        self._tables = [_TierTable(t, len(self.fields)) for t in self.tiers]
+        self._dev_index: Dict[str, int] = {}
+        self._device_ids: List[str] = []
+        self.watermark_ns = _NO_TS
+        self._compacted_at = [_NO_TS] * len(self.tiers)
+
+    # --------------------------------------------------
+    # Ingestion
+    # --------------------------------------------------
+    def _device_codes(self, device_ids) -> np.ndarray:
+        codes, uniques = pd.factorize(pd.Series(device_ids, dtype=object).astype(str))
+        lookup = np.empty(len(uniques), dtype=np.int32)
+        for i, d in enumerate(uniques):
+            if d not in self._dev_index:
+                self._dev_index[d] = len(self._device_ids)
+                self._device_ids.append(d)
+            lookup[i] = self._dev_index[d]
+        return lookup[codes]
+
+    def ingest(self, df: pd.DataFrame):
+        if df is None or df.empty:
+            return
+        if not {"device_id", "timestamp_utc"}.issubset(df.columns):
+            raise ValueError("Sensor readings must contain 'device_id' and 'timestamp_utc'.")
+
+        ts = _to_ns(df["timestamp_utc"])
+        ok = ts != _NO_TS
+        if not ok.any():
+            return
+
+        dev = self._device_codes(df["device_id"].to_numpy()[ok])
+        ts = ts[ok]
+        vals = np.column_stack([
+            pd.to_numeric(df[f], errors="coerce").to_numpy(dtype=np.float64)[ok]
+            if f in df.columns else np.full(len(ts), np.nan)
+            for f in self.fields
+        ])
+
+        order = np.argsort(ts, kind="stable")
+        dev, ts, vals = dev[order], ts[order], vals[order]
+        present = ~np.isnan(vals)
+
+        for table in self._tables:
+            bucket = ts // table.bucket_ns
+            keys = (dev.astype(np.int64) << 32) | bucket
+            g_keys, inv = np.unique(keys, return_inverse=True)
+            g = len(g_keys)
+
+            g_min = np.full((g, len(self.fields)), np.inf)
+            g_max = np.full((g, len(self.fields)), -np.inf)
+            np.fmin.at(g_min, inv, vals)
+            np.fmax.at(g_max, inv, vals)
+            g_sum = np.zeros((g, len(self.fields)))
+            np.add.at(g_sum, inv, np.where(present, vals, 0.0))
+            g_count = np.zeros((g, len(self.fields)), dtype=np.int32)
+            np.add.at(g_count, inv, present.astype(np.int32))
+
+            # rows are time-ordered, so the last row per group is the newest
+            last_row = np.zeros(g, dtype=np.int64)
+            np.maximum.at(last_row, inv, np.arange(len(inv)))
+            g_last = vals[last_row]
+            g_last_ts = ts[last_row]
+
+            table.merge(
+                (g_keys >> 32).astype(np.int32), g_keys & 0xFFFFFFFF,
+                g_min, g_max, g_sum, g_count, g_last, g_last_ts,
+            )
+
+        self.watermark_ns = max(self.watermark_ns, int(ts[-1]))
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        for i, table in enumerate(self._tables):
+            ret = table.tier.retention_s
+            if ret is None:
+                continue
+            ret_ns = ret * _NS
+            # compact at most every 1/8 of the retention window
+            if self.watermark_ns - self._compacted_at[i] < ret_ns // 8:
+                continue
+            table.evict_before((self.watermark_ns - ret_ns) // table.bucket_ns)
+            self._compacted_at[i] = self.watermark_ns
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+    def pick_tier(self, start, end, max_points: int = 200) -> RollupTier:
+        """
+        Coarsest sufficient tier: the finest one whose bucket count over
+        [start, end] stays within max_points and whose retention still
+        covers start. Falls back to the coarsest tier.
+        """
+        start_ns, end_ns = _to_ns([start, end], missing_ok=False)
+        span_s = max((end_ns - start_ns) / _NS, 1.0)
+        for tier in self.tiers:
+            if span_s / tier.bucket_s > max_points:
+                continue
+            if tier.retention_s is not None and self.watermark_ns != _NO_TS:
+                if start_ns < self.watermark_ns - tier.retention_s * _NS:
+                    continue
+            return tier
+        return self.tiers[-1]
+
+    def query(self, start, end, device_ids=None, max_points: int = 200, tier: Optional[str] = None) -> pd.DataFrame:
+        """
+        Aggregates per device and bucket for [start, end].
+        Columns: device_id, bucket_start, tier, <field>_min/_max/_mean/_count/_last.
+        """
+        if tier is None:
+            chosen = self.pick_tier(start, end, max_points=max_points)
+        else:
+            chosen = next((t for t in self.tiers if t.name == tier), None)
+            if chosen is None:
+                raise ValueError(f"Unknown rollup tier: {tier}")
+        table = self._tables[self.tiers.index(chosen)]
+
+        start_ns, end_ns = _to_ns([start, end], missing_ok=False)
+        n = table.n
+        mask = (table.bucket[:n] >= start_ns // table.bucket_ns) & (table.bucket[:n] <= end_ns // table.bucket_ns)
+        if device_ids is not None:
+            wanted = [self._dev_index[d] for d in map(str, device_ids) if d in self._dev_index]
+            mask &= np.isin(table.dev[:n], wanted)
+
+        idx = np.flatnonzero(mask)
+        idx = idx[np.lexsort((table.bucket[idx], table.dev[idx]))]
+
+        out = pd.DataFrame({
+            "device_id": np.asarray(self._device_ids, dtype=object)[table.dev[idx]] if len(idx) else np.array([], dtype=object),
+            "bucket_start": pd.to_datetime(table.bucket[idx] * table.bucket_ns, utc=True),
+            "tier": chosen.name,
+        })
+        count = table.count[idx]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = table.vsum[idx] / count
+        for i, f in enumerate(self.fields):
+            has = count[:, i] > 0
+            out[f"{f}_min"] = np.where(has, table.vmin[idx, i], np.nan)
+            out[f"{f}_max"] = np.where(has, table.vmax[idx, i], np.nan)
+            out[f"{f}_mean"] = np.where(has, mean[:, i], np.nan).astype(np.float32)
+            out[f"{f}_count"] = count[:, i]
+            out[f"{f}_last"] = table.last[idx, i]
+        return out
+
+    def rows(self) -> Dict[str, int]:
+        return {t.name: tbl.n for t, tbl in zip(self.tiers, self._tables)}
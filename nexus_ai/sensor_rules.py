@@ -0,0 +1,144 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Field order used by the compiled evaluator (columns of the input matrix)
+SENSOR_FIELDS = ("pm25", "temp_c", "rh")
+
+
+@dataclass(frozen=True)
+class SensorRule:
+    name: str
+    desc: str
+    field: str
+    op: str
+    threshold: float
+    weight: float
+
+
+@dataclass(frozen=True)
+class FalseAlarmFilter:
+    """
+    High humidity means PM2.5 readings are likely fog/condensation, not smoke:
+    the PM value is capped at the spike threshold so the spike rule cannot fire.
+    """
+    rh_safe: float = 55.0
+    pm25_cap: float = 50.0
+
+
+# ============================================================
+# Birdhouse rule set (single source of truth for all pages)
+# ============================================================
+RULES: Tuple[SensorRule, ...] = (
+    SensorRule("PM2.5 Spike", "PM2.5 > 50 µg/m³", "pm25", ">", 50.0, 0.45),
+    SensorRule("Low Humidity", "RH < 30%", "rh", "<", 30.0, 0.35),
+    SensorRule("High Temperature", "Temp > 30°C", "temp_c", ">", 30.0, 0.25),
+)
+
+FALSE_ALARM_FILTER = FalseAlarmFilter()
+
+# "x > thr" fires when +1 * (x - thr) > 0, "x < thr" when -1 * (x - thr) > 0
+_OP_SIGN = {">": 1.0, "<": -1.0}
+
+
+class CompiledRuleSet:
+    """
+    Rules compiled once into flat numpy arrays so that one matrix pass scores
+    any number of readings. Missing values (NaN) never fire a rule.
+    """
+
+    def __init__(self, rules=RULES, false_alarm: FalseAlarmFilter = FALSE_ALARM_FILTER):
+        for r in rules:
+            if r.field not in SENSOR_FIELDS:
+                raise ValueError(f"Unknown sensor field in rule '{r.name}': {r.field}")
+            if r.op not in _OP_SIGN:
+                raise ValueError(f"Unsupported operator in rule '{r.name}': {r.op}")
+
+        self.rules = tuple(rules)
+        self.false_alarm = false_alarm
+        self._field_idx = np.array([SENSOR_FIELDS.index(r.field) for r in self.rules], dtype=np.intp)
+        self._sign = np.array([_OP_SIGN[r.op] for r in self.rules], dtype=float)
+        self._thresholds = np.array([r.threshold for r in self.rules], dtype=float)
+        self._weights = np.array([r.weight for r in self.rules], dtype=float)
+
+    def evaluate(self, pm25, temp_c, rh, false_alarm_filter: bool = True):
+        """
+        Vectorized evaluation.
+        Returns (score[n], fired[n, rules], false_alarm_active[n], usable[n]).
+        """
+        pm25, temp_c, rh = np.broadcast_arrays(
+            np.asarray(pm25, dtype=float).reshape(-1),
+            np.asarray(temp_c, dtype=float).reshape(-1),
+            np.asarray(rh, dtype=float).reshape(-1),
+        )
+
+        if false_alarm_filter:
+            false_alarm_active = rh >= self.false_alarm.rh_safe
+            pm25 = np.where(false_alarm_active, np.minimum(pm25, self.false_alarm.pm25_cap), pm25)
+        else:
+            false_alarm_active = np.zeros(pm25.shape, dtype=bool)
+
+        X = np.column_stack([pm25, temp_c, rh])
+        vals = X[:, self._field_idx]
+        with np.errstate(invalid="ignore"):
+            fired = self._sign * (vals - self._thresholds) > 0
+
+        score = np.minimum(fired @ self._weights, 1.0)
+        usable = ~np.isnan(X).all(axis=1)
+        return score, fired, false_alarm_active, usable
+
+    def score(self, pm25, temp_c, rh, false_alarm_filter: bool = True):
+        """
+        Scalar call for the UI: (score, [(rule, fired), ...], false_alarm_active)
+        """
+        score, fired, active, _ = self.evaluate(
+            _to_float(pm25), _to_float(temp_c), _to_float(rh), false_alarm_filter
+        )
+        return (
+            float(score[0]),
+            [(r, bool(on)) for r, on in zip(self.rules, fired[0])],
+            bool(active[0]),
+        )
+
+    def score_frame(self, df: pd.DataFrame, false_alarm_filter: bool = True) -> pd.Series:
+        """
+        Batch call for fleet data: one sensor_score per row of df.
+        Expects columns pm25 / temp_c / rh (missing columns count as NaN).
+        """
+        cols = [
+            pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+            if c in df.columns else np.full(len(df), np.nan)
+            for c in SENSOR_FIELDS
+        ]
+        score, _, _, _ = self.evaluate(*cols, false_alarm_filter=false_alarm_filter)
+        return pd.Series(score, index=df.index, name="sensor_score")
+
+
+def _to_float(x) -> float:
+    try:
+        return float(x) if x is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+DEFAULT_RULESET = CompiledRuleSet()
+
+
+def compute_sensor_score(pm25=None, temp_c=None, rh=None, false_alarm_filter: bool = True) -> Optional[float]:
+    """
+    0..1 sensor score from a single reading; None when no field is usable.
+    """
+    score, _, _, usable = DEFAULT_RULESET.evaluate(
+        _to_float(pm25), _to_float(temp_c), _to_float(rh), false_alarm_filter
+    )
+    if not usable[0]:
+        return None
+    return float(score[0])
+
+
+def score_sensor_frame(df: pd.DataFrame, false_alarm_filter: bool = True) -> pd.Series:
+    return DEFAULT_RULESET.score_frame(df, false_alarm_filter=false_alarm_filter)
+
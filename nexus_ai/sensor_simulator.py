@@ -0,0 +1,252 @@
+"""
+Synthetic Birdhouse fleet for load tests and demos.
+
+Usage:
+    python -m nexus_ai.sensor_simulator --devices 1000 --hours 24 --out data/sim_readings.csv
+    python -m nexus_ai.sensor_simulator --devices 500 --stream --rate 200 --out data/live.csv
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# Rough bounding box of Germany (lat, lon)
+GERMANY_BBOX = (47.3, 5.9, 55.0, 15.0)
+
+
+def make_fleet(n_devices: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Static per-node properties: position, climate offset, battery and link profile.
+    """
+    rng = np.random.default_rng(seed)
+    lat0, lon0, lat1, lon1 = GERMANY_BBOX
+    lat = rng.uniform(lat0, lat1, n_devices)
+
+    return pd.DataFrame({
+        "device_id": [f"DE-SIM-{i:05d}" for i in range(n_devices)],
+        "lat": lat.round(5),
+        "lon": rng.uniform(lon0, lon1, n_devices).round(5),
+        # colder in the north: ~0.7 °C per degree of latitude
+        "temp_base": 24.0 - 0.7 * (lat - lat0) + rng.normal(0, 1.5, n_devices),
+        "temp_amp": rng.uniform(5.0, 9.0, n_devices),
+        "rh_base": rng.uniform(45.0, 70.0, n_devices),
+        "battery_v0": rng.uniform(3.7, 4.15, n_devices),
+        "drain_v_per_h": rng.uniform(0.001, 0.004, n_devices),
+        "solar_v_per_h": rng.uniform(0.002, 0.006, n_devices),
+        "rssi_base": rng.uniform(-115.0, -70.0, n_devices),
+    })
+
+
+def _daylight(t_s) -> np.ndarray:
+    # solar input 0..1 between 07:00 and 19:00, peak at 13:00
+    hour = (np.asarray(t_s) / 3600.0) % 24.0
+    return np.clip(np.sin(np.pi * (hour - 7.0) / 12.0), 0.0, None)
+
+
+def integrate_battery(fleet: pd.DataFrame, t_s: np.ndarray, v_prev=None, t_prev=None) -> np.ndarray:
+    """
+    Battery voltage at times t_s (devices, ticks): running sum of
+    (solar gain - drain) * tick hours from (t_prev, v_prev), default the
+    start of the run at battery_v0. Clipped to 3.2..4.2 V at every tick, so
+    a full battery stays full and an empty one recovers in daylight.
+    """
+    n_dev, n_ticks = t_s.shape
+    v = fleet["battery_v0"].to_numpy(dtype=float) if v_prev is None else np.asarray(v_prev, dtype=float)
+    t = np.zeros(n_dev) if t_prev is None else np.asarray(t_prev, dtype=float)
+    solar = fleet["solar_v_per_h"].to_numpy(dtype=float)
+    drain = fleet["drain_v_per_h"].to_numpy(dtype=float)
+
+    out = np.empty((n_dev, n_ticks))
+    for k in range(n_ticks):
+        tick_h = np.clip(t_s[:, k] - t, 0.0, None) / 3600.0
+        v = np.clip(v + (solar * _daylight(t_s[:, k]) - drain) * tick_h, 3.2, 4.2)
+        out[:, k] = v
+        t = t_s[:, k]
+    return out
+
+
+def _readings(
+    fleet: pd.DataFrame,
+    t_s: np.ndarray,
+    rng: np.random.Generator,
+    smoke_events: pd.DataFrame,
+    battery: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Vectorized readings for all devices at times t_s (seconds since start),
+    t_s shape (devices, ticks); battery from integrate_battery() unless given.
+    """
+    n_dev, n_ticks = t_s.shape
+    hour = (t_s / 3600.0) % 24.0
+
+    # diurnal cycle: warmest ~15:00, humidity anti-correlated
+    diurnal = np.sin(2 * np.pi * (hour - 9.0) / 24.0)
+    temp = fleet["temp_base"].to_numpy()[:, None] + fleet["temp_amp"].to_numpy()[:, None] * diurnal
+    rh = fleet["rh_base"].to_numpy()[:, None] - 15.0 * diurnal
+    pm25 = rng.lognormal(mean=2.0, sigma=0.4, size=t_s.shape)
+
+    # smoke events: PM spike with exponential decay, local heating and drying
+    for ev in smoke_events.itertuples(index=False):
+        dt = t_s[ev.device] - ev.start_s
+        on = (dt >= 0) & (dt <= ev.duration_s)
+        decay = np.where(on, np.exp(-np.clip(dt, 0, None) / (ev.duration_s / 3.0)), 0.0)
+        pm25[ev.device] += ev.peak_pm25 * decay
+        temp[ev.device] += ev.heat_c * decay
+        rh[ev.device] -= 25.0 * decay
+
+    temp = temp + rng.normal(0, 0.4, t_s.shape)
+    rh = np.clip(rh + rng.normal(0, 2.0, t_s.shape), 3.0, 100.0)
+
+    # battery: constant drain, solar top-up during daylight (07:00-19:00)
+    if battery is None:
+        battery = integrate_battery(fleet, t_s)
+    battery = np.clip(battery + rng.normal(0, 0.01, t_s.shape), 3.2, 4.2)
+
+    rssi = fleet["rssi_base"].to_numpy()[:, None] + rng.normal(0, 3.0, t_s.shape)
+
+    return pd.DataFrame({
+        "device_id": np.repeat(fleet["device_id"].to_numpy(), n_ticks),
+        "t_s": t_s.reshape(-1),
+        "lat": np.repeat(fleet["lat"].to_numpy(), n_ticks),
+        "lon": np.repeat(fleet["lon"].to_numpy(), n_ticks),
+        "pm25": pm25.reshape(-1).round(1),
+        "pm10": (pm25 * rng.uniform(1.3, 1.9, t_s.shape)).reshape(-1).round(1),
+        "temp_c": temp.reshape(-1).round(2),
+        "rh": rh.reshape(-1).round(1),
+        "battery_v": battery.reshape(-1).round(3),
+        "rssi": rssi.reshape(-1).round(0),
+    })
+
+
+def make_smoke_events(
+    n_devices: int,
+    duration_s: float,
+    events_per_device_day: float = 0.02,
+    seed: int = 42,
+    start_s: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Smoke events starting uniformly in [start_s, start_s + duration_s).
+    """
+    rng = np.random.default_rng(seed + 1)
+    n = rng.poisson(events_per_device_day * n_devices * max(duration_s / 86400.0, 1e-9))
+    return pd.DataFrame({
+        "device": rng.integers(0, n_devices, n),
+        "start_s": start_s + rng.uniform(0, duration_s, n),
+        "duration_s": rng.uniform(1800, 4 * 3600, n),
+        "peak_pm25": rng.uniform(80, 900, n),
+        "heat_c": rng.uniform(3, 25, n),
+    })
+
+
+def generate_readings(
+    fleet: pd.DataFrame,
+    start="2026-07-01T00:00:00Z",
+    hours: float = 24.0,
+    interval_s: int = 300,
+    drop_rate: float = 0.01,
+    events_per_device_day: float = 0.02,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Full history in the sensor CSV schema (one reading per device every
+    interval_s with jitter, a few dropped packets).
+    """
+    rng = np.random.default_rng(seed)
+    n_dev = len(fleet)
+    n_ticks = max(int(hours * 3600 // interval_s), 1)
+
+    t_s = np.arange(n_ticks, dtype=float)[None, :] * interval_s + rng.uniform(0, interval_s * 0.2, (n_dev, n_ticks))
+    events = make_smoke_events(n_dev, hours * 3600, events_per_device_day, seed)
+    df = _readings(fleet, t_s, rng, events)
+
+    if drop_rate > 0:
+        df = df[rng.random(len(df)) >= drop_rate]
+
+    return _finalize(df, start)
+
+
+def stream_readings(
+    fleet: pd.DataFrame,
+    start="2026-07-01T00:00:00Z",
+    interval_s: int = 300,
+    ticks: Optional[int] = None,
+    events_per_device_day: float = 0.02,
+    seed: int = 42,
+) -> Iterator[pd.DataFrame]:
+    """
+    One batch per reporting interval (every device reports once), forever
+    unless `ticks` is given. Smoke events are drawn per simulated day, so
+    they keep occurring however long the stream runs; battery state carries
+    over from batch to batch.
+    """
+    rng = np.random.default_rng(seed)
+    n_dev = len(fleet)
+    days = {}
+    battery, t_prev = None, None
+    k = 0
+    while ticks is None or k < ticks:
+        t_s = np.full((n_dev, 1), k * interval_s, dtype=float) + rng.uniform(0, interval_s * 0.2, (n_dev, 1))
+        # events of today plus yesterday's (they can still be decaying)
+        day = int(t_s.min() // 86400)
+        for d in (day - 1, day):
+            if d >= 0 and d not in days:
+                days[d] = make_smoke_events(n_dev, 86400, events_per_device_day, seed + d, start_s=d * 86400.0)
+        for d in [d for d in days if d < day - 1]:
+            del days[d]
+        events = pd.concat([days[d] for d in sorted(days)], ignore_index=True)
+
+        battery = integrate_battery(fleet, t_s, battery, t_prev)
+        yield _finalize(_readings(fleet, t_s, rng, events, battery), start)
+        battery, t_prev = battery[:, -1], t_s[:, -1]
+        k += 1
+
+
+def _finalize(df: pd.DataFrame, start) -> pd.DataFrame:
+    t0 = pd.Timestamp(start)
+    t0 = t0.tz_localize("UTC") if t0.tzinfo is None else t0.tz_convert("UTC")
+    df = df.assign(timestamp_utc=t0 + pd.to_timedelta(df["t_s"], unit="s")).drop(columns=["t_s"])
+    cols = ["device_id", "timestamp_utc", "lat", "lon", "pm25", "pm10", "temp_c", "rh", "battery_v", "rssi"]
+    return df[cols].sort_values("timestamp_utc", kind="stable").reset_index(drop=True)
+
+
+def write_stream(path: str, fleet: pd.DataFrame, rate_per_s: float, interval_s: int = 300, ticks: Optional[int] = None, seed: int = 42):
+    """
+    Append readings to a CSV at roughly `rate_per_s` readings per second
+    (simulated time advances by interval_s per batch).
+    """
+    header = True
+    for batch in stream_readings(fleet, interval_s=interval_s, ticks=ticks, seed=seed):
+        t0 = time.perf_counter()
+        batch.to_csv(path, mode="w" if header else "a", header=header, index=False)
+        header = False
+        wait = len(batch) / rate_per_s - (time.perf_counter() - t0)
+        if wait > 0:
+            time.sleep(wait)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Synthetic Birdhouse fleet readings")
+    ap.add_argument("--devices", type=int, default=100)
+    ap.add_argument("--hours", type=float, default=24.0)
+    ap.add_argument("--interval", type=int, default=300, help="reporting interval per device (s)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default="data/sim_readings.csv")
+    ap.add_argument("--stream", action="store_true", help="append batches continuously")
+    ap.add_argument("--rate", type=float, default=100.0, help="readings per second when streaming")
+    args = ap.parse_args(argv)
+
+    fleet = make_fleet(args.devices, seed=args.seed)
+    if args.stream:
+        write_stream(args.out, fleet, rate_per_s=args.rate, interval_s=args.interval, seed=args.seed)
+    else:
+        df = generate_readings(fleet, hours=args.hours, interval_s=args.interval, seed=args.seed)
+        df.to_csv(args.out, index=False)
+        print(f"Wrote {len(df):,} readings for {args.devices} devices -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+from __future__ import annotations
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Numeric Birdhouse fields kept per reading (float32, NaN when missing)
+STORE_FIELDS = ("lat", "lon", "pm25", "pm10", "temp_c", "rh", "battery_v", "rssi")
+
+_NO_TS = np.iinfo(np.int64).min
+
+
+def _to_ns(ts, missing_ok: bool = True) -> np.ndarray:
+    """
+    Timestamps (str in any mix of formats / datetime / Series) -> int64 ns
+    since epoch (UTC). Missing or unparseable values become _NO_TS (so one
+    bad row is skipped, not the batch); with missing_ok=False (query
+    bounds) both raise ValueError.
+    """
+    try:
+        idx = pd.DatetimeIndex(pd.to_datetime(
+            ts, utc=True, format="mixed", errors="coerce" if missing_ok else "raise",
+        )).as_unit("ns")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid timestamp: {e}") from None
+    if not missing_ok and idx.hasnans:
+        raise ValueError("Timestamp is missing")
+    return idx.asi8.copy()
+
+
+class SensorRingStore:
+    """
+    Per-device ring buffers backed by fixed-dtype numpy arrays.
+
+    - every device owns `capacity` slots (oldest readings are overwritten),
+      so memory is capped at devices * capacity * (8 + 4 * fields) bytes
+    - a latest-index table points at each device's newest reading, so
+      latest-state queries cost O(devices) instead of a sort over history
+    """
+
+    def __init__(self, capacity: int = 288, fields: Sequence[str] = STORE_FIELDS):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = int(capacity)
+        self.fields = tuple(fields)
+
+        self._dev_index: Dict[str, int] = {}
+        self._device_ids: List[str] = []
+
+        self._ts = np.full((0, self.capacity), _NO_TS, dtype=np.int64)
+        self._values = np.full((0, self.capacity, len(self.fields)), np.nan, dtype=np.float32)
+        self._writes = np.zeros(0, dtype=np.int64)        # total readings written per device
+        self._latest_pos = np.full(0, -1, dtype=np.int64)  # slot of the newest reading
+        self._latest_ts = np.full(0, _NO_TS, dtype=np.int64)
+        self._ingest_ns = _NO_TS                           # last stamp given to untimed readings
+
+    # --------------------------------------------------
+    # Device table
+    # --------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._device_ids)
+
+    @property
+    def device_ids(self) -> List[str]:
+        return list(self._device_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self._ts.nbytes + self._values.nbytes + self._writes.nbytes
+            + self._latest_pos.nbytes + self._latest_ts.nbytes
+        )
+
+    def _reserve(self, n_devices: int):
+        rows = self._ts.shape[0]
+        if n_devices <= rows:
+            return
+        new_rows = max(n_devices, 2 * rows, 16)
+        grow = new_rows - rows
+
+        self._ts = np.concatenate([self._ts, np.full((grow, self.capacity), _NO_TS, dtype=np.int64)])
+        self._values = np.concatenate(
+            [self._values, np.full((grow, self.capacity, len(self.fields)), np.nan, dtype=np.float32)]
+        )
+        self._writes = np.concatenate([self._writes, np.zeros(grow, dtype=np.int64)])
+        self._latest_pos = np.concatenate([self._latest_pos, np.full(grow, -1, dtype=np.int64)])
+        self._latest_ts = np.concatenate([self._latest_ts, np.full(grow, _NO_TS, dtype=np.int64)])
+
+    def _device_rows(self, device_ids) -> np.ndarray:
+        codes, uniques = pd.factorize(pd.Series(device_ids, dtype=object).astype(str))
+        rows = np.empty(len(uniques), dtype=np.int64)
+        for i, dev in enumerate(uniques):
+            row = self._dev_index.get(dev)
+            if row is None:
+                row = len(self._device_ids)
+                self._dev_index[dev] = row
+                self._device_ids.append(dev)
+            rows[i] = row
+        self._reserve(len(self._device_ids))
+        return rows[codes]
+
+    # --------------------------------------------------
+    # Ingestion
+    # --------------------------------------------------
+    def append(self, device_id: str, timestamp_utc, **values):
+        """
+        Single reading (e.g. a live LoRa uplink).
+        """
+        row = {"device_id": device_id, "timestamp_utc": timestamp_utc}
+        row.update(values)
+        self.extend(pd.DataFrame([row]))
+
+    def extend(self, df: pd.DataFrame):
+        """
+        Batch ingestion. Needs device_id; missing fields are NaN. Readings
+        are ordered by time per device before they enter the rings; without
+        a timestamp_utc column they keep ingest order (stamped with the
+        ingest clock).
+        """
+        if df is None or df.empty:
+            return
+        if "device_id" not in df.columns:
+            raise ValueError("Sensor readings must contain 'device_id'.")
+
+        ts = _to_ns(df["timestamp_utc"]) if "timestamp_utc" in df.columns else self._ingest_stamps(len(df))
+        ok = ts != _NO_TS
+        if not ok.any():
+            return
+
+        dev = self._device_rows(df["device_id"].to_numpy()[ok])
+        ts = ts[ok]
+        vals = np.column_stack([
+            pd.to_numeric(df[f], errors="coerce").to_numpy(dtype=np.float32)[ok]
+            if f in df.columns else np.full(len(ts), np.nan, dtype=np.float32)
+            for f in self.fields
+        ])
+
+        # order by (device, time)
+        order = np.lexsort((ts, dev))
+        dev, ts, vals = dev[order], ts[order], vals[order]
+
+        # sequence number of each reading inside its device group
+        starts = np.flatnonzero(np.r_[True, dev[1:] != dev[:-1]])
+        counts = np.diff(np.r_[starts, len(dev)])
+        seq = np.arange(len(dev)) - np.repeat(starts, counts)
+        slot_base = self._writes[dev]
+        self._writes[dev[starts]] += counts
+
+        # only the newest `capacity` readings of a batch can survive anyway
+        keep = seq >= np.repeat(counts, counts) - self.capacity
+        dev, ts, vals = dev[keep], ts[keep], vals[keep]
+        slot = (slot_base[keep] + seq[keep]) % self.capacity
+
+        # a late reading must not overwrite the slot holding a newer "latest"
+        late = (slot == self._latest_pos[dev]) & (ts < self._latest_ts[dev])
+        if late.any():
+            dev, ts, vals, slot = dev[~late], ts[~late], vals[~late], slot[~late]
+
+        self._ts[dev, slot] = ts
+        self._values[dev, slot] = vals
+
+        # newest reading per device in this batch = last row of its group
+        last = np.flatnonzero(np.r_[dev[1:] != dev[:-1], True]) if len(dev) else np.array([], dtype=np.int64)
+        d_last = dev[last]
+        newer = ts[last] >= self._latest_ts[d_last]
+        self._latest_ts[d_last[newer]] = ts[last][newer]
+        self._latest_pos[d_last[newer]] = slot[last][newer]
+
+    def _ingest_stamps(self, n: int) -> np.ndarray:
+        # strictly increasing across calls, so later batches are newer
+        start = max(time.time_ns(), self._ingest_ns + 1)
+        self._ingest_ns = start + n - 1
+        return np.arange(start, start + n, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: int = 288, fields: Sequence[str] = STORE_FIELDS) -> "SensorRingStore":
+        store = cls(capacity=capacity, fields=fields)
+        store.extend(df)
+        return store
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+    def _frame(self, rows: np.ndarray, ts: np.ndarray, vals: np.ndarray) -> pd.DataFrame:
+        out = pd.DataFrame({
+            "device_id": np.asarray(self._device_ids, dtype=object)[rows] if len(rows) else np.array([], dtype=object),
+            "timestamp_utc": pd.to_datetime(ts, utc=True),
+        })
+        for i, f in enumerate(self.fields):
+            out[f] = vals[:, i]
+        return out
+
+    def latest(self) -> pd.DataFrame:
+        """
+        Newest reading per device, O(devices).
+        """
+        n = len(self._device_ids)
+        rows = np.arange(n)
+        has = self._latest_pos[:n] >= 0
+        rows = rows[has]
+        pos = self._latest_pos[:n][has]
+        return self._frame(rows, self._ts[rows, pos], self._values[rows, pos])
+
+    def history(self, device_id: str, since=None) -> pd.DataFrame:
+        """
+        Retained readings of one device in time order (at most `capacity`).
+        """
+        row = self._dev_index.get(str(device_id))
+        if row is None:
+            return self._frame(np.array([], dtype=np.int64), np.array([], dtype=np.int64),
+                               np.empty((0, len(self.fields)), dtype=np.float32))
+
+        ts = self._ts[row]
+        valid = ts != _NO_TS
+        if since is not None:
+            valid &= ts >= _to_ns([since], missing_ok=False)[0]
+        pos = np.flatnonzero(valid)
+        pos = pos[np.argsort(ts[pos], kind="stable")]
+        return self._frame(np.full(len(pos), row), ts[pos], self._values[row, pos])
+
+    def latest_ts(self) -> pd.Series:
+        """
+        Last-seen timestamp per device (ns since epoch), O(devices).
+        """
+        n = len(self._device_ids)
+        return pd.Series(self._latest_ts[:n], index=self._device_ids, name="last_seen_ns")
+
+
+def latest_readings(data) -> pd.DataFrame:
+    """
+    Latest reading per device from a SensorRingStore or a readings DataFrame.
+    Frames without timestamp_utc keep each device's last row (ingest
+    order); frames without device_id are returned unchanged.
+    """
+    if isinstance(data, SensorRingStore):
+        return data.latest()
+    if data is None or data.empty:
+        return pd.DataFrame()
+    if "device_id" not in data.columns:
+        return data.copy()
+    if "timestamp_utc" not in data.columns:
+        return data[~data["device_id"].astype(str).duplicated(keep="last")].reset_index(drop=True)
+
+    # linear pass: keep the row holding each device's max timestamp
+    ts = _to_ns(data["timestamp_utc"])
+    codes, _ = pd.factorize(data["device_id"].astype(str))
+    best = np.full(codes.max() + 1 if len(codes) else 0, _NO_TS, dtype=np.int64)
+    np.maximum.at(best, codes, ts)
+    is_latest = (ts == best[codes]) & (ts != _NO_TS)
+    out = data[is_latest]
+    return out[~out["device_id"].duplicated(keep="last")].reset_index(drop=True)
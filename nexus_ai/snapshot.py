@@ -0,0 +1,203 @@
+"""
+Hot-reloadable snapshots of the daily risk dataset.
+
+A SnapshotManager serves the current snapshot (dataset + derived indexes)
+without ever blocking on a reload: when the source file changes it builds
+the next snapshot on a background thread and swaps it in under a lock once
+it is complete. Readers keep whatever snapshot they grabbed, so a request
+never mixes two dataset versions.
+"""
+from __future__ import annotations
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .risk_arrow import open_risk_dataset
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    version: str
+    dataset: Any
+    indexes: Dict[str, Any] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    def index(self, name: str):
+        return self.indexes[name]
+
+
+def file_version(path) -> Optional[Tuple[int, int]]:
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SnapshotManager:
+    """
+    - current(): the live snapshot (first call loads synchronously)
+    - polls the file version at most every `poll_s` seconds
+    - a new version must stay unchanged for `settle_s` before it is loaded,
+      so a file that is still being written is never picked up
+    - failed builds keep the previous snapshot and are retried on the next poll
+    """
+
+    def __init__(
+        self,
+        path,
+        loader: Callable[[Path], Any] = open_risk_dataset,
+        indexes: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        poll_s: float = 10.0,
+        settle_s: float = 2.0,
+    ):
+        self.path = Path(path)
+        self.loader = loader
+        self.index_builders: Dict[str, Callable[[Any], Any]] = dict(indexes or {})
+        self.poll_s = poll_s
+        self.settle_s = settle_s
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._building: Optional[threading.Thread] = None
+        self._last_poll = 0.0
+        self._seen: Optional[Tuple[int, int]] = None
+        self._seen_at = 0.0
+
+    # --------------------------------------------------
+    # Build
+    # --------------------------------------------------
+    def _build(self, version: Tuple[int, int]) -> Optional[DatasetSnapshot]:
+        dataset = self.loader(self.path)
+        indexes = {name: fn(dataset) for name, fn in self.index_builders.items()}
+        # the file changed while we were reading it: drop this build
+        if file_version(self.path) != version:
+            return None
+        return DatasetSnapshot(
+            version=f"{version[0]}-{version[1]}",
+            dataset=dataset,
+            indexes=indexes,
+            loaded_at=time.time(),
+        )
+
+    def _build_and_swap(self, version: Tuple[int, int]):
+        try:
+            snap = self._build(version)
+            if snap is not None:
+                with self._lock:
+                    self._snapshot = snap
+                log.info("Risk dataset snapshot %s loaded from %s", snap.version, self.path)
+        except Exception:
+            log.exception("Risk dataset reload failed; keeping the previous snapshot")
+        finally:
+            with self._lock:
+                self._building = None
+
+    def _extend_and_swap(self, base: DatasetSnapshot, names):
+        """
+        Add missing indexes to the live snapshot (same dataset, no reload).
+        """
+        try:
+            built = {name: self.index_builders[name](base.dataset) for name in names}
+            with self._lock:
+                if self._snapshot is not None and self._snapshot.version == base.version:
+                    self._snapshot = replace(self._snapshot, indexes={**self._snapshot.indexes, **built})
+        except Exception:
+            log.exception("Building snapshot indexes %s failed", ", ".join(names))
+        finally:
+            with self._lock:
+                self._building = None
+
+    def add_indexes(self, builders: Dict[str, Callable[[Any], Any]]):
+        """
+        Register derived indexes. They are built with every new snapshot and,
+        for the live one, in the background (until then they are absent
+        from snapshot.indexes).
+        """
+        with self._lock:
+            self.index_builders.update(builders)
+        self.refresh(force=True)
+
+    # --------------------------------------------------
+    # Access
+    # --------------------------------------------------
+    def current(self) -> DatasetSnapshot:
+        with self._lock:
+            snap = self._snapshot
+        if snap is None:
+            return self.refresh(block=True)
+        self.refresh()
+        return snap
+
+    def refresh(self, block: bool = False, force: bool = False) -> Optional[DatasetSnapshot]:
+        """
+        Check the file version and start a background rebuild if it changed
+        (or build indexes the live snapshot is missing). force=True skips
+        the poll interval; block=True waits for the very first load.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not (block or force) and now - self._last_poll < self.poll_s:
+                return self._snapshot
+            self._last_poll = now
+
+            version = file_version(self.path)
+            if version is None:
+                if self._snapshot is None:
+                    raise FileNotFoundError(f"Risk dataset not found: {self.path}")
+                return self._snapshot
+
+            current = self._snapshot.version if self._snapshot else None
+            if current == f"{version[0]}-{version[1]}":
+                missing = [n for n in self.index_builders if n not in self._snapshot.indexes]
+                if missing and self._building is None:
+                    self._building = threading.Thread(
+                        target=self._extend_and_swap, args=(self._snapshot, missing),
+                        name="risk-snapshot-indexes", daemon=True,
+                    )
+                    self._building.start()
+                return self._snapshot
+
+            if version != self._seen:
+                self._seen, self._seen_at = version, now
+            settled = now - self._seen_at >= self.settle_s or self._snapshot is None
+
+            if self._building is None and settled:
+                self._building = threading.Thread(
+                    target=self._build_and_swap, args=(version,), name="risk-snapshot-build", daemon=True
+                )
+                self._building.start()
+            building = self._building
+
+        if block and building is not None:
+            building.join()
+            with self._lock:
+                if self._snapshot is None:
+                    raise RuntimeError(f"Could not load risk dataset: {self.path}")
+        return self._snapshot
+
+    @property
+    def version(self) -> Optional[str]:
+        with self._lock:
+            return self._snapshot.version if self._snapshot else None
+
+
+_MANAGERS: Dict[str, SnapshotManager] = {}
+_MANAGERS_LOCK = threading.Lock()
+
+
+def get_snapshot_manager(path, **kwargs) -> SnapshotManager:
+    """
+    Process-wide manager per dataset path (shared by all sessions).
+    """
+    key = str(Path(path).resolve())
+    with _MANAGERS_LOCK:
+        mgr = _MANAGERS.get(key)
+        if mgr is None:
+            mgr = _MANAGERS[key] = SnapshotManager(path, **kwargs)
+        return mgr
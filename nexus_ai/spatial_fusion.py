@@ -0,0 +1,149 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from .fusion import FusionProfile, fuse
+
+EARTH_RADIUS_KM = 6371.0
+
+
+@dataclass(frozen=True)
+class FusionKernel:
+    radius_km: float = 25.0      # sensors further away have no influence
+    length_km: float = 8.0       # e-folding distance of the exp(-d / L) decay
+
+
+FUSION_KERNEL = FusionKernel()
+
+
+def _unit_xyz(lat, lon) -> np.ndarray:
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def _chord(km: float) -> float:
+    return 2.0 * np.sin(km / (2.0 * EARTH_RADIUS_KM))
+
+
+class CellNeighbourIndex:
+    """
+    KD-tree over grid cell centres (3D unit-sphere coordinates, so radius
+    queries are exact great-circle distances).
+
+    Sensor -> cell neighbour lists are computed once per sensor layout and
+    kept (LRU of pairs_cache_size layouts), so fusing a new set of scores
+    costs O(sensors x neighbours).
+    """
+
+    def __init__(self, lat, lon, pairs_cache_size: int = 16):
+        self.n_cells = len(lat)
+        self._tree = cKDTree(_unit_xyz(lat, lon))
+        self._pairs: "OrderedDict[Tuple[bytes, float], Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
+        self._pairs_size = int(pairs_cache_size)
+
+    def nearest(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (cell_idx, dist_km) of the closest cell for each query point.
+        """
+        chord, idx = self._tree.query(_unit_xyz(np.atleast_1d(lat), np.atleast_1d(lon)))
+        return idx, 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+    def neighbours(self, lat, lon, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (sensor_idx, cell_idx, dist_km) for every cell within radius_km of a sensor.
+        """
+        xyz = _unit_xyz(lat, lon)
+        key = (xyz.tobytes(), float(radius_km))
+        hit = self._pairs.get(key)
+        if hit is not None:
+            self._pairs.move_to_end(key)
+            return hit
+
+        lists = self._tree.query_ball_point(xyz, _chord(radius_km)) if len(xyz) else []
+        counts = np.fromiter((len(c) for c in lists), dtype=np.int64, count=len(lists))
+        sensor_idx = np.repeat(np.arange(len(lists)), counts)
+        cell_idx = np.fromiter((i for c in lists for i in c), dtype=np.int64, count=int(counts.sum()))
+
+        chord = np.linalg.norm(self._tree.data[cell_idx] - xyz[sensor_idx], axis=1)
+        dist_km = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+        self._pairs[key] = (sensor_idx, cell_idx, dist_km)
+        while len(self._pairs) > self._pairs_size:
+            self._pairs.popitem(last=False)
+        return sensor_idx, cell_idx, dist_km
+
+    def fuse(self, cell_scores, sensor_lat, sensor_lon, sensor_scores,
+             kernel: FusionKernel = FUSION_KERNEL, profile: str | FusionProfile | None = None):
+        """
+        Fused score per cell.
+
+        Each cell gets the kernel-weighted mean of nearby sensor scores and an
+        influence (strongest kernel weight, 1 at the node, 0 beyond radius_km);
+        the cell moves from its climate score towards the profile's fusion of
+        climate + local sensor score in proportion to the influence.
+        Returns (fused, influence, local_sensor_score).
+        """
+        cell_scores = np.asarray(cell_scores, dtype=np.float64)
+        sensor_scores = np.asarray(sensor_scores, dtype=np.float64)
+        s_idx, c_idx, dist = self.neighbours(sensor_lat, sensor_lon, kernel.radius_km)
+
+        valid = ~np.isnan(sensor_scores[s_idx]) if len(s_idx) else np.zeros(0, dtype=bool)
+        s_idx, c_idx, dist = s_idx[valid], c_idx[valid], dist[valid]
+
+        w = np.exp(-dist / kernel.length_km)
+        w_sum = np.bincount(c_idx, weights=w, minlength=self.n_cells)
+        ws_sum = np.bincount(c_idx, weights=w * sensor_scores[s_idx], minlength=self.n_cells)
+        influence = np.zeros(self.n_cells)
+        np.maximum.at(influence, c_idx, w)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            local = np.where(w_sum > 0, ws_sum / w_sum, np.nan)
+        full = fuse(cell_scores, local, profile=profile)
+        fused = np.clip(cell_scores + influence * (full - cell_scores), 0.0, 1.0)
+        return fused, influence, local
+
+
+def fuse_cells(
+    df_cells: pd.DataFrame,
+    df_sensors: pd.DataFrame,
+    index: CellNeighbourIndex | None = None,
+    kernel: FusionKernel = FUSION_KERNEL,
+    profile: str | FusionProfile | None = None,
+    lat_col: str = "lat",
+    lon_col: str = "lon",
+) -> pd.DataFrame:
+    """
+    Copy of df_cells with sensor_influence, sensor_local and fused_score
+    columns. df_sensors needs lat, lon and sensor_score.
+    """
+    out = df_cells.copy()
+    if index is None:
+        index = CellNeighbourIndex(out[lat_col].to_numpy(), out[lon_col].to_numpy())
+
+    cell_scores = np.clip(pd.to_numeric(out["risk_score"], errors="coerce").fillna(0.0).to_numpy(), 0.0, 1.0)
+    if df_sensors is None or df_sensors.empty:
+        out["sensor_influence"] = 0.0
+        out["sensor_local"] = np.nan
+        out["fused_score"] = cell_scores
+        return out
+
+    s = df_sensors.dropna(subset=["lat", "lon"])
+    fused, influence, local = index.fuse(
+        cell_scores,
+        pd.to_numeric(s["lat"], errors="coerce").to_numpy(),
+        pd.to_numeric(s["lon"], errors="coerce").to_numpy(),
+        pd.to_numeric(s["sensor_score"], errors="coerce").to_numpy(),
+        kernel=kernel,
+        profile=profile,
+    )
+    out["sensor_influence"] = influence.round(3)
+    out["sensor_local"] = local
+    out["fused_score"] = fused
+    return out
@@ -0,0 +1,257 @@
+"""
+Prebuilt, simplified boundary geometry in a memory-mapped Arrow IPC file.
+
+Build step (once per boundary file change):
+    python -m nexus_ai.state_geometry data/germany_states.geojson
+
+writes data/germany_states.geom.arrow: one row per (tolerance, region) with
+the name normalized to NAME_1 and the geometry as WKB (WGS84, valid,
+normalized). Simplification is coverage-aware, so shared borders between
+neighbouring states are simplified once and stay aligned. Tolerance 0 is
+the exact geometry.
+
+Loading maps the file and decodes WKB with shapely (milliseconds, no
+geopandas); maps request the tolerance that fits their zoom level.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import shapely
+from shapely.geometry import mapping
+
+from .risk_window import _region_name, load_regions
+
+# degrees; roughly 0 / 500 m / 2 km / 5 km
+TOLERANCES = (0.0, 0.005, 0.02, 0.05)
+
+_META_SOURCE = b"nexus.source_version"
+
+
+def geometry_path_for(geojson_path) -> Path:
+    p = Path(geojson_path)
+    return p.with_name(f"{p.stem}.geom.arrow")
+
+
+def _source_version(path) -> bytes:
+    st = Path(path).stat()
+    return f"{st.st_mtime_ns}-{st.st_size}".encode()
+
+
+def _simplify(geoms: np.ndarray, tolerance: float) -> np.ndarray:
+    if tolerance <= 0:
+        return geoms
+    if hasattr(shapely, "coverage_simplify"):
+        # shared edges are simplified once, so neighbours stay seamless
+        return shapely.coverage_simplify(geoms, tolerance, simplify_boundary=True)
+    return shapely.simplify(geoms, tolerance, preserve_topology=True)
+
+
+def build_state_geometry(
+    geojson_path,
+    out_path=None,
+    tolerances: Sequence[float] = TOLERANCES,
+    force: bool = False,
+) -> Path:
+    """
+    Write the simplified geometry file. Skipped when it was built from the
+    same GeoJSON version; written to a temp name and renamed. Region names
+    must be unique (ValueError otherwise).
+    """
+    geojson_path = Path(geojson_path)
+    out_path = Path(out_path) if out_path else geometry_path_for(geojson_path)
+    version = _source_version(geojson_path)
+
+    if out_path.exists() and not force:
+        try:
+            with pa.memory_map(str(out_path)) as src:
+                meta = pa.ipc.open_file(src).schema.metadata or {}
+            if meta.get(_META_SOURCE) == version:
+                return out_path
+        except pa.ArrowInvalid:
+            pass
+
+    with open(geojson_path, encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+    # id per region name, resolved exactly as load_regions names its keys
+    ids: Dict[str, str] = {}
+    for i, feat in enumerate(features):
+        if not feat.get("geometry"):
+            continue
+        props = feat.get("properties") or {}
+        name = _region_name(props, i)
+        if name in ids:
+            raise ValueError(f"{geojson_path}: region name {name!r} appears in more than one feature; "
+                             "merge its parts into one (Multi)Polygon feature")
+        ids[name] = str(props.get("id", ""))
+
+    regions = load_regions(geojson_path)
+    names = list(regions)
+    exact = shapely.normalize(np.array(list(regions.values()), dtype=object))
+    cols: Dict[str, list] = {"tolerance": [], "NAME_1": [], "id": [], "wkb": []}
+    for tol in sorted(set(float(t) for t in tolerances)):
+        geoms = shapely.make_valid(_simplify(exact, tol))
+        if tol > 0:
+            # snap to a tenth of the tolerance: shorter coordinates in the payload
+            geoms = shapely.set_precision(geoms, tol / 10.0)
+        cols["tolerance"] += [tol] * len(names)
+        cols["NAME_1"] += names
+        cols["id"] += [ids[n] for n in names]
+        cols["wkb"] += list(shapely.to_wkb(geoms))
+
+    table = pa.table({
+        "tolerance": pa.array(cols["tolerance"], type=pa.float64()),
+        "NAME_1": pa.array(cols["NAME_1"], type=pa.string()),
+        "id": pa.array(cols["id"], type=pa.string()),
+        "wkb": pa.array(cols["wkb"], type=pa.binary()),
+    }).replace_schema_metadata({_META_SOURCE: version})
+
+    tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def tolerance_for_zoom(zoom: float, tolerances: Sequence[float] = TOLERANCES, pixels: float = 1.5) -> float:
+    """
+    Largest tolerance below `pixels` screen pixels at this web-mercator zoom.
+    """
+    deg_per_px = 360.0 / (256.0 * 2 ** float(zoom))
+    usable = [t for t in tolerances if t <= pixels * deg_per_px]
+    return max(usable) if usable else min(tolerances)
+
+
+class StateGeometry:
+    """
+    Decoded geometry per tolerance (decoded lazily, then kept), plus
+    GeoJSON feature dicts for map layers.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with pa.memory_map(str(self.path), "r") as src:
+            table = pa.ipc.open_file(src).read_all()
+        tol = table.column("tolerance").to_numpy()
+        self.tolerances: List[float] = sorted(set(float(t) for t in tol))
+        self._rows = {t: np.flatnonzero(tol == t) for t in self.tolerances}
+        self._names = table.column("NAME_1").to_pylist()
+        self._ids = table.column("id").to_pylist()
+        self._wkb = table.column("wkb")
+        self._decoded: Dict[float, Dict[str, object]] = {}
+        self._features: Dict[float, Dict[str, dict]] = {}
+        self._lock = threading.Lock()
+
+    def _nearest(self, tolerance: float) -> float:
+        return min(self.tolerances, key=lambda t: abs(t - tolerance))
+
+    @property
+    def names(self) -> List[str]:
+        return [self._names[i] for i in self._rows[self.tolerances[0]]]
+
+    def shapes(self, tolerance: float = 0.0) -> Dict[str, object]:
+        """
+        NAME_1 -> shapely geometry at (the nearest available) tolerance.
+        """
+        t = self._nearest(tolerance)
+        with self._lock:
+            hit = self._decoded.get(t)
+        if hit is None:
+            rows = self._rows[t]
+            geoms = shapely.from_wkb(np.array(self._wkb.take(pa.array(rows)).to_pylist(), dtype=object))
+            hit = dict(zip((self._names[i] for i in rows), geoms))
+            with self._lock:
+                self._decoded[t] = hit
+        return hit
+
+    def frame(self, tolerance: float = 0.0) -> pd.DataFrame:
+        """
+        NAME_1 / id / geometry table (the shape load_states returns).
+        """
+        t = self._nearest(tolerance)
+        shapes = self.shapes(t)
+        return pd.DataFrame({
+            "NAME_1": list(shapes),
+            "id": [self._ids[i] for i in self._rows[t]],
+            "geometry": list(shapes.values()),
+        })
+
+    def features(self, tolerance: float = 0.0) -> Dict[str, dict]:
+        """
+        NAME_1 -> GeoJSON geometry dict (built once per tolerance).
+        """
+        t = self._nearest(tolerance)
+        with self._lock:
+            hit = self._features.get(t)
+        if hit is None:
+            hit = {name: mapping(geom) for name, geom in self.shapes(t).items()}
+            with self._lock:
+                self._features[t] = hit
+        return hit
+
+    def feature_collection(self, df: pd.DataFrame, zoom: float, name_col: str = "NAME_1") -> dict:
+        """
+        GeoJSON FeatureCollection for a per-state table at the tolerance for
+        `zoom` (all non-geometry columns become properties).
+        """
+        geoms = self.features(tolerance_for_zoom(zoom, self.tolerances))
+        props = df.drop(columns=["geometry"], errors="ignore")
+        records = props.astype(object).where(props.notna(), None).to_dict("records")
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {"type": "Feature", "geometry": geoms[r[name_col]], "properties": r}
+                for r in records if r.get(name_col) in geoms
+            ],
+        }
+
+
+_GEOMETRY: Dict[str, StateGeometry] = {}
+_GEOMETRY_LOCK = threading.Lock()
+
+
+def load_state_geometry(geojson_path, build: bool = True) -> Optional[StateGeometry]:
+    """
+    Process-wide StateGeometry for a boundary file; builds (or rebuilds a
+    stale) binary file first unless build=False.
+    """
+    geojson_path = Path(geojson_path)
+    out = geometry_path_for(geojson_path)
+    if build:
+        build_state_geometry(geojson_path, out)
+    elif not out.exists():
+        return None
+    key = f"{out.resolve()}|{_source_version(out).decode()}"
+    with _GEOMETRY_LOCK:
+        geom = _GEOMETRY.get(key)
+        if geom is None:
+            geom = _GEOMETRY[key] = StateGeometry(out)
+        return geom
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Prebuild simplified boundary geometry")
+    ap.add_argument("geojson", nargs="?", default="data/germany_states.geojson")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--tolerances", type=float, nargs="+", default=list(TOLERANCES), help="degrees")
+    ap.add_argument("--force", action="store_true")
+    args = ap.parse_args(argv)
+
+    out = build_state_geometry(args.geojson, args.out, tolerances=args.tolerances, force=args.force)
+    geom = StateGeometry(out)
+    for t in geom.tolerances:
+        size = len(json.dumps(list(geom.features(t).values())))
+        print(f"tolerance {t:g}°: {len(geom.names)} regions, {size / 1024:.0f} KiB GeoJSON")
+    print(f"Wrote {out} ({os.path.getsize(out) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
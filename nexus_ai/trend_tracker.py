@@ -0,0 +1,146 @@
+"""
+Streaming least-squares trend over a time-based sliding window.
+
+Samples live in a fixed-size ring buffer; the sums n, Σt, Σy, Σt², Σty are
+updated on every push and every eviction, so the slope is available in O(1)
+time and memory per sample instead of a polyfit over the whole window. Times
+are kept relative to a reference that is moved forward when the buffer is
+re-based (every `capacity` pushes), which bounds floating-point drift.
+"""
+from __future__ import annotations
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _seconds(ts) -> float:
+    return pd.Timestamp(ts).value / 1e9
+
+
+class SlidingSlope:
+    """
+    window_s: samples older than (latest - window_s) are dropped.
+    capacity: ring size; when full the oldest sample is dropped.
+    unit_s:   slope unit, e.g. 60 -> value per minute.
+    """
+
+    def __init__(self, window_s: float = 24 * 3600, capacity: int = 240, unit_s: float = 60.0):
+        self.window_s = float(window_s)
+        self.capacity = int(capacity)
+        self.unit_s = float(unit_s)
+        self._t = np.zeros(self.capacity)
+        self._y = np.zeros(self.capacity)
+        self._head = 0     # oldest sample
+        self._n = 0
+        self._ref: Optional[float] = None
+        self._sums = np.zeros(5)   # n, St, Sy, Stt, Sty (t relative to _ref, in unit_s)
+        self._since_rebase = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    # --------------------------------------------------
+    # Updates
+    # --------------------------------------------------
+    def _term(self, t: float, y: float) -> np.ndarray:
+        x = (t - self._ref) / self.unit_s
+        return np.array([1.0, x, y, x * x, x * y])
+
+    def _drop_oldest(self):
+        self._sums -= self._term(self._t[self._head], self._y[self._head])
+        self._head = (self._head + 1) % self.capacity
+        self._n -= 1
+
+    def _rebase(self):
+        """
+        Recompute the sums exactly with the oldest sample as reference.
+        """
+        t, y = self._ordered()
+        self._ref = float(t[0]) if len(t) else None
+        self._sums = np.zeros(5)
+        if len(t):
+            x = (t - self._ref) / self.unit_s
+            self._sums = np.array([len(t), x.sum(), y.sum(), (x * x).sum(), (x * y).sum()])
+        self._since_rebase = 0
+
+    def push(self, ts, value: float):
+        """
+        Add one sample (timestamps are expected in non-decreasing order).
+        """
+        t = _seconds(ts)
+        y = float(value)
+        if not np.isfinite(y):
+            return
+        if self._ref is None:
+            self._ref = t
+
+        while self._n and self._t[self._head] < t - self.window_s:
+            self._drop_oldest()
+        if self._n == self.capacity:
+            self._drop_oldest()
+
+        tail = (self._head + self._n) % self.capacity
+        self._t[tail] = t
+        self._y[tail] = y
+        self._n += 1
+        self._sums += self._term(t, y)
+
+        self._since_rebase += 1
+        if self._since_rebase >= self.capacity:
+            self._rebase()
+
+    def clear(self):
+        self._head = self._n = 0
+        self._ref = None
+        self._sums = np.zeros(5)
+        self._since_rebase = 0
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+    @property
+    def slope(self) -> float:
+        """
+        Least-squares slope in value per unit_s (0.0 below 2 distinct times).
+        """
+        n, st, sy, stt, sty = self._sums
+        den = n * stt - st * st
+        if n < 2 or den <= 1e-12 * max(n * stt, 1.0):
+            return 0.0
+        return float((n * sty - st * sy) / den)
+
+    @property
+    def mean(self) -> float:
+        n, _, sy, _, _ = self._sums
+        return float(sy / n) if n else float("nan")
+
+    @property
+    def span_s(self) -> float:
+        if self._n < 2:
+            return 0.0
+        return float(self._t[(self._head + self._n - 1) % self.capacity] - self._t[self._head])
+
+    def _ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        idx = (self._head + np.arange(self._n)) % self.capacity
+        return self._t[idx], self._y[idx]
+
+    def frame(self, name: str = "value") -> pd.DataFrame:
+        """
+        Samples in the window (oldest first), indexed by timestamp.
+        """
+        t, y = self._ordered()
+        return pd.DataFrame({name: y}, index=pd.to_datetime((t * 1e9).astype(np.int64)).rename("ts"))
+
+    def status(self, up: float, down: float) -> Optional[str]:
+        """
+        "up" / "down" / "flat" from the slope (None with fewer than 3 samples).
+        """
+        if self._n < 3 or self.span_s <= 0:
+            return None
+        s = self.slope
+        if s > up:
+            return "up"
+        if s < down:
+            return "down"
+        return "flat"
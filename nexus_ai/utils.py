@@ -1,21 +1,104 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Sequence, Tuple, Union
 import math
 
-from .config import THRESHOLDS
+import numpy as np
+import pandas as pd
+
+from .config import THRESHOLDS, RiskThresholds
 
 def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
 
-def score_to_level(score: float) -> str:
-    if score < THRESHOLDS.low:
-        return "LOW"
-    if score < THRESHOLDS.medium:
-        return "MEDIUM"
-    if score < THRESHOLDS.high:
-        return "HIGH"
-    return "EXTREME"
+@dataclass(frozen=True)
+class ThresholdTable:
+    """
+    Sorted edges -> labels (len(labels) == len(edges) + 1).
+
+    side="right": a value equal to an edge belongs to the upper bin
+    (score < edge is the lower level); side="left": to the lower bin.
+    A tuple gives the side per edge, e.g. ("right", "left") for strict
+    comparisons on both sides of a dead band (v < -e ... v > e).
+    Classification is one np.searchsorted pass over the whole array.
+    """
+    edges: Tuple[float, ...]
+    labels: Tuple[str, ...]
+    side: Union[str, Tuple[str, ...]] = "right"
+
+    def __post_init__(self):
+        if len(self.labels) != len(self.edges) + 1:
+            raise ValueError("ThresholdTable needs exactly one more label than edges.")
+        if list(self.edges) != sorted(self.edges):
+            raise ValueError("ThresholdTable edges must be sorted ascending.")
+        sides = (self.side,) * len(self.edges) if isinstance(self.side, str) else tuple(self.side)
+        if len(sides) != len(self.edges) or not set(sides) <= {"left", "right"}:
+            raise ValueError("ThresholdTable side must be 'left', 'right' or one of those per edge.")
+
+    @property
+    def _search_edges(self) -> np.ndarray:
+        # v >= e  <=>  v > nextafter(e, -inf): every edge as a "left" edge
+        edges = np.asarray(self.edges, dtype=np.float64)
+        if isinstance(self.side, str):
+            return edges
+        right = np.array([s == "right" for s in self.side])
+        return np.where(right, np.nextafter(edges, -np.inf), edges)
+
+    @classmethod
+    def from_thresholds(cls, t: RiskThresholds = THRESHOLDS, labels: Sequence[str] = ("LOW", "MEDIUM", "HIGH", "EXTREME"),
+                        scale: float = 1.0) -> "ThresholdTable":
+        return cls(edges=(t.low * scale, t.medium * scale, t.high * scale), labels=tuple(labels))
+
+    def codes(self, values) -> np.ndarray:
+        """
+        int8 bin index per value (-1 for NaN / missing).
+        """
+        v = pd.to_numeric(pd.Series(np.ravel(values)), errors="coerce").to_numpy(dtype=np.float64)
+        if isinstance(self.side, str):
+            out = np.searchsorted(self._search_edges, v, side=self.side)
+        else:
+            out = np.searchsorted(self._search_edges, v, side="left")
+        out = out.astype(np.int8)
+        out[np.isnan(v)] = -1
+        return out.reshape(np.shape(values))
+
+    def classify(self, values):
+        """
+        Scalar -> label (str); array / Series -> ordered pd.Categorical
+        (Series in -> Series out, same index).
+        """
+        if np.ndim(values) == 0:
+            code = int(self.codes(values))
+            return self.labels[code] if code >= 0 else None
+        cat = pd.Categorical.from_codes(self.codes(np.asarray(values)), categories=list(self.labels), ordered=True)
+        if isinstance(values, pd.Series):
+            return pd.Series(cat, index=values.index, name=values.name)
+        return cat
+
+    def lookup(self, values, table: Sequence, default=None) -> list:
+        """
+        Per-value entry of `table` (one per label), e.g. colors or icons.
+        """
+        codes = np.ravel(self.codes(values))
+        table = list(table) + [default]
+        return [table[c] for c in codes]
+
+
+RISK_LEVELS = ThresholdTable.from_thresholds(THRESHOLDS)
+
+# Scenario - real delta bins (strict on both sides: -0.2 is "better",
+# +-0.05 is "similar", 0.2 is "worse")
+DELTA_LEVELS = ThresholdTable(
+    edges=(-0.2, -0.05, 0.05, 0.2),
+    labels=("much better", "better", "similar", "worse", "much worse"),
+    side=("right", "right", "left", "left"),
+)
+
+# day-over-day state trend: |delta| above 0.05 counts as a change (+-0.05 itself is stable)
+TREND_LEVELS = ThresholdTable(edges=(-0.05, 0.05), labels=("decreasing", "stable", "increasing"), side=("right", "left"))
+
+def score_to_level(score):
+    return RISK_LEVELS.classify(score)
 
 def level_to_recommendation(level: str) -> str:
     return {
@@ -0,0 +1,170 @@
+"""
+Area-weighted zonal statistics of the risk grid over region polygons.
+
+Every grid cell is treated as its lat/lon rectangle (not its centre point).
+The fraction of each cell's area inside each region is computed once with
+shapely and kept as a sparse (regions x cells) weight matrix. Cells fully
+inside a region get 1 without an intersection, so only the boundary cells
+pay for polygon clipping. Small regions (Berlin, Bremen, Hamburg) therefore
+always get the cells they overlap, even when no cell centre lies within them.
+
+Per-day statistics are then sparse products:
+    mean_risk     area-weighted mean over overlapping cells
+    max_risk      max over cells overlapping the region
+    share_above   area share of the region with score >= threshold
+"""
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+from .risk_cube import _cell_keys
+from .risk_window import GridWindowIndex
+
+ZONAL_COLUMNS = ["mean_risk", "max_risk", "share_above", "cells"]
+
+
+def grid_spacing(lat, lon) -> Tuple[float, float]:
+    """
+    (dlat, dlon) of a regular grid: smallest step between distinct coordinates.
+    """
+    def step(v):
+        d = np.diff(np.unique(np.round(np.asarray(v, dtype=np.float64), 6)))
+        d = d[d > 1e-9]
+        return float(d.min()) if len(d) else 0.1
+    return step(lat), step(lon)
+
+
+def overlap_weights(lat, lon, regions: Dict[str, object], spacing: Optional[Tuple[float, float]] = None) -> sparse.csr_matrix:
+    """
+    (regions x cells) fraction (0-1] of each cell's rectangle inside each region.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    dlat, dlon = spacing or grid_spacing(lat, lon)
+    index = GridWindowIndex(lat, lon)
+
+    rows, cols, data = [], [], []
+    for r, geom in enumerate(regions.values()):
+        x0, y0, x1, y1 = geom.bounds
+        cand = index.bbox_cells((x0 - dlon / 2, y0 - dlat / 2, x1 + dlon / 2, y1 + dlat / 2))
+        if not len(cand):
+            continue
+        boxes = shapely.box(lon[cand] - dlon / 2, lat[cand] - dlat / 2, lon[cand] + dlon / 2, lat[cand] + dlat / 2)
+        shapely.prepare(geom)
+        inside = shapely.contains(geom, boxes)
+        edge = ~inside & shapely.intersects(geom, boxes)
+
+        frac = inside.astype(np.float64)
+        frac[edge] = shapely.area(shapely.intersection(boxes[edge], geom)) / (dlat * dlon)
+        keep = frac > 1e-6
+        rows.append(np.full(int(keep.sum()), r, dtype=np.int64))
+        cols.append(cand[keep])
+        data.append(np.minimum(frac[keep], 1.0))
+
+    if not rows:
+        return sparse.csr_matrix((len(regions), len(lat)))
+    return sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(regions), len(lat)),
+    )
+
+
+def zonal_stats(weights: sparse.csr_matrix, scores, threshold: float = 0.7, area=None) -> pd.DataFrame:
+    """
+    Per-region stats (ZONAL_COLUMNS) for one cell vector (NaN = no data).
+    weights: overlap fractions; area: optional per-cell area factor.
+    """
+    x = np.asarray(scores, dtype=np.float64)
+    has = ~np.isnan(x)
+    w = weights if area is None else (weights @ sparse.diags(np.asarray(area, dtype=np.float64))).tocsr()
+
+    # restrict to cells with data
+    wv = (w @ sparse.diags(has.astype(np.float64))).tocsr()
+    wv.eliminate_zeros()
+    x0 = np.where(has, x, 0.0)
+    den = np.asarray(wv.sum(axis=1)).ravel()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(den > 0, (wv @ x0) / den, np.nan)
+        share = np.where(den > 0, (wv @ (x0 >= threshold).astype(np.float64)) / den, np.nan)
+
+    mx = np.full(w.shape[0], np.nan)
+    nonempty = np.diff(wv.indptr) > 0
+    if nonempty.any():
+        mx[nonempty] = np.maximum.reduceat(x0[wv.indices], wv.indptr[:-1][nonempty])
+
+    return pd.DataFrame({
+        "mean_risk": mean,
+        "max_risk": mx,
+        "share_above": share,
+        "cells": np.diff(wv.indptr),
+    })
+
+
+class ZonalWeights:
+    """
+    Cached overlap weights for one grid (cell set) and one set of regions.
+    Frames are aligned to it by exact cell coordinates, in any row order.
+    """
+
+    def __init__(self, lat, lon, regions: Dict[str, object]):
+        keys = _cell_keys(lat, lon)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.names: List[str] = list(regions)
+        self.lat = np.asarray(lat, dtype=np.float32)[order]
+        self.lon = np.asarray(lon, dtype=np.float32)[order]
+        self.weights = overlap_weights(self.lat, self.lon, regions)
+        self.area = np.cos(np.radians(self.lat.astype(np.float64)))
+
+    def scores(self, df: pd.DataFrame, score_col: str = "risk_score") -> np.ndarray:
+        x = np.full(len(self.keys), np.nan)
+        if df is None or df.empty:
+            return x
+        lat_col = next(c for c in df.columns if c.lower() in ["lat", "latitude"])
+        lon_col = next(c for c in df.columns if c.lower() in ["lon", "long", "longitude"])
+        k = _cell_keys(df[lat_col].to_numpy(), df[lon_col].to_numpy())
+        pos = np.clip(np.searchsorted(self.keys, k), 0, max(len(self.keys) - 1, 0))
+        hit = self.keys[pos] == k
+        x[pos[hit]] = pd.to_numeric(df[score_col], errors="coerce").to_numpy(dtype=np.float64)[hit]
+        return x
+
+    def stats(self, df: pd.DataFrame, threshold: float = 0.7, score_col: str = "risk_score") -> pd.DataFrame:
+        out = zonal_stats(self.weights, self.scores(df, score_col), threshold=threshold, area=self.area)
+        out.insert(0, "NAME_1", self.names)
+        return out
+
+
+_WEIGHTS: "OrderedDict[str, ZonalWeights]" = OrderedDict()
+_WEIGHTS_LOCK = threading.Lock()
+_WEIGHTS_SIZE = 8
+
+
+def zonal_weights(lat, lon, regions: Dict[str, object]) -> ZonalWeights:
+    """
+    Shared ZonalWeights per (cell set, region shapes); the overlap is only
+    computed again when the grid or the boundaries change.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.sort(_cell_keys(lat, lon)).tobytes())
+    for name, geom in regions.items():
+        h.update(str(name).encode("utf-8"))
+        h.update(shapely.to_wkb(geom))
+    key = h.hexdigest()
+    with _WEIGHTS_LOCK:
+        zw = _WEIGHTS.get(key)
+        if zw is not None:
+            _WEIGHTS.move_to_end(key)
+            return zw
+    zw = ZonalWeights(lat, lon, regions)
+    with _WEIGHTS_LOCK:
+        _WEIGHTS[key] = zw
+        while len(_WEIGHTS) > _WEIGHTS_SIZE:
+            _WEIGHTS.popitem(last=False)
+    return zw
@@ -7,13 +7,18 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import requests
 import joblib
-from fpdf import FPDF
 import os
 
 from utils import load_css, img_to_base64
+from nexus_ai.sensor_rules import compute_sensor_score
+from nexus_ai.fusion import fuse, fusion_level, LEVEL_ICONS
+from nexus_ai.utils import ThresholdTable
+from nexus_ai.trend_tracker import SlidingSlope
+from nexus_ai.history_store import _loc_key, open_history_store
+from nexus_ai.reports import point_report, render_pdf
 
 # =====================================
 # LOAD GLOBAL STYLE (ثابت)
@@ -48,15 +53,38 @@ if MAPBOX_TOKEN:
 # =====================================
 # MODEL LOADING (CORE)
 # =====================================
+MODEL_PATH = "fire_risk_model.pkl"
+
 @st.cache_resource
 def load_nexus_model():
     try:
-        return joblib.load("fire_risk_model.pkl")
+        return joblib.load(MODEL_PATH)
     except:
         return None
 
 model = load_nexus_model()
 
+def model_version():
+    """
+    Model file name + modification time, stored with every score.
+    """
+    try:
+        return f"{os.path.basename(MODEL_PATH)}@{datetime.fromtimestamp(os.path.getmtime(MODEL_PATH)):%Y-%m-%dT%H:%M:%S}"
+    except OSError:
+        return None
+
+# =====================================
+# SCORE HISTORY (persistent, all sessions)
+# =====================================
+HISTORY_PATH = "data/nexus_history.sqlite"
+
+@st.cache_resource
+def load_history_store():
+    try:
+        return open_history_store(HISTORY_PATH)
+    except Exception:
+        return None
+
 # ============================================================
 # 2) LANGUAGES (KEEP + EXTEND)
 # ============================================================
@@ -412,15 +440,12 @@ def aqi_label(aqi_int):
         5: ("VERY POOR", "🟣")
     }.get(int(aqi_int), ("UNKNOWN", "⚪"))
 
+# FRI (0–300) levels
+FRI_LEVELS = ThresholdTable(edges=(80, 150, 220), labels=("LOW", "MODERATE", "HIGH", "EXTREME"))
+
 def classify_risk(score_0_300):
-    if score_0_300 < 80:
-        return "LOW", "🟢"
-    elif score_0_300 < 150:
-        return "MODERATE", "🟡"
-    elif score_0_300 < 220:
-        return "HIGH", "🟠"
-    else:
-        return "EXTREME", "🔴"
+    level = FRI_LEVELS.classify(score_0_300)
+    return level, LEVEL_ICONS.get(level, "⚪")
 
 def decision_recommendation(level):
     return {
@@ -466,45 +491,6 @@ def explain_text(features, primary=None, secondary=None):
             driver_line += f" Secondary: {secondary[0]}."
     return f"AI reasoning: {', '.join(reasons)}.\n{driver_line}".strip()
 
-def pdf_safe(text):
-    if text is None:
-        return ""
-    replacements = {
-        "▬": "STABLE",
-        "↑": "UP",
-        "↓": "DOWN",
-        "🟢": "LOW",
-        "🟡": "MODERATE",
-        "🟠": "HIGH",
-        "🔴": "EXTREME"
-    }
-    for k, v in replacements.items():
-        text = str(text).replace(k, v)
-    return text.encode("latin-1", errors="ignore").decode("latin-1")
-
-def generate_pdf(score, level, verdict, params, baseline_text, explanation):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=12)
-
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, txt="NEXUS AI - Wildfire Intelligence Report", ln=True, align='C')
-    pdf.ln(6)
-
-    pdf.set_font("Arial", size=12)
-    pdf.cell(0, 8, txt=pdf_safe(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"), ln=True)
-    pdf.cell(0, 8, txt=pdf_safe(f"Risk Score (FRI): {score:.2f} / 300"), ln=True)
-    pdf.cell(0, 8, txt=pdf_safe(f"Risk Level: {level}"), ln=True)
-    pdf.cell(0, 8, txt=pdf_safe(f"System Verdict: {verdict}"), ln=True)
-
-    pdf.multi_cell(0, 8, txt=pdf_safe(f"Baseline vs Yesterday: {baseline_text}"))
-    pdf.ln(2)
-    pdf.multi_cell(0, 8, txt=pdf_safe(f"Explanation: {explanation}"))
-    pdf.ln(2)
-    pdf.multi_cell(0, 8, txt=pdf_safe(f"Inputs: {params}"))
-
-    return pdf.output(dest='S').encode('latin-1')
-
 # ============================================================
 # NEW: TREND + FUSION + ALERTS + SENSITIVITY (helpers-in-file)
 # ============================================================
@@ -514,57 +500,79 @@ def clamp01(x):
     except:
         return 0.0
 
-def update_fri_history(score_ui):
+def fri_history(lat=None, lon=None) -> SlidingSlope:
     """
-    Keeps a last-24h history inside session_state.
-    If time jumps or app restarts, still works as rolling window.
+    Last-24h FRI history of one location: ring buffer (max 240 runs) with a
+    running least-squares slope in FRI per minute. One tracker per history
+    store location key, seeded from that location's stored runs, so earlier
+    sessions' runs here count but other places never mix in. Manual runs
+    (no location) are tracked for this session only.
     """
-    now = datetime.now()
-    rec = {"ts": now, "fri": float(score_ui)}
-    hist = st.session_state.get("fri_history", [])
-    hist.append(rec)
-
-    # keep only last 24h
-    cutoff = now - timedelta(hours=24)
-    hist = [h for h in hist if h["ts"] >= cutoff]
-
-    # hard cap to prevent growth (safety)
-    if len(hist) > 240:
-        hist = hist[-240:]
+    trackers = st.session_state.get("fri_history")
+    if not isinstance(trackers, dict):
+        trackers = st.session_state["fri_history"] = {}
+    key = _loc_key(lat, lon)
+    if key not in trackers:
+        hist = SlidingSlope(window_s=24 * 3600, capacity=240, unit_s=60.0)
+        store = load_history_store()
+        if store is not None and lat is not None and lon is not None:
+            now = datetime.now().astimezone()
+            past = store.history(lat, lon, since=now - pd.Timedelta(hours=24), limit=hist.capacity)
+            for ts, fri in zip(past["ts"].dt.tz_convert(now.tzinfo).dt.tz_localize(None), past["score"]):
+                hist.push(ts, fri)
+        trackers[key] = hist
+        # a session only needs the few places it looked at
+        while len(trackers) > 16:
+            trackers.pop(next(iter(trackers)))
+    return trackers[key]
+
+def update_fri_history(score_ui, lat, lon):
+    """
+    O(1) update of this location's 24h window (old samples are evicted on
+    push); the trend area shows the location of the latest run.
+    """
+    fri_history(lat, lon).push(datetime.now(), float(score_ui))
+    st.session_state["fri_location"] = (lat, lon)
 
-    st.session_state["fri_history"] = hist
+def history_baseline(lat, lon, now):
+    """
+    Returns (prev_score, label) from the history store: the score here about
+    24h ago, else the last earlier run here; the session's previous run when
+    the store is unavailable.
+    """
+    store = load_history_store()
+    if store is None:
+        return st.session_state.get("prev_score", None), "vs yesterday baseline"
+    ref = store.baseline(lat, lon, at=now)
+    if ref is not None:
+        return ref.score, "vs yesterday baseline"
+    ref = store.latest(lat, lon, before=now)
+    if ref is not None:
+        return ref.score, f"vs last run ({ref.ts.to_pydatetime().astimezone():%Y-%m-%d %H:%M})"
+    return None, "vs yesterday baseline"
+
+def record_history(score, kind, lat, lon, level, source, inputs):
+    store = load_history_store()
+    if store is None:
+        return
+    try:
+        store.record(score, kind=kind, lat=lat, lon=lon, level=level,
+                     model_version=model_version(), source=source, inputs=inputs)
+    except Exception:
+        # history must never break scoring (e.g. read-only disk)
+        pass
 
-def trend_status_from_history(hist):
+def trend_status_from_history(hist: SlidingSlope):
     """
-    Returns (label_key, slope) based on simple linear trend.
+    Returns (label_key, slope) from the tracker's running slope.
     """
-    if not hist or len(hist) < 3:
-        return None, 0.0
-    dfh = pd.DataFrame(hist).copy()
-    dfh = dfh.dropna()
-    if dfh.empty:
-        return None, 0.0
-
-    # numeric time axis (minutes from start)
-    t0 = dfh["ts"].min()
-    x = (dfh["ts"] - t0).dt.total_seconds().values / 60.0
-    y = dfh["fri"].values.astype(float)
-
-    if len(np.unique(x)) < 2:
-        return None, 0.0
-
-    # slope (fri per minute)
-    slope = np.polyfit(x, y, 1)[0]
-    # map to status
-    if slope > 0.015:   # ~ +0.9 per hour
-        return "up", slope
-    if slope < -0.015:  # ~ -0.9 per hour
-        return "down", slope
-    return "flat", slope
+    # ~ ±0.9 FRI per hour
+    return hist.status(up=0.015, down=-0.015), hist.slope
 
 def compute_sensor_score_from_field(field_data: dict):
     """
-    Converts Birdhouse field data to a 0..1 sensor_score.
+    Converts Birdhouse field data to a 0..1 sensor_score using the shared
+    Birdhouse rule set (nexus_ai.sensor_rules).
     Uses only available keys (safe). If nothing usable exists, return None.
     Expected possible keys: t, h, pm25, smoke_pm25
     """
@@ -572,74 +580,12 @@ def compute_sensor_score_from_field(field_data: dict):
         return None
 
     pm = field_data.get("pm25", field_data.get("smoke_pm25", None))
-    t = field_data.get("t", None)
-    h = field_data.get("h", None)
-
-    usable = False
-    score = 0.0
-
-    if pm is not None:
-        try:
-            pmv = float(pm)
-            usable = True
-            if pmv > 600:
-                score += 0.60
-            elif pmv > 200:
-                score += 0.40
-            elif pmv > 80:
-                score += 0.25
-        except:
-            pass
-
-    if h is not None:
-        try:
-            hv = float(h)
-            usable = True
-            if hv < 15:
-                score += 0.35
-            elif hv < 30:
-                score += 0.25
-            elif hv < 45:
-                score += 0.10
-        except:
-            pass
-
-    if t is not None:
-        try:
-            tv = float(t)
-            usable = True
-            if tv > 55:
-                score += 0.25
-            elif tv > 40:
-                score += 0.18
-            elif tv > 32:
-                score += 0.10
-        except:
-            pass
-
-    if not usable:
+    score = compute_sensor_score(pm25=pm, temp_c=field_data.get("t", None), rh=field_data.get("h", None))
+    if score is None:
         return None
 
     return clamp01(score)
 
-def compute_fusion_score(climate_0_1: float, sensor_0_1):
-    c = clamp01(climate_0_1)
-    if sensor_0_1 is None:
-        return clamp01(0.90 * c)
-    s = clamp01(sensor_0_1)
-    return clamp01(0.60 * c + 0.40 * s)
-
-def fusion_level(fusion_0_1: float):
-    f = clamp01(fusion_0_1)
-    if f < 0.30:
-        return "LOW", "🟢"
-    elif f < 0.60:
-        return "MODERATE", "🟡"
-    elif f < 0.80:
-        return "HIGH", "🟠"
-    else:
-        return "EXTREME", "🔴"
-
 def generate_system_alerts(fusion_0_1, sensor_0_1, delta_ui, baseline_available: bool, aqi_pack=None):
     alerts = []
     f = clamp01(fusion_0_1)
@@ -838,15 +784,11 @@ with ov3:
 with st.container():
     st.markdown("<div class='status-card'>", unsafe_allow_html=True)
     st.subheader(f"⏱️ {T['trend_title']}")
-    hist = st.session_state.get("fri_history", [])
-    if not hist or len(hist) < 2:
+    hist = fri_history(*st.session_state.get("fri_location", (None, None)))
+    if len(hist) < 2:
         st.info(T["trend_empty"])
     else:
-        dfh = pd.DataFrame(hist).copy()
-        dfh["ts"] = pd.to_datetime(dfh["ts"])
-        dfh = dfh.sort_values("ts")
-        dfh = dfh.set_index("ts")[["fri"]]
-        st.line_chart(dfh, height=160)
+        st.line_chart(hist.frame("fri"), height=160)
 
         status, slope = trend_status_from_history(hist)
         if status == "up":
@@ -946,7 +888,9 @@ if st.button(T["execute"], type="primary", use_container_width=True):
         # ----------------------------------------------------
         # 1) MODEL INFERENCE
         # ----------------------------------------------------
-        prev_score = st.session_state.get("prev_score", None)
+        run_at = datetime.now().astimezone()
+        prev_score, baseline_ref = history_baseline(lat, lon, run_at)
+        run_source = "geo" if lat is not None else "manual"
 
         X = np.array([[final_features["t"], final_features["h"], final_features["w"]]], dtype=float)
         raw_pred = float(model.predict(X)[0])
@@ -955,9 +899,10 @@ if st.button(T["execute"], type="primary", use_container_width=True):
         score_ui = min(300.0, score)
 
         # NEW: update 24h trend history
-        update_fri_history(score_ui)
+        update_fri_history(score_ui, lat, lon)
 
         level, icon = classify_risk(score_ui)
+        record_history(score_ui, "fri", lat, lon, level, run_source, final_features)
 
         # ----------------------------------------------------
         # 2) BASELINE (Yesterday comparison)
@@ -974,7 +919,7 @@ if st.button(T["execute"], type="primary", use_container_width=True):
             arrow = "↑" if delta > 0 else ("↓" if delta < 0 else "▬")
             delta_text = f"{arrow} {delta:+.1f}"
             delta_pct_text = f"{delta_pct:+.1f}%"
-            baseline_text = f"{delta_text} ({delta_pct_text}) vs yesterday baseline"
+            baseline_text = f"{delta_text} ({delta_pct_text}) {baseline_ref}"
             delta_for_alerts = float(delta)
             baseline_available = True
 
@@ -1058,12 +1003,10 @@ if st.button(T["execute"], type="primary", use_container_width=True):
 
         birdhouse_data = st.session_state.get("field_data")
 
-        if birdhouse_data:
-            smoke_factor = min(birdhouse_data.get("pm25", 240) / 600.0, 1.0)
-            dryness_factor = 1.0 if birdhouse_data.get("h", 50) < 30 else 0.4
-            sensor_score = 0.6 * smoke_factor + 0.4 * dryness_factor
+        sensor_score = compute_sensor_score_from_field(birdhouse_data) if birdhouse_data else None
 
-            after_fusion = 0.6 * climate_only_score + 0.4 * sensor_score
+        if sensor_score is not None:
+            after_fusion = fuse(climate_only_score, sensor_score)
             after_confidence = min(0.9, before_confidence + 0.25)
         else:
             after_fusion = None
@@ -1120,11 +1063,13 @@ if st.button(T["execute"], type="primary", use_container_width=True):
                 st.write(f"**AI Summary:** Current conditions indicate **{level}** risk; baseline trend: **{delta_text}**.")
                 st.info(f"**AI Recommendation:** {recommendation}")
 
-                pdf_data = generate_pdf(score_ui, level, verdict_str, final_features, baseline_text, explanation)
+                # one-off document (timestamped per run): rendered on click, not cached
+                report = point_report(score_ui, level, verdict_str, final_features, baseline_text, explanation,
+                                      ts=run_at.replace(tzinfo=None), history=fri_history(lat, lon).frame("fri"))
                 st.download_button(
                     label=T["report"],
-                    data=pdf_data,
-                    file_name="NEXUS_Report.pdf",
+                    data=lambda: render_pdf(report),
+                    file_name=f"{report.name}.pdf",
                     mime="application/pdf",
                     use_container_width=True
                 )
@@ -1179,8 +1124,11 @@ if st.button(T["execute"], type="primary", use_container_width=True):
             st.subheader(f"🧩 {T['fusion_overview']}")
             climate_0_1 = float(score_ui) / 300.0
             sensor_score = compute_sensor_score_from_field(field_data) if isinstance(field_data, dict) else None
-            fusion = compute_fusion_score(climate_0_1, sensor_score)
-            f_level, f_icon = fusion_level(fusion)
+            fusion = fuse(climate_0_1, sensor_score)
+            f_level = fusion_level(fusion)
+            f_icon = LEVEL_ICONS.get(f_level, "⚪")
+            record_history(fusion, "decision", lat, lon, f_level, run_source,
+                           {"fri": score_ui, "climate": climate_0_1, "sensor": sensor_score})
 
             st.markdown("<div class='kpi-card'>", unsafe_allow_html=True)
             st.write(f"**Climate Score:** {climate_0_1:.2f} (from FRI)")
@@ -7,6 +7,10 @@ from datetime import datetime
 from utils import img_to_base64
 import streamlit as st
 from utils import load_css
+from pathlib import Path
+from nexus_ai.sensor_rules import DEFAULT_RULESET, FALSE_ALARM_FILTER
+from nexus_ai.device_health import HEALTH_ICONS
+from nexus_ai.components.sensor_nodes import load_device_health
 
 load_css()
 
@@ -206,6 +210,7 @@ st.caption(T["subtitle"])
 
 # assets path
 ASSETS = "assets/"
+SENSOR_DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "sensor_readings.csv"
 
 # ============================================================
 # SESSION STATE (كما هو + إصلاح rerun)
@@ -239,36 +244,8 @@ if st.session_state.play_sound:
 
 # ============================================================
 # SENSOR CONFIRMATION (قواعد مبسطة مأخوذة من صفحة FireSense)
+# Rules + false-alarm filter live in nexus_ai.sensor_rules (shared by all pages)
 # ============================================================
-RULES = [
-    {"name": "PM2.5 Spike", "desc": "PM2.5 > 50 µg/m³", "weight": 0.45, "on": lambda pm25, t, rh: pm25 > 50},
-    {"name": "Low Humidity", "desc": "RH < 30%", "weight": 0.35, "on": lambda pm25, t, rh: rh < 30},
-    {"name": "High Temperature", "desc": "Temp > 30°C", "weight": 0.25, "on": lambda pm25, t, rh: t > 30},
-]
-
-def compute_sensor_event_score(pm25: float, temp_c: float, rh: float, enable_false_alarm_filter: bool = True, rh_safe: float = 55.0):
-    """
-    Transparent score: sum(weights of fired rules), clipped to 1.0
-    False-alarm filter: if RH high, ignore PM spike contribution.
-    """
-    fired = []
-    score = 0.0
-
-    # Apply false-alarm filter (optional)
-    pm25_for_rules = pm25
-    false_alarm_active = False
-    if enable_false_alarm_filter and rh >= rh_safe:
-        pm25_for_rules = min(pm25, 50)  # keep at/below threshold
-        false_alarm_active = True
-
-    for r in RULES:
-        is_on = bool(r["on"](pm25_for_rules, temp_c, rh))
-        fired.append((r, is_on))
-        if is_on:
-            score += float(r["weight"])
-
-    return float(min(score, 1.0)), fired, false_alarm_active
-
 def battery_health_percent(pct: float):
     if pct >= 70:
         return "Good", "🟢"
@@ -447,11 +424,27 @@ which is essential for large-scale forest deployment.
 elif menu == "5. Fleet Health":
     st.markdown('<div class="section">📍 Fleet Health Status</div>', unsafe_allow_html=True)
 
-    fleet = pd.DataFrame({
-        "Node": ["#01", "#02", "#03"],
-        "Battery": ["78%", "41%", "Offline"],
-        "Status": ["OK", "Warning", "Offline"]
-    })
+    # Streaming health (EWMA battery / RSSI / reporting interval) when node data exists
+    fleet = None
+    if SENSOR_DATA_PATH.exists():
+        try:
+            health = load_device_health(str(SENSOR_DATA_PATH), SENSOR_DATA_PATH.stat().st_mtime).snapshot()
+            fleet = pd.DataFrame({
+                "Node": health["device_id"],
+                "Battery": health["battery_v_ewm"].map(lambda v: f"{v:.2f} V" if pd.notna(v) else "—"),
+                "RSSI": health["rssi_ewm"].map(lambda v: f"{v:.0f} dBm" if pd.notna(v) else "—"),
+                "Status": [f"{HEALTH_ICONS[s]} {s}" for s in health["health_status"]],
+                "Last seen": health["last_seen"].dt.strftime("%Y-%m-%d %H:%M"),
+            })
+        except Exception as e:
+            st.warning(f"Fleet health unavailable: {e}")
+
+    if fleet is None:
+        fleet = pd.DataFrame({
+            "Node": ["#01", "#02", "#03"],
+            "Battery": ["78%", "41%", "Offline"],
+            "Status": ["OK", "Warning", "Offline"]
+        })
     st.table(fleet)
     st.markdown("""
 <div class="box">
@@ -546,14 +539,13 @@ if menu == "2. Internal Engineering":
     st.markdown('<div class="section">✅ Sensor Confirmation Logic (Explainable)</div>', unsafe_allow_html=True)
 
     enable_false_alarm_filter = True
-    rh_safe = 55.0
+    rh_safe = FALSE_ALARM_FILTER.rh_safe
 
-    sensor_score, fired, false_alarm_active = compute_sensor_event_score(
+    sensor_score, fired, false_alarm_active = DEFAULT_RULESET.score(
         pm25=float(live_smoke),
         temp_c=float(live_temp),
         rh=float(live_hum),
-        enable_false_alarm_filter=enable_false_alarm_filter,
-        rh_safe=rh_safe
+        false_alarm_filter=enable_false_alarm_filter,
     )
 
     # health cards
@@ -575,10 +567,10 @@ if menu == "2. Internal Engineering":
             f"""
 <div class="{cls}">
   <div>
-    <div class="rule-title">{rule['name']}</div>
-    <div class="rule-sub">{rule['desc']}</div>
+    <div class="rule-title">{rule.name}</div>
+    <div class="rule-sub">{rule.desc}</div>
   </div>
-  <div class="rule-weight">+{rule['weight']:.2f}</div>
+  <div class="rule-weight">+{rule.weight:.2f}</div>
 </div>
 """,
             unsafe_allow_html=True,
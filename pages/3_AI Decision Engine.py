@@ -441,8 +441,14 @@ def section(title: str):
 BASE_DIR = Path(__file__).resolve().parents[1]
 PARQUET_PATH = BASE_DIR / "daily_risk.parquet"
 STATES_PATH = BASE_DIR / "data" / "germany_states.geojson"
+# optional finer boundaries (e.g. Landkreise) for the aggregation pyramid
+DISTRICTS_PATH = BASE_DIR / "data" / "germany_districts.geojson"
 SENSOR_DATA_PATH = BASE_DIR / "data" / "sensor_readings.csv"
 
+# downloads from this page are built in the session's memory (st.download_button),
+# so they are capped; longer spans stream from GET /export/{product}
+EXPORT_MAX_DAYS = 31
+
 # ============================================================
 # OPTIONAL IMPORTS (components) + FALLBACKS
 # ============================================================
@@ -493,9 +499,14 @@ except Exception:
 
 # --- SENSORS (optional) ---
 try:
-    from nexus_ai.components.sensor_nodes import load_sensor_data, render_sensor_nodes_map
+    from nexus_ai.components.sensor_nodes import (
+        load_sensor_data, load_sensor_store, load_sensor_rollups, load_device_health, render_sensor_nodes_map
+    )
 except Exception:
     load_sensor_data = None
+    load_sensor_store = None
+    load_sensor_rollups = None
+    load_device_health = None
     render_sensor_nodes_map = None
 
 try:
@@ -503,62 +514,81 @@ try:
 except Exception:
     generate_sensor_alerts = None
 
+from nexus_ai.sensor_rules import score_sensor_frame
+
 try:
-    from nexus_ai.components.fusion_engine import compute_fusion_score, fusion_level
+    from nexus_ai.spatial_fusion import CellNeighbourIndex, fuse_cells
 except Exception:
-    compute_fusion_score = None
-    fusion_level = None
+    CellNeighbourIndex = None
+    fuse_cells = None
+
+from nexus_ai.fusion import fuse, fusion_level
+from nexus_ai.snapshot import DatasetSnapshot, get_snapshot_manager
+from nexus_ai.risk_cube import cube_index
+from nexus_ai.risk_ranges import ranges_index
+from nexus_ai.risk_climatology import climatology_index
+from nexus_ai.utils import ThresholdTable
+from nexus_ai.risk_query import day_query, top_states
+from nexus_ai.risk_window import grid_key, grid_window, window_index
+from nexus_ai.state_geometry import load_state_geometry
+from nexus_ai.risk_pyramid import pyramid_index
+from nexus_ai.risk_trends import trends_index
+from nexus_ai.trend_tracker import SlidingSlope
+from nexus_ai.export import EXPORT_FORMATS, PRODUCTS, Exporter, export_filename
 
 
 # ============================================================
 # FALLBACK UTILS
 # ============================================================
-def load_parquet_safe(path: Path) -> tuple[pd.DataFrame, str]:
+def load_snapshot_safe(path: Path) -> DatasetSnapshot | None:
+    # process-wide snapshot, rebuilt in the background when the file changes;
+    # one snapshot per rerun, so the dataset and every index read below
+    # belong to the same version
     if not path.exists():
         st.error(f"Missing parquet file: {path}")
-        return pd.DataFrame(), "date"
-    df = pd.read_parquet(str(path))
-    date_col = "date" if "date" in df.columns else ("time" if "time" in df.columns else None)
-    if date_col is None:
-        st.error("Parquet missing a date/time column (expected 'date' or 'time').")
-        return pd.DataFrame(), "date"
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    df = df.dropna(subset=[date_col])
-    if "risk_level" not in df.columns:
-        df["risk_level"] = "unknown"
-    if "risk_score" not in df.columns:
-        st.error("Parquet missing 'risk_score' column.")
-        return pd.DataFrame(), date_col
-    return df, date_col
-
-def compute_sensor_score_row(row) -> float:
-    score = 0.0
-    pm25 = float(row.get("pm25", 0) or 0)
-    rh = float(row.get("rh", 100) or 100)
-    temp = float(row.get("temp_c", 0) or 0)
-
-    if pm25 > 50:
-        score += 0.45
-    if rh < 30:
-        score += 0.35
-    if temp > 30:
-        score += 0.25
-    return float(min(score, 1.0))
-
-def simple_fusion_score(climate_risk_0_1: float, sensor_risk_0_1: float | None) -> float:
-    # fallback fusion if fusion_engine missing
-    if sensor_risk_0_1 is None:
-        return float(np.clip(climate_risk_0_1, 0, 1))
-    return float(np.clip(0.65 * climate_risk_0_1 + 0.35 * sensor_risk_0_1, 0, 1))
-
-def simple_fusion_level(fusion_0_1: float) -> str:
-    if fusion_0_1 >= 0.80:
-        return "EXTREME"
-    if fusion_0_1 >= 0.60:
-        return "HIGH"
-    if fusion_0_1 >= 0.30:
-        return "MEDIUM"
-    return "LOW"
+        return None
+    try:
+        mgr = get_snapshot_manager(path)
+        snap = mgr.current()
+    except (ValueError, RuntimeError) as e:
+        st.error(str(e))
+        return None
+    if "cube" not in mgr.index_builders:
+        # derived indexes (cells x days cube, range aggregator, ...) are built
+        # in the background; absent from snap.indexes until ready
+        mgr.add_indexes({
+            "cube": cube_index(path),
+            "ranges": ranges_index(path),
+            "climatology": climatology_index(path),
+            "pyramid": pyramid_index(path, {
+                "district": DISTRICTS_PATH if DISTRICTS_PATH.exists() else None,
+                "state": STATES_PATH,
+            }),
+            "trends": trends_index(path, STATES_PATH),
+            "window": window_index(path),
+        })
+    return snap
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_cell_index(cells_key: str, _lat: np.ndarray, _lon: np.ndarray):
+    # neighbour index per grid (keyed by grid_key, so new dates over the same
+    # cells reuse it; sensor -> cell lists are cached inside)
+    return CellNeighbourIndex(_lat, _lon)
+
+# percentile rank vs. climatology -> map color classes
+ANOMALY_LEVELS = ThresholdTable(edges=(50, 75, 90), labels=("low", "medium", "high", "extreme"))
+
+def load_state_geometry_safe(path: Path):
+    # prebuilt simplified state geometry (binary, built once from the GeoJSON)
+    try:
+        return load_state_geometry(path)
+    except Exception:
+        return None
+
+def load_region_shapes(path: Path) -> dict:
+    # exact state polygons for window queries (no geopandas needed)
+    geometry = load_state_geometry_safe(path)
+    return geometry.shapes(0.0) if geometry is not None else {}
 
 def haversine_km(lat1, lon1, lat2, lon2) -> float:
     R = 6371.0
@@ -600,11 +630,12 @@ st.divider()
 # ============================================================
 # LOAD DATA
 # ============================================================
-df, date_col = load_parquet_safe(PARQUET_PATH)
-if df.empty:
+snap = load_snapshot_safe(PARQUET_PATH)
+if snap is None or len(snap.dataset) == 0:
     st.stop()
+risk_table = snap.dataset
 
-all_dates = sorted(df[date_col].dt.date.unique())
+all_dates = risk_table.dates
 default_idx = max(0, len(all_dates) - 1)
 
 # ============================================================
@@ -613,9 +644,17 @@ default_idx = max(0, len(all_dates) - 1)
 with st.sidebar:
     selected_date = st.selectbox(T["date"], all_dates, index=default_idx)
 
-    levels = ["all"] + sorted(df["risk_level"].astype(str).unique())
+    levels = ["all"] + risk_table.levels
     selected_level = st.selectbox(T["risk_level"], levels)
 
+    # multi-day windows come from the prefix-sum range aggregator
+    window_mode = st.radio("Time window", ["Selected day", "Last 7 days", "Next 7 days", "Fire season (Mar–Sep)"])
+    window_agg = st.radio("Aggregate", ["max", "mean"], horizontal=True, disabled=window_mode == "Selected day")
+
+    # spatial window: only the cells inside the selected state are read
+    regions = load_region_shapes(STATES_PATH)
+    region = st.selectbox("Region", ["All Germany"] + sorted(regions))
+
     st.divider()
     st.markdown(f"### {T['map_settings']}")
     map_mode = st.radio(T["view_mode"], ["Points", "Hex"], horizontal=True)
@@ -639,16 +678,67 @@ with st.sidebar:
 # ============================================================
 # FILTER DATA (day + level)
 # ============================================================
-df_day = df[df[date_col].dt.date == selected_date].copy()
-if selected_level != "all":
-    df_day = df_day[df_day["risk_level"].astype(str) == str(selected_level)].copy()
+sel_ts = pd.Timestamp(selected_date)
+window = {
+    "Last 7 days": (sel_ts - pd.Timedelta(days=6), sel_ts),
+    "Next 7 days": (sel_ts, sel_ts + pd.Timedelta(days=6)),
+    "Fire season (Mar–Sep)": (pd.Timestamp(sel_ts.year, 3, 1), pd.Timestamp(sel_ts.year, 9, 30)),
+}.get(window_mode)
+
+ranges = snap.indexes.get("ranges") if window else None
+if window and ranges is None:
+    st.info("Range aggregation is being prepared in the background — showing the selected day.")
+
+# region -> cube cells via the shared window index (mask cached per shape),
+# so only those cube rows are read below
+region_bbox, region_cells = None, None
+if region in regions:
+    region_shape = regions[region]
+    region_bbox = region_shape.bounds
+    window_idx = snap.indexes.get("window")
+    region_cube = snap.indexes.get("cube")
+    if window_idx is not None and region_cube is not None:
+        region_cells = window_idx.cells(region_shape)
+
+def read_day_frame(d) -> pd.DataFrame:
+    if region_cells is not None:
+        return region_cube.day_frame(d, cells=region_cells)
+    return risk_table.day_frame(d)
 
-# yesterday
 yesterday_df = None
-idx = all_dates.index(selected_date)
-if idx > 0:
-    yday = all_dates[idx - 1]
-    yesterday_df = df[df[date_col].dt.date == yday].copy()
+if window and ranges is not None:
+    w_start, w_end = window
+    df_day = ranges.frame(w_start, w_end, how=window_agg, cells=region_cells)
+    # previous window of the same length as the comparison baseline
+    w_len = w_end - w_start + pd.Timedelta(days=1)
+    yesterday_df = ranges.frame(w_start - w_len, w_end - w_len, how=window_agg, cells=region_cells)
+    if yesterday_df.empty:
+        yesterday_df = None
+    period_label = f"{window_agg} {w_start.date()} → {w_end.date()}"
+else:
+    df_day = read_day_frame(selected_date)
+    # anomaly / percentile rank vs. the cell's climatology for this month
+    climatology = snap.indexes.get("climatology")
+    if climatology is not None:
+        df_day = climatology.attach(df_day, selected_date)
+    # yesterday
+    idx = all_dates.index(selected_date)
+    if idx > 0:
+        yday = all_dates[idx - 1]
+        yesterday_df = read_day_frame(yday)
+    period_label = str(selected_date)
+
+if region in regions and region_cells is None:
+    # window index still building: filter the frames instead (index shared
+    # per grid, so its mask is reused across dates)
+    df_day = grid_window(grid_key(df_day["lat"], df_day["lon"]), df_day["lat"], df_day["lon"]).rows(df_day, region_shape)
+    if yesterday_df is not None:
+        yesterday_df = grid_window(
+            grid_key(yesterday_df["lat"], yesterday_df["lon"]), yesterday_df["lat"], yesterday_df["lon"]
+        ).rows(yesterday_df, region_shape)
+
+if selected_level != "all":
+    df_day = df_day[df_day["risk_level"] == selected_level]
 
 # ============================================================
 # KPIs (Unified)
@@ -659,7 +749,7 @@ with st.container():
     c1.metric(T["kpi_cells"], len(df_day))
     c2.metric(T["kpi_hi"], int((df_day["risk_level"].isin(["high", "extreme"])).sum()) if "risk_level" in df_day.columns else 0)
     c3.metric(T["kpi_avg"], round(float(df_day["risk_score"].mean()) if not df_day.empty else 0.0, 3))
-    c4.metric(T["kpi_date"], str(selected_date))
+    c4.metric(T["kpi_date"], period_label)
     st.markdown("</div>", unsafe_allow_html=True)
 
 st.divider()
@@ -679,18 +769,44 @@ else:
 states_trend = None
 state_alerts = []
 
-if load_states and compute_state_risk and compute_state_trend:
+# cell -> district -> state -> country in a few sparse products (cached per period/filter)
+pyramid = snap.indexes.get("pyramid")
+pyramid_key = (snap.version, period_label, region, selected_level, score_threshold)
+pyramid_today = pyramid.day(pyramid_key, df=df_day, threshold=score_threshold) if pyramid is not None else None
+
+if compute_state_trend and ((load_states and compute_state_risk) or pyramid_today is not None):
     try:
-        states_gdf = load_states(STATES_PATH)
-        states_today = compute_state_risk(df_day, states_gdf)
-        states_yday = compute_state_risk(yesterday_df, states_gdf) if yesterday_df is not None else None
-        states_trend = compute_state_trend(states_today, states_yday)
+        use_components = bool(load_states and compute_state_risk)
+        if use_components:
+            states_gdf = load_states(STATES_PATH)
+            # area-weighted zonal stats; overlap weights cached on the full grid
+            grid = (pyramid.lat, pyramid.lon) if pyramid is not None else None
+            states_today = compute_state_risk(df_day, states_gdf, threshold=score_threshold, grid=grid)
+        else:
+            # state table straight from the pyramid
+            states_today = pyramid_today["state"].rename(columns={"region": "NAME_1"})
+
+        # selected day over all cells: delta / slope / streak are reads from the
+        # materialized per-state daily series
+        trends = snap.indexes.get("trends") if window is None and selected_level == "all" else None
+        if trends is not None:
+            day_trend = trends.day_frame(selected_date).drop(columns=["mean_risk"])
+            states_trend = states_today.merge(day_trend, on="NAME_1", how="left")
+        else:
+            states_yday = None
+            if yesterday_df is not None and use_components:
+                states_yday = compute_state_risk(yesterday_df, states_gdf, threshold=score_threshold, grid=grid)
+            elif yesterday_df is not None:
+                states_yday = pyramid.day(
+                    pyramid_key + ("baseline",), df=yesterday_df, threshold=score_threshold
+                )["state"].rename(columns={"region": "NAME_1"})
+            states_trend = compute_state_trend(states_today, states_yday)
 
         if generate_alerts:
             state_alerts = generate_alerts(states_trend, None)  # second arg kept as None (as your original)
         else:
             # fallback: simple alert summary
-            top = states_trend.sort_values("mean_risk", ascending=False).head(3)
+            top = top_states(states_trend, 3)
             state_alerts = [f"State escalation focus: {', '.join(top['NAME_1'].astype(str).tolist())}"]
     except Exception as e:
         state_alerts = [f"State trend failed: {e}"]
@@ -702,21 +818,31 @@ else:
 # SENSORS
 # ============================================================
 df_sensors = pd.DataFrame()
+sensor_store = None
 sensor_alerts = []
 
 if SENSOR_DATA_PATH.exists():
     try:
-        if load_sensor_data:
+        if load_sensor_store:
+            # latest reading per device straight from the ring-buffer store
+            sensor_store = load_sensor_store(str(SENSOR_DATA_PATH), SENSOR_DATA_PATH.stat().st_mtime)
+            df_sensors = sensor_store.latest()
+        elif load_sensor_data:
             df_sensors = load_sensor_data(str(SENSOR_DATA_PATH))
             # normalize column names if needed
             df_sensors.columns = [c.lower() for c in df_sensors.columns]
         else:
             df_sensors = pd.read_csv(str(SENSOR_DATA_PATH))
             df_sensors.columns = [c.lower() for c in df_sensors.columns]
-        df_sensors["sensor_score"] = df_sensors.apply(compute_sensor_score_row, axis=1)
+        df_sensors["sensor_score"] = score_sensor_frame(df_sensors)
+
+        # device health (EWMA battery / RSSI / reporting interval)
+        if load_device_health and {"device_id", "timestamp_utc"}.issubset(df_sensors.columns):
+            health = load_device_health(str(SENSOR_DATA_PATH), SENSOR_DATA_PATH.stat().st_mtime).snapshot()
+            df_sensors = df_sensors.merge(health[["device_id", "health_status"]], on="device_id", how="left")
 
         if generate_sensor_alerts:
-            sensor_alerts = generate_sensor_alerts(df_sensors)
+            sensor_alerts = generate_sensor_alerts(sensor_store if sensor_store is not None else df_sensors)
         else:
             # fallback alerts
             mx = float(df_sensors["sensor_score"].max()) if not df_sensors.empty else 0.0
@@ -732,6 +858,22 @@ if SENSOR_DATA_PATH.exists():
 else:
     sensor_alerts = [T["no_sensors"]]
 
+# ============================================================
+# SPATIAL FUSION (sensor scores -> nearby grid cells)
+# ============================================================
+df_fused = pd.DataFrame()
+if fuse_cells and not df_day.empty and not df_sensors.empty and "sensor_score" in df_sensors.columns:
+    lat_c = next((c for c in df_day.columns if c.lower() in ["lat", "latitude"]), None)
+    lon_c = next((c for c in df_day.columns if c.lower() in ["lon", "long", "longitude"]), None)
+    if lat_c and lon_c and {"lat", "lon"}.issubset(df_sensors.columns):
+        try:
+            lat_v, lon_v = df_day[lat_c].to_numpy(dtype=float), df_day[lon_c].to_numpy(dtype=float)
+            cell_index = load_cell_index(grid_key(lat_v, lon_v), lat_v, lon_v)
+            df_fused = fuse_cells(df_day, df_sensors, index=cell_index, lat_col=lat_c, lon_col=lon_c)
+        except Exception as e:
+            df_fused = pd.DataFrame()
+            st.warning(f"Spatial fusion unavailable: {e}")
+
 # ============================================================
 # TABS
 # ============================================================
@@ -754,17 +896,43 @@ with tab_map:
 
     st.markdown("<div class='status-card'>", unsafe_allow_html=True)
 
+    df_map_cells = df_day
+    map_layers = ["Risk"]
+    if not df_fused.empty:
+        map_layers.append("Sensor-fused")
+    if "risk_pct_rank" in df_day.columns:
+        map_layers.append("Anomaly vs. climatology")
+    map_layer = st.radio("Map layer", map_layers, horizontal=True) if len(map_layers) > 1 else "Risk"
+
+    if map_layer == "Sensor-fused":
+        df_map_cells = df_fused.assign(
+            risk_score=df_fused["fused_score"],
+            risk_level=fusion_level(df_fused["fused_score"]).cat.rename_categories(str.lower),
+        )
+        n_esc = int((df_fused["fused_score"] > df_fused["risk_score"] + 0.05).sum())
+        st.caption(f"{n_esc} cells escalated by nearby sensors (> +0.05).")
+    elif map_layer == "Anomaly vs. climatology":
+        df_map_cells = df_day.assign(
+            risk_score=df_day["risk_pct_rank"] / 100.0,
+            risk_level=ANOMALY_LEVELS.classify(df_day["risk_pct_rank"]),
+        )
+        n_unusual = int((df_day["risk_pct_rank"] >= 90).sum())
+        st.caption(
+            f"Colors show each cell's percentile rank against its own history for this month "
+            f"(<50 / 50–75 / 75–90 / ≥90). {n_unusual} cells are at or above their 90th percentile."
+        )
+
     if render_point_risk_map and render_hex_risk_map:
-        if map_mode == "Hex" and len(df_day) >= 300:
-            render_hex_risk_map(df_day, selected_date)
+        if map_mode == "Hex" and len(df_map_cells) >= 300:
+            render_hex_risk_map(df_map_cells, period_label, bbox=region_bbox)
         else:
-            render_point_risk_map(df_day, selected_date)
+            render_point_risk_map(df_map_cells, period_label, bbox=region_bbox)
     else:
-        lat_col = next((c for c in df_day.columns if c.lower() in ["lat", "latitude"]), None)
-        lon_col = next((c for c in df_day.columns if c.lower() in ["lon", "long", "longitude"]), None)
+        lat_col = next((c for c in df_map_cells.columns if c.lower() in ["lat", "latitude"]), None)
+        lon_col = next((c for c in df_map_cells.columns if c.lower() in ["lon", "long", "longitude"]), None)
 
-        if lat_col and lon_col and not df_day.empty:
-            tmp = df_day.rename(columns={lat_col: "lat", lon_col: "lon"}).copy()
+        if lat_col and lon_col and not df_map_cells.empty:
+            tmp = df_map_cells.rename(columns={lat_col: "lat", lon_col: "lon"}).copy()
             tmp = tmp[["lat", "lon", "risk_score"]].dropna()
             st.map(tmp, zoom=6)
             st.caption("Fallback map (components/maps.py not connected yet).")
@@ -773,6 +941,25 @@ with tab_map:
 
     st.markdown("</div>", unsafe_allow_html=True)
 
+    # per-cell history straight from the cells x days cube
+    with st.expander("📈 Cell history (last 90 days)"):
+        cube = snap.indexes.get("cube")
+        if cube is None:
+            st.info("Cell history is being prepared in the background — check back in a moment.")
+        else:
+            h1, h2 = st.columns(2)
+            lat0 = float(df_day["lat"].mean()) if not df_day.empty else 51.0
+            lon0 = float(df_day["lon"].mean()) if not df_day.empty else 10.0
+            q_lat = h1.number_input("Latitude", value=round(lat0, 3), format="%.3f")
+            q_lon = h2.number_input("Longitude", value=round(lon0, 3), format="%.3f")
+            cell = int(cube.nearest_cell(q_lat, q_lon)[0])
+            hist_cell = cube.series(cell, start=pd.Timestamp(selected_date) - pd.Timedelta(days=89), end=selected_date)
+            st.line_chart(pd.DataFrame({
+                "risk_score": hist_cell,
+                "7-day mean": hist_cell.rolling(7, min_periods=1).mean(),
+            }))
+            st.caption(f"Nearest grid cell: {cube.lat[cell]:.3f}, {cube.lon[cell]:.3f}")
+
     st.markdown(f"#### {T['legend']}")
     st.markdown("""
     <div class="legend-box">
@@ -806,8 +993,8 @@ with tab_summary:
     climate_score = float(np.clip(climate_raw, 0, 1))
     sensor_score = float(df_sensors["sensor_score"].max()) if not df_sensors.empty else None
 
-    fusion = compute_fusion_score(climate_score, sensor_score) if compute_fusion_score else simple_fusion_score(climate_score, sensor_score)
-    level = fusion_level(fusion) if fusion_level else simple_fusion_level(fusion)
+    fusion = fuse(climate_score, sensor_score)
+    level = fusion_level(fusion)
 
     st.markdown("<div class='status-card'>", unsafe_allow_html=True)
     c1, c2, c3 = st.columns(3)
@@ -817,6 +1004,55 @@ with tab_summary:
     st.markdown(f"### 🔥 FINAL LEVEL: **{level}**")
     st.markdown("</div>", unsafe_allow_html=True)
 
+    # -----------------------------
+    # WORST AREAS (partial selection, cached per day)
+    # -----------------------------
+    if not df_day.empty:
+        dq = day_query((snap.version, period_label, region, selected_level), df_day)
+        with st.expander("🔥 Worst cells & score percentiles"):
+            pct = dq.percentiles((50, 90, 99))
+            p1, p2, p3, p4 = st.columns(4)
+            p1.metric("Median", f"{pct[50]:.2f}")
+            p2.metric("P90", f"{pct[90]:.2f}")
+            p3.metric("P99", f"{pct[99]:.2f}")
+            p4.metric("Share ≥ threshold", f"{dq.share_above(score_threshold):.0%}")
+            worst = dq.top_cells(10)
+            worst_cols = [c for c in ["lat", "lon", "risk_score", "risk_level", "risk_pct_rank"] if c in worst.columns]
+            st.dataframe(worst[worst_cols].reset_index(drop=True), use_container_width=True)
+            if states_trend is not None and not states_trend.empty:
+                st.caption("Top states: " + ", ".join(top_states(states_trend, 5)["NAME_1"].astype(str)))
+
+        with st.expander("⬇️ Export"):
+            # same chunked writers as GET /export/{product} (nexus_ai.api); period + region of this view
+            ex_start, ex_end = window if window else (sel_ts, sel_ts)
+            clipped = (ex_end - ex_start).days + 1 > EXPORT_MAX_DAYS
+            if clipped:
+                # the EXPORT_MAX_DAYS of the period ending at the selected day
+                ex_end = min(ex_end, max(sel_ts, ex_start + pd.Timedelta(days=EXPORT_MAX_DAYS - 1)))
+                ex_start = max(ex_start, ex_end - pd.Timedelta(days=EXPORT_MAX_DAYS - 1))
+            e1, e2 = st.columns(2)
+            ex_product = e1.selectbox("Product", list(PRODUCTS), key="export_product")
+            ex_format = e2.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+            exporter = Exporter(risk_table, snap.indexes.get("trends"), load_state_geometry_safe(STATES_PATH))
+            ex_options = {"threshold": score_threshold, "eps_km": eps_km, "min_samples": min_samples} \
+                if ex_product in ("hotspots", "alerts") else {}
+            needs_trends = ex_product in ("states", "alerts") and exporter.trends is None
+            st.download_button(
+                "Download",
+                data=lambda: b"".join(exporter.stream(ex_product, ex_format, start=ex_start, end=ex_end, bbox=region_bbox, **ex_options)),
+                file_name=export_filename(ex_product, ex_format, ex_start, ex_end),
+                mime=EXPORT_FORMATS[ex_format][0],
+                disabled=needs_trends,
+                use_container_width=True,
+            )
+            if needs_trends:
+                st.caption("State trends are being prepared in the background.")
+            if clipped:
+                st.caption(f"Downloads here cover at most {EXPORT_MAX_DAYS} days: "
+                           f"{ex_start:%Y-%m-%d} → {ex_end:%Y-%m-%d} of this period.")
+            st.caption("Longer / multi-year exports: GET /export/{product}?format=&start=&end=&bbox= on the NEXUS API "
+                       "(uvicorn nexus_ai.api:app), streamed without building the file in memory.")
+
     # ============================================================
     # SENSOR MAP (GUARANTEED TO SHOW)
     # ============================================================
@@ -838,8 +1074,8 @@ with tab_summary:
             df_map = pd.DataFrame()
         else:
             df_map = df_map.rename(columns={lat_col: "lat", lon_col: "lon"})
-            df_map["lat"] = pd.to_numeric(df_map["lat"], errors="coerce")
-            df_map["lon"] = pd.to_numeric(df_map["lon"], errors="coerce")
+            df_map["lat"] = pd.to_numeric(df_map["lat"], errors="coerce").astype(float)
+            df_map["lon"] = pd.to_numeric(df_map["lon"], errors="coerce").astype(float)
             df_map = df_map.dropna(subset=["lat", "lon"])
 
             if df_map.empty:
@@ -851,10 +1087,34 @@ with tab_summary:
                     with st.expander("Enhanced sensor visualization"):
                         render_sensor_nodes_map(df_map)
 
-                cols = [c for c in ["device_id", "sensor_score", "pm25", "temp_c", "rh", "battery_v", "rssi"] if c in df_map.columns]
+                cols = [c for c in ["device_id", "sensor_score", "health_status", "pm25", "temp_c", "rh", "battery_v", "rssi"] if c in df_map.columns]
                 if cols:
                     st.dataframe(df_map[cols].reset_index(drop=True), use_container_width=True)
 
+                # Node trends from pre-aggregated rollups (no raw history scan)
+                if load_sensor_rollups and {"device_id", "timestamp_utc"}.issubset(df_map.columns):
+                    with st.expander("📈 Node trends (PM2.5 / Temp / RH)"):
+                        rollups = load_sensor_rollups(str(SENSOR_DATA_PATH), SENSOR_DATA_PATH.stat().st_mtime)
+                        t1, t2 = st.columns(2)
+                        trend_dev = t1.selectbox("Node", sorted(df_map["device_id"].astype(str).unique()))
+                        trend_win = t2.radio("Window", ["24h", "7d", "30d"], horizontal=True)
+
+                        t_end = pd.Timestamp.now(tz="UTC")
+                        if "timestamp_utc" in df_map.columns and df_map["timestamp_utc"].notna().any():
+                            t_end = pd.to_datetime(df_map["timestamp_utc"], utc=True).max()
+                        t_start = t_end - pd.Timedelta(trend_win.replace("d", "D"))
+
+                        roll = rollups.query(t_start, t_end, device_ids=[trend_dev])
+                        if roll.empty:
+                            st.info(T["trend_empty"])
+                        else:
+                            # same sliding-window slope tracker as the AI Hub FRI trend
+                            pm_trend = SlidingSlope(window_s=(t_end - t_start).total_seconds(), capacity=len(roll) + 1, unit_s=3600.0)
+                            for ts_b, v in zip(roll["bucket_start"], roll["pm25_mean"]):
+                                pm_trend.push(ts_b, v)
+                            st.caption(f"Resolution: {roll['tier'].iloc[0]} · PM2.5 trend {pm_trend.slope:+.2f} µg/m³ per hour")
+                            st.line_chart(roll.set_index("bucket_start")[["pm25_mean", "temp_c_mean", "rh_mean"]])
+
     st.markdown("</div>", unsafe_allow_html=True)
 
     # ============================================================
@@ -863,9 +1123,7 @@ with tab_summary:
     section(T["forecast_title"])
     st.markdown("<div class='status-card'>", unsafe_allow_html=True)
 
-    df_hist = df.copy()
-    df_hist["d"] = df_hist[date_col].dt.date
-    hist = df_hist.groupby("d")["risk_score"].mean().tail(7)
+    hist = risk_table.daily_mean(last=7)
 
     if len(hist) > 1:
         st.line_chart(hist)
@@ -950,10 +1208,31 @@ with tab_state:
     if states_trend is None:
         st.warning("No state trend available.")
     else:
-        if render_state_risk_map:
-            render_state_risk_map(states_trend)
+        state_geometry = load_state_geometry_safe(STATES_PATH)
+        if render_state_risk_map and (state_geometry is not None or "geometry" in states_trend.columns):
+            render_state_risk_map(states_trend, geometry=state_geometry, bbox=region_bbox)
         st.dataframe(states_trend.drop(columns=["geometry"], errors="ignore"), use_container_width=True)
 
+    # drill-down country -> state -> district from the cached pyramid levels
+    if pyramid_today is not None:
+        with st.expander("🔎 Drill-down"):
+            country = pyramid_today["country"].iloc[0]
+            d1, d2 = st.columns(2)
+            d1.metric(f"{country['region']} (area-weighted mean)", f"{country['mean_risk']:.3f}", help=f"{country['cells']} cells")
+            d2.metric("Area ≥ threshold", f"{country['share_above']:.0%}" if country["share_above"] == country["share_above"] else "–")
+            state_names = pyramid_today["state"]["region"].tolist()
+            pick = st.selectbox("State", state_names, index=state_names.index(region) if region in state_names else 0)
+            state_series = snap.indexes.get("trends")
+            if state_series is not None and pick in state_series.names:
+                hist = state_series.series_of(pick, sel_ts - pd.Timedelta(days=29), sel_ts)
+                st.caption(f"{pick}: last 30 days (daily area-weighted mean)")
+                st.line_chart(hist[["mean_risk"]])
+            districts = pyramid.children(pyramid_today, "state", pick)
+            if districts.empty:
+                st.caption(f"No district boundaries loaded (add {DISTRICTS_PATH.name} to data/ for Landkreise).")
+            else:
+                st.dataframe(districts.sort_values("mean_risk", ascending=False), use_container_width=True)
+
     st.markdown("</div>", unsafe_allow_html=True)
 
 # ============================================================
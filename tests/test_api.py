@@ -0,0 +1,120 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from nexus_ai import api
+
+N_DAYS = 30
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    # 0.5 degree grid over Germany with one high-risk block around (50.5, 8.5)
+    lat, lon = np.meshgrid(np.arange(47.5, 55.0, 0.5), np.arange(6.0, 15.0, 0.5), indexing="ij")
+    lat, lon = lat.ravel(), lon.ravel()
+    rng = np.random.default_rng(0)
+    days = pd.date_range("2024-06-01", periods=N_DAYS)
+    scores = rng.uniform(0.0, 0.5, (N_DAYS, len(lat)))
+    scores[:, (lat >= 50.0) & (lat <= 51.5) & (lon >= 8.0) & (lon <= 9.5)] = 0.9
+    df = pd.DataFrame({
+        "date": np.repeat(days, len(lat)),
+        "latitude": np.tile(lat, N_DAYS),
+        "longitude": np.tile(lon, N_DAYS),
+        "risk_score": scores.ravel(),
+    })
+    path = tmp_path_factory.mktemp("api") / "daily_risk.parquet"
+    df.to_parquet(path, index=False)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(api, "DATA_PATH", path)
+        mp.setattr(api, "DISTRICTS_PATH", path.parent / "missing.geojson")
+        with TestClient(api.app) as c:
+            yield c
+
+
+def test_point_on_grid(client):
+    r = client.get("/risk/point", params={"lat": 50.6, "lon": 8.4, "date": "2024-06-05"})
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["cell_lat"], body["cell_lon"]) == (50.5, 8.5)
+    assert body["risk_score"] == pytest.approx(0.9, abs=1e-6)
+    assert body["risk_level"] == "extreme"
+
+
+def test_point_off_grid(client):
+    assert client.get("/risk/point", params={"lat": 0, "lon": 0}).status_code == 404
+    assert client.post("/fusion", json={"lat": 0, "lon": 0}).status_code == 404
+
+
+def test_points_off_grid_rows_are_null(client):
+    r = client.post("/risk/points", json={"points": [{"lat": 0, "lon": 0}, {"lat": 50.5, "lon": 8.5}]})
+    assert r.status_code == 200
+    off, on = r.json()["rows"]
+    assert off["risk_score"] is None and off["risk_level"] is None
+    assert on["risk_level"] == "extreme"
+
+
+def test_etag_not_modified(client):
+    r = client.get("/grid", params={"date": "2024-06-02"})
+    assert r.status_code == 200
+    again = client.get("/grid", params={"date": "2024-06-02"}, headers={"If-None-Match": r.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_grid_gzip_and_arrow(client):
+    r = client.get("/grid", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json()["count"] == 15 * 18
+
+    r = client.get("/grid", params={"format": "arrow", "bbox": "8,50,9.5,51.5"})
+    table = pa.ipc.open_stream(io.BytesIO(r.content)).read_all()
+    assert table.num_rows == 16
+    assert set(table.column("risk_level").to_pylist()) == {"extreme"}
+
+
+def test_states_and_hotspots(client):
+    r = client.get("/states", params={"level": "state"})
+    assert r.status_code == 200
+    rows = r.json()["rows"]
+    assert {"region", "mean_risk", "trend"} <= set(rows[0])
+
+    r = client.get("/hotspots", params={"eps_km": 80, "min_samples": 3})
+    assert r.status_code == 200
+    (cluster,) = r.json()["rows"]
+    assert cluster["cells"] == 16
+
+
+def test_fusion(client):
+    r = client.post("/fusion", json={"lat": 50.5, "lon": 8.5, "sensor": {"sensor_score": 0.2}})
+    assert r.status_code == 200
+    assert r.json()["climate_score"] == pytest.approx(0.9, abs=1e-6)
+
+    r = client.post("/fusion/grid", json={"sensors": [{"lat": 49.0, "lon": 7.0, "sensor_score": 1.0}]})
+    rows = r.json()["rows"]
+    assert rows and all(row["sensor_influence"] > 0 for row in rows)
+
+
+def test_fusion_grid_ignores_empty_readings(client):
+    sensors = [{"lat": 50.5, "lon": 8.5}, {"lat": 49.0, "lon": 7.0, "pm25": None}]
+    r = client.post("/fusion/grid", json={"sensors": sensors, "influenced_only": False, "bbox": "8.5,50.5,8.5,50.5"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["sensors"] == 0
+    (row,) = body["rows"]
+    assert row["fused_score"] == pytest.approx(row["risk_score"])
+    assert row["sensor_influence"] == 0
+
+
+def test_bad_requests(client):
+    assert client.get("/risk/point", params={"lat": 50, "lon": 8, "date": "2030-01-01"}).status_code == 404
+    assert client.get("/grid", params={"bbox": "1,2,3"}).status_code == 400
+    assert client.get("/grid", params={"bbox": "8,50,nan,51"}).status_code == 400
+    assert client.get("/hotspots", params={"bbox": "-inf,50,9,51"}).status_code == 400
+    assert client.get("/grid", params={"level": "purple"}).status_code == 400
+    assert client.get("/states", params={"level": "district"}).status_code == 400
+    assert client.post("/fusion", json={}).status_code == 400
+    assert client.get("/export/nope").status_code == 404
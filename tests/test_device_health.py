@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from nexus_ai.device_health import DeviceHealthMonitor
+
+T0 = pd.Timestamp("2024-06-01", tz="UTC")
+
+
+def readings(device_id, n, every_s=300, start=T0, battery=4.0, rssi=-90.0):
+    ts = start + pd.to_timedelta(np.arange(n) * every_s, unit="s")
+    return pd.DataFrame({"device_id": device_id, "timestamp_utc": ts, "battery_v": battery, "rssi": rssi})
+
+
+def status(monitor, now=None):
+    return monitor.snapshot(now).set_index("device_id")["health_status"].to_dict()
+
+
+def test_batch_matches_reading_by_reading():
+    rng = np.random.default_rng(3)
+    df = pd.concat([readings("chatty", 400, every_s=15), readings("a", 20), readings("b", 3, every_s=900)])
+    df["battery_v"] = rng.uniform(3.6, 4.2, len(df))
+    df["rssi"] = rng.uniform(-110, -80, len(df))
+    df = df.sample(frac=1.0, random_state=0)
+
+    batch = DeviceHealthMonitor()
+    batch.update_frame(df)
+    single = DeviceHealthMonitor()
+    for row in df.sort_values("timestamp_utc").itertuples():
+        single.update(row.device_id, row.timestamp_utc, row.battery_v, row.rssi)
+
+    a = batch.snapshot().set_index("device_id").sort_index()
+    b = single.snapshot().set_index("device_id").sort_index()
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_unknown_until_interval_known():
+    monitor = DeviceHealthMonitor(expected_interval_s={"cfg": 300})
+    last = T0 + pd.Timedelta(seconds=9 * 300)
+    monitor.update_frame(pd.concat([readings("new", 1, start=last), readings("cfg", 1, start=last), readings("old", 10)]))
+    assert status(monitor) == {"new": "Unknown", "cfg": "OK", "old": "OK"}
+
+
+def test_silent_device_against_watermark():
+    monitor = DeviceHealthMonitor()
+    monitor.update_frame(pd.concat([readings("quiet", 5), readings("busy", 50)]))
+    assert status(monitor)["quiet"] == "Offline"
+    assert status(monitor)["busy"] == "OK"
+
+
+def test_quiet_fleet_needs_now():
+    monitor = DeviceHealthMonitor()
+    monitor.update_frame(pd.concat([readings("a", 10), readings("b", 10)]))
+    assert set(status(monitor).values()) == {"OK"}
+    later = T0 + pd.Timedelta(hours=6)
+    assert set(status(monitor, now=later).values()) == {"Offline"}
+
+
+def test_battery_drain_and_weak_link():
+    monitor = DeviceHealthMonitor()
+    df = readings("drain", 40, every_s=600)
+    df["battery_v"] = np.linspace(4.1, 3.6, len(df))
+    monitor.update_frame(pd.concat([df, readings("weak", 40, every_s=600, rssi=-120.0), readings("fine", 40, every_s=600)]))
+    snap = monitor.snapshot().set_index("device_id")
+    assert snap.loc["drain", "drain"] and not snap.loc["fine", "drain"]
+    assert snap.loc["weak", "link_degraded"]
+    assert snap.loc["fine", "health_status"] == "OK"
@@ -0,0 +1,31 @@
+import os
+import time
+
+from nexus_ai.reports import Report, kv_block, point_report, prune_cache, render_pdf, render_report
+
+
+def test_point_report_renders_without_cache():
+    report = point_report(120.0, "MODERATE", "ok", {"temp": 30}, "baseline", "explanation", ts="2026-01-01 10:00:00")
+    assert render_pdf(report).startswith(b"%PDF")
+
+
+def test_render_report_cache_hit(tmp_path):
+    report = Report(name="r", title="T", blocks=(kv_block([("a", 1)]),))
+    first = render_report(report, cache_dir=tmp_path)
+    assert render_report(report, cache_dir=tmp_path) == first
+    assert len(list(tmp_path.glob("*.pdf"))) == 1
+
+
+def test_prune_cache_by_age_and_size(tmp_path):
+    for i in range(4):
+        render_report(Report(name=f"r{i}", title=f"T{i}", blocks=(kv_block([("i", i)]),)), cache_dir=tmp_path)
+    files = sorted(tmp_path.glob("*.pdf"), key=lambda p: p.stat().st_mtime)
+    stale = files[0]
+    os.utime(stale, (time.time() - 90 * 86400,) * 2)
+
+    assert prune_cache(tmp_path, max_bytes=None, max_age_days=30) == 1
+    assert not stale.exists()
+
+    keep = files[1]
+    assert prune_cache(tmp_path, max_bytes=0, max_age_days=None, keep=[keep]) == 2
+    assert [p.name for p in tmp_path.glob("*.pdf")] == [keep.name]
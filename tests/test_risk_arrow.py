@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from nexus_ai.risk_arrow import ArrowRiskDataset, build_arrow_cache
+
+
+def write_parquet(path):
+    days = pd.date_range("2024-06-01", periods=3)
+    lat, lon = np.meshgrid([50.0, 50.1], [8.0, 8.1], indexing="ij")
+    pd.DataFrame({
+        "date": np.repeat(days, lat.size),
+        "latitude": np.tile(lat.ravel(), len(days)),
+        "longitude": np.tile(lon.ravel(), len(days)),
+        "risk_score": np.linspace(0.0, 1.0, lat.size * len(days)),
+    }).to_parquet(path, index=False)
+
+
+def test_cache_rebuilt_when_encoding_changes(tmp_path):
+    parquet = tmp_path / "risk.parquet"
+    write_parquet(parquet)
+
+    assert not ArrowRiskDataset(build_arrow_cache(parquet)).quantized
+    quantized = ArrowRiskDataset(build_arrow_cache(parquet, quantize=True))
+    assert quantized.quantized
+    assert np.allclose(quantized.scores(), np.linspace(0.0, 1.0, 12), atol=1e-4)
+    assert not ArrowRiskDataset(build_arrow_cache(parquet, quantize=False)).quantized
+
+
+def test_cache_reused_for_same_source(tmp_path):
+    parquet = tmp_path / "risk.parquet"
+    write_parquet(parquet)
+    path = build_arrow_cache(parquet, quantize=True)
+    mtime = path.stat().st_mtime_ns
+    assert build_arrow_cache(parquet, quantize=True).stat().st_mtime_ns == mtime
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from nexus_ai.risk_climatology import RiskClimatology
+from nexus_ai.risk_cube import RiskCube
+
+
+def make_climatology(n_cells=4, n_days=60):
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0, 1, (n_cells, n_days)).astype(np.float32)
+    lat = np.linspace(50.0, 50.3, n_cells, dtype=np.float32)
+    lon = np.full(n_cells, 10.0, dtype=np.float32)
+    return RiskClimatology(RiskCube(data, lat, lon, pd.Timestamp("2024-01-01")), bins=10)
+
+
+def test_percentile_rank_missing_scores():
+    clim = make_climatology()
+    rank = clim.percentile_rank(1, np.arange(4), np.array([0.0, np.nan, 1.0, 0.5]))
+    assert np.isnan(rank[1])
+    assert rank[0] == 0.0
+    assert rank[2] == 100.0
+    assert 0.0 < rank[3] < 100.0
+
+
+def test_attach_with_missing_cells():
+    clim = make_climatology()
+    df = pd.DataFrame({"lat": clim.cube.lat[:2], "lon": clim.cube.lon[:2], "risk_score": [np.nan, 0.4]})
+    out = clim.attach(df, "2024-01-15")
+    assert np.isnan(out["risk_pct_rank"].iloc[0])
+    assert not np.isnan(out["risk_pct_rank"].iloc[1])
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nexus_ai.risk_cube import RiskCube
+from nexus_ai.risk_ranges import RangeAggregator, sums_paths_for
+
+
+def make_cube(n_cells=12, n_days=40):
+    lat = np.linspace(50.0, 51.1, n_cells, dtype=np.float32)
+    lon = np.full(n_cells, 10.0, dtype=np.float32)
+    data = np.random.default_rng(2).uniform(0, 1, (n_cells, n_days)).astype(np.float32)
+    data[3, :10] = np.nan
+    return RiskCube(data, lat, lon, pd.Timestamp("2024-01-01"))
+
+
+def save_cube(cube, tmp_path):
+    cube_path, meta_path = tmp_path / "risk.cube.npy", tmp_path / "risk.cube.npz"
+    np.save(cube_path, cube.data)
+    np.savez(meta_path, lat=cube.lat, lon=cube.lon, n_days=cube.n_days, epoch="2024-01-01", source_version="v1")
+    return RiskCube.open(cube_path, meta_path)
+
+
+@pytest.mark.parametrize("start, end", [
+    ("2030-01-01", None),
+    ("2030-01-01", "2030-02-01"),
+    (None, "2020-01-01"),
+    ("2023-01-01", "2023-06-01"),
+    ("2024-01-20", "2024-01-10"),
+])
+def test_ranges_outside_archive_are_empty(start, end):
+    ranges = RangeAggregator(make_cube(), block_days=8)
+    assert ranges.cube.day_range(start, end)[0] <= ranges.cube.n_days
+    assert not ranges.count(start, end).any()
+    for how in ("mean", "max", "min"):
+        assert np.isnan(ranges.aggregate(start, end, how)).all()
+    assert ranges.frame(start, end).empty
+
+
+def test_range_clipped_to_archive():
+    cube = make_cube()
+    ranges = RangeAggregator(cube, block_days=8)
+    assert np.allclose(ranges.mean("2023-12-01", "2030-01-01"), np.nanmean(cube.data, axis=1))
+    assert np.allclose(ranges.max("2024-02-05"), np.nanmax(cube.data[:, 35:], axis=1))
+
+
+def test_prefix_sums_memory_mapped_next_to_cube(tmp_path):
+    cube = save_cube(make_cube(), tmp_path)
+    ranges = RangeAggregator(cube, block_days=8)
+    assert all(p.exists() for p in sums_paths_for(cube.path))
+    assert isinstance(ranges._csum, np.memmap)
+
+    again = RangeAggregator(cube, block_days=8)
+    assert np.allclose(again.mean("2024-01-05", "2024-01-30"), ranges.mean("2024-01-05", "2024-01-30"), equal_nan=True)
+    assert np.allclose(ranges.mean(), RangeAggregator(make_cube(), block_days=8).mean())
+
+    # a rebuilt cube (new source version) rebuilds the sums
+    cube.source_version = "v2"
+    RangeAggregator(cube, block_days=8)
+    assert str(np.load(sums_paths_for(cube.path)[2])["source_version"]) == "v2"
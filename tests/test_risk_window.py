@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+from nexus_ai.risk_cube import RiskCube
+from nexus_ai.risk_ranges import RangeAggregator
+from nexus_ai.risk_window import GridWindowIndex, grid_key
+
+
+def make_cube(n_days=70):
+    lat, lon = np.meshgrid(np.arange(50.0, 51.0, 0.1), np.arange(10.0, 11.0, 0.1), indexing="ij")
+    lat, lon = lat.ravel().astype(np.float32), lon.ravel().astype(np.float32)
+    data = np.random.default_rng(1).uniform(0, 1, (len(lat), n_days)).astype(np.float32)
+    data[0, 5] = np.nan
+    return RiskCube(data, lat, lon, pd.Timestamp("2024-01-01"))
+
+
+def test_polygon_cells_cached_per_shape():
+    cube = make_cube()
+    index = GridWindowIndex.from_cube(cube)
+    shape = box(10.25, 50.25, 10.55, 50.45)
+    cells = index.cells(shape)
+    assert index.cells(shape) is cells
+    assert np.all((cube.lon[cells] >= 10.25) & (cube.lon[cells] <= 10.55))
+    assert np.all((cube.lat[cells] >= 50.25) & (cube.lat[cells] <= 50.45))
+
+
+def test_day_frame_reads_only_cells():
+    cube = make_cube()
+    cells = np.array([0, 3, 7])
+    df = cube.day_frame("2024-01-06", cells=cells)
+    # cell 0 has no data that day
+    assert list(df["lat"]) == list(cube.lat[[3, 7]])
+    assert np.allclose(df["risk_score"], cube.data[[3, 7], 5])
+    assert len(cube.day_frame("2024-01-06")) == cube.n_cells - 1
+
+
+def test_range_frame_cells_match_full_grid():
+    cube = make_cube()
+    ranges = RangeAggregator(cube, block_days=8)
+    cells = np.array([2, 11, 40, 99])
+    for how in ("mean", "max", "min"):
+        full = ranges.frame("2024-01-03", "2024-02-20", how=how)
+        part = ranges.frame("2024-01-03", "2024-02-20", how=how, cells=cells)
+        assert np.allclose(part["risk_score"], full["risk_score"].to_numpy()[cells])
+
+
+def test_grid_key_identity():
+    cube = make_cube()
+    assert grid_key(cube.lat, cube.lon) == grid_key(cube.lat.copy(), cube.lon.copy())
+    assert grid_key(cube.lat, cube.lon) != grid_key(cube.lat[::-1], cube.lon[::-1])
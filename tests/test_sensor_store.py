@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nexus_ai.components.sensor_alerts import generate_sensor_alerts
+from nexus_ai.sensor_store import _NO_TS, SensorRingStore, _to_ns, latest_readings
+
+
+def frame():
+    return pd.DataFrame({
+        "device_id": ["a", "a", "b", "b", "c"],
+        "timestamp_utc": ["2024-06-01 10:00", "2024-06-01 10:05", "2024-06-01 10:00", "not a time", None],
+        "pm25": [10.0, 80.0, 5.0, 500.0, 7.0],
+    })
+
+
+def test_bad_timestamps_are_skipped():
+    ts = _to_ns(frame()["timestamp_utc"])
+    assert (ts[3], ts[4]) == (_NO_TS, _NO_TS)
+    with pytest.raises(ValueError):
+        _to_ns(["not a time"], missing_ok=False)
+    with pytest.raises(ValueError):
+        _to_ns([None], missing_ok=False)
+
+
+def test_latest_with_bad_rows():
+    latest = latest_readings(frame()).set_index("device_id")
+    assert list(latest.index) == ["a", "b"]
+    assert latest.loc["b", "pm25"] == 5.0
+
+    store = SensorRingStore.from_frame(frame())
+    assert store.latest().set_index("device_id")["pm25"].to_dict() == {"a": 80.0, "b": 5.0}
+    # the readable rows still produce alerts (b's bad 500 reading is skipped)
+    alerts = generate_sensor_alerts(frame())
+    assert len(alerts) == 1 and "Birdhouse a" in alerts[0]
+
+
+def test_without_timestamps_ingest_order():
+    df = frame().drop(columns="timestamp_utc")
+    assert latest_readings(df).set_index("device_id")["pm25"].to_dict() == {"a": 80.0, "b": 500.0, "c": 7.0}
+
+    store = SensorRingStore.from_frame(df)
+    assert store.latest().set_index("device_id")["pm25"].to_dict() == {"a": 80.0, "b": 500.0, "c": 7.0}
+    store.extend(pd.DataFrame({"device_id": ["a"], "pm25": [1.0]}))
+    assert store.latest().set_index("device_id").loc["a", "pm25"] == 1.0
+    assert np.all(np.diff(store.history("a")["timestamp_utc"].astype("int64")) > 0)
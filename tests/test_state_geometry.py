@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from nexus_ai.state_geometry import StateGeometry, build_state_geometry
+
+
+def square(x, y):
+    return {"type": "Polygon", "coordinates": [[[x, y], [x + 1, y], [x + 1, y + 1], [x, y + 1], [x, y]]]}
+
+
+def write_geojson(path, features):
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": props, "geometry": geom} for props, geom in features
+    ]}), encoding="utf-8")
+
+
+def test_ids_follow_their_region(tmp_path):
+    src = tmp_path / "states.geojson"
+    write_geojson(src, [
+        ({"id": "A", "name": "Alpha"}, square(0, 0)),
+        ({"id": "X", "name": "No shape"}, None),
+        ({"id": "B", "name": "Beta"}, square(1, 0)),
+    ])
+    table = StateGeometry(build_state_geometry(src, tolerances=(0.0,))).frame(0.0)
+    assert dict(zip(table["NAME_1"], table["id"])) == {"Alpha": "A", "Beta": "B"}
+
+
+def test_duplicate_region_names_rejected(tmp_path):
+    src = tmp_path / "states.geojson"
+    write_geojson(src, [
+        ({"id": "A1", "name": "Alpha"}, square(0, 0)),
+        ({"id": "A2", "name": "Alpha"}, square(5, 5)),
+        ({"id": "B", "name": "Beta"}, square(1, 0)),
+    ])
+    with pytest.raises(ValueError, match="Alpha"):
+        build_state_geometry(src)
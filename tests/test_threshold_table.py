@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from nexus_ai.utils import DELTA_LEVELS, RISK_LEVELS, TREND_LEVELS, ThresholdTable
+
+
+@pytest.mark.parametrize("delta, label", [
+    (-0.3, "much better"),
+    (-0.2, "better"),
+    (-0.1, "better"),
+    (-0.05, "similar"),
+    (0.0, "similar"),
+    (0.05, "similar"),
+    (0.1, "worse"),
+    (0.2, "worse"),
+    (0.3, "much worse"),
+])
+def test_delta_levels_strict_edges(delta, label):
+    assert DELTA_LEVELS.classify(delta) == label
+
+
+@pytest.mark.parametrize("delta, label", [
+    (-0.06, "decreasing"),
+    (-0.05, "stable"),
+    (0.0, "stable"),
+    (0.05, "stable"),
+    (0.06, "increasing"),
+])
+def test_trend_levels_strict_edges(delta, label):
+    assert TREND_LEVELS.classify(delta) == label
+
+
+def test_array_matches_scalar():
+    values = np.array([-0.2, -0.05, 0.05, 0.2, np.nan])
+    assert list(DELTA_LEVELS.classify(values)[:4]) == [DELTA_LEVELS.classify(v) for v in values[:4]]
+    assert DELTA_LEVELS.codes(values)[-1] == -1
+
+
+def test_single_side_edges():
+    # risk levels: a score equal to a threshold belongs to the upper level
+    _, medium, _ = RISK_LEVELS.edges
+    assert RISK_LEVELS.classify(medium) == "HIGH"
+    left = ThresholdTable(edges=(0.5,), labels=("a", "b"), side="left")
+    assert left.classify(0.5) == "a"
+
+
+def test_side_per_edge_validated():
+    with pytest.raises(ValueError):
+        ThresholdTable(edges=(0.1, 0.2), labels=("a", "b", "c"), side=("left",))
+    with pytest.raises(ValueError):
+        ThresholdTable(edges=(0.1,), labels=("a", "b"), side=("up",))